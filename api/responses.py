@@ -0,0 +1,141 @@
+import csv
+import hashlib
+import io
+import logging
+import zlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Literal, Optional
+
+from fastapi import Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Row
+
+logger = logging.getLogger(__name__)
+
+# Сколько записей проверяется схемой и сериализуется за один шаг выгрузки
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+
+@lru_cache(maxsize=None)
+def adapter_for(schema) -> TypeAdapter:
+    """
+    TypeAdapter схемы ответа (например, List[DeviceSchemaGet]), создается один раз на процесс.
+    """
+    return TypeAdapter(schema)
+
+
+def json_response(schema, data: Any, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """
+    Быстрый ответ: данные (ORM-объекты или словари) проверяются схемой один раз
+    и сериализуются pydantic-core сразу в байты JSON.
+
+    Возвращаемый Response обходит повторную проверку и сериализацию через response_model
+    (response_model в декораторе остается для документации). Заголовки и cookie,
+    выставленные на внедренный response (X-Next-Cursor, cookie чтения из основной БД),
+    переносятся в ответ: FastAPI сам их не переносит, если обработчик вернул Response.
+    """
+    adapter = adapter_for(schema)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    result = Response(content=body, status_code=status_code, media_type='application/json')
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
+
+
+def version_validators(request: Request, table_version: Optional[Row]) -> dict:
+    """
+    Заголовки ETag и Last-Modified для списка по версии таблицы (см. get_cached_table_version).
+    ETag включает параметры запроса: у разных страниц и фильтров одной версии разные теги.
+    Таблица, которая еще не менялась, имеет версию 0 и не получает Last-Modified.
+    """
+    version = table_version.version if table_version else 0
+    query_hash = hashlib.blake2s(request.url.query.encode(), digest_size=6).hexdigest()
+    validators = {'ETag': f'W/"{version}-{query_hash}"'}
+    if table_version:
+        validators['Last-Modified'] = format_datetime(table_version.updated_at.astimezone(timezone.utc), usegmt=True)
+    return validators
+
+
+def not_modified_response(request: Request, validators: dict) -> Optional[Response]:
+    """
+    Ответ 304, если копия клиента актуальна: If-None-Match совпадает с ETag,
+    а при его отсутствии If-Modified-Since не раньше Last-Modified. Иначе None.
+    """
+    if if_none_match := request.headers.get('if-none-match'):
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        fresh = '*' in tags or validators['ETag'] in tags or validators['ETag'].removeprefix('W/') in tags
+    elif (if_modified_since := request.headers.get('if-modified-since')) and 'Last-Modified' in validators:
+        try:
+            fresh = parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(validators['Last-Modified'])
+        except (TypeError, ValueError):
+            fresh = False
+    else:
+        fresh = False
+    if fresh:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+    return None
+
+
+def _export_chunks(rows: Iterable[dict], schema, fmt: str) -> Iterator[bytes]:
+    adapter = adapter_for(List[schema])
+    item_adapter = adapter_for(schema)
+    fields = list(schema.model_fields)
+    rows = iter(rows)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(fields)
+        yield buffer.getvalue().encode()
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        items = adapter.validate_python(chunk, from_attributes=True)
+        if fmt == 'ndjson':
+            yield b''.join(item_adapter.dump_json(item) + b'\n' for item in items)
+        else:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([[record[field] for field in fields]
+                              for record in adapter.dump_python(items, mode='json')])
+            yield buffer.getvalue().encode()
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def export_response(rows: Iterable[dict], schema, fmt: Literal['ndjson', 'csv'], compress: bool,
+                    filename: str) -> StreamingResponse:
+    """
+    Потоковая выгрузка записей в NDJSON (объект JSON на строку) или CSV (первая строка - имена полей схемы).
+
+    rows - ленивый итератор словарей (например, генератор, читающий серверный курсор):
+    записи проверяются схемой и сериализуются пачками по EXPORT_CHUNK_SIZE, поэтому память
+    не зависит от размера выгрузки. Синхронный итератор Starlette обходит в пуле потоков.
+    С compress поток сжимается gzip и отдается файлом .gz.
+    Ошибка посреди выгрузки обрывает соединение: клиент получает неполный ответ, а не усеченный файл.
+    """
+    def body() -> Iterator[bytes]:
+        try:
+            yield from chunks
+        except Exception:
+            logger.exception('Выгрузка %s прервана', filename)
+            raise
+
+    chunks = _export_chunks(rows, schema, fmt)
+    filename = f'{filename}.{fmt}'
+    media_type = EXPORT_MEDIA_TYPES[fmt]
+    if compress:
+        chunks = _gzip_chunks(chunks)
+        filename += '.gz'
+        media_type = 'application/gzip'
+    return StreamingResponse(body(), media_type=media_type,
+                             headers={'Content-Disposition': f'attachment; filename="{filename}"'})
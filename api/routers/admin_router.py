@@ -0,0 +1,67 @@
+from fastapi import Depends, APIRouter, HTTPException, status
+from authorization.auth import get_current_user, verified_tokens, wp_user_cache
+from database.db import engine, async_engine, replica_engines
+from database.pool_metrics import pool_stats
+from database.query_cache import query_cache
+
+admin_router = APIRouter(prefix='/admin')
+
+
+def require_admin(user: dict = Depends(get_current_user)):
+    """
+    Пропустить только пользователей с ролью администратора.
+    """
+    if 'administrator' not in user.get('user', {}).get('roles', []):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав.")
+    return user
+
+
+@admin_router.get(
+    '/pool_stats',
+    summary="Состояние пулов соединений",
+    description="Возвращает размер пула, число выданных соединений, overflow, таймауты "
+                "и гистограмму времени ожидания соединения для каждого движка БД."
+)
+def get_pool_stats(user: dict = Depends(require_admin)):
+    """
+    Метрики пулов соединений текущего воркера.
+    Требует роли администратора.
+    """
+    stats = {'primary': pool_stats(engine)}
+    for number, replica in enumerate(replica_engines, start=1):
+        stats[f'replica_{number}'] = pool_stats(replica)
+    if async_engine is not None:
+        stats['async'] = pool_stats(async_engine.sync_engine)
+    return stats
+
+
+@admin_router.get(
+    '/auth_cache_stats',
+    summary="Состояние кэшей авторизации",
+    description="Возвращает размер и счетчики попаданий кэша проверенных локальных токенов "
+                "и кэша ответов WordPress."
+)
+def get_auth_cache_stats(user: dict = Depends(require_admin)):
+    """
+    Метрики кэшей токенов текущего воркера.
+    Требует роли администратора.
+    """
+    return {
+        'local_tokens': {'size': len(verified_tokens), 'hits': verified_tokens.hits,
+                         'misses': verified_tokens.misses},
+        'wordpress': wp_user_cache.stats(),
+    }
+
+
+@admin_router.get(
+    '/query_cache_stats',
+    summary="Состояние кэша запросов",
+    description="Возвращает хранилище кэша запросов справочников, попадания и промахи по таблицам, "
+                "долю попаданий и число ошибок хранилища."
+)
+def get_query_cache_stats(user: dict = Depends(require_admin)):
+    """
+    Метрики кэша запросов текущего воркера (счетчики у каждого воркера свои).
+    Требует роли администратора.
+    """
+    return query_cache.stats()
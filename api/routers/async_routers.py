@@ -0,0 +1,172 @@
+from typing import List, Literal, Optional
+from uuid import UUID
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.responses import json_response, version_validators, not_modified_response
+from api.schemas.device_models_schema import DeviceModelSchemaGet, DeviceModelSchemaPost
+from api.schemas.devices_schema import DeviceSchemaGet, DeviceSchemaPost, DeviceSchemaUpdate
+from api.schemas.enterprices_schema import EnterprisesSchema, EnterprisesSchemaUpdate
+from api.schemas.filial_enterprises_schema import FilialEnterprisesSchemaGet, FilialEnterprisesSchemaPost, \
+    FilialEnterprisesSchemaUpdate
+from api.schemas.regular_times_schema import RegularTimesSchemaGet, RegularTimesSchemaPost, RegularTimesSchemaUpdate
+from api.schemas.task_lists_schema import TaskListsSchemaGet, TaskListsSchemaPost, TaskListsSchemaUpdate
+from authorization.auth import get_current_user
+from background.task_events import task_event_hub
+from database.crud.async_crud import async_get_all, async_get_by_pk, async_create, async_update, async_delete
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
+from database.db import get_async_db
+from database.models import DeviceModels, Devices, Enterprises, FilialEnterprises, RegularTimes, TaskLists
+from database.models.regular_times_model import with_days_mask
+
+# Асинхронные CRUD-эндпоинты (режим database.async_mode).
+# Пути совпадают с синхронными роутерами: асинхронный роутер подключается раньше и
+# перехватывает стандартные CRUD-запросы, остальные эндпоинты обслуживаются синхронными роутерами.
+
+
+def no_filters():
+    return {}
+
+
+def device_filters(
+    filial_id: Optional[int] = Query(None, gt=0, description="Фильтр по ID филиала"),
+    model_id: Optional[int] = Query(None, gt=0, description="Фильтр по ID модели устройства"),
+):
+    return {'filial_id': filial_id, 'model_id': model_id}
+
+
+def filial_enterprise_filters(
+    inn: Optional[str] = Query(None, min_length=10, max_length=12, description="Фильтр по ИНН предприятия"),
+):
+    return {'inn': inn}
+
+
+def regular_time_filters(
+    period: Optional[Literal['Еженедельно', 'Ежедневно']] = Query(None, description="Фильтр по периодичности"),
+):
+    return {'period': period}
+
+
+async def regular_time_changes(db: AsyncSession, regular_time_id: int, changes: dict):
+    if ('days' in changes) != ('period' in changes):
+        current = (await db.execute(select(RegularTimes.days, RegularTimes.period)
+                                    .where(RegularTimes.id == regular_time_id))).first()
+        if not current:
+            raise HTTPException(status_code=404, detail="Запись не найдена.")
+        return with_days_mask(changes, current.days, current.period)
+    return with_days_mask(changes)
+
+
+ALL_OPERATIONS = ('all', 'get', 'create', 'update', 'delete')
+
+
+def build_async_router(prefix: str, name: str, plural: str, model, pk_type, schema_get, schema_post,
+                       schema_update, filters=no_filters, operations=ALL_OPERATIONS, on_created=None,
+                       prepare_changes=None) -> APIRouter:
+    """
+    Построить асинхронный роутер со стандартными эндпоинтами сущности:
+    /all_{plural}, /get_{name}/{id}, /create_{name}, /update_{name}/{id}, /delete_{name}/{id}.
+    operations - какие из них подключить; остальные остаются за синхронным роутером.
+    prepare_changes - корутина для вычисляемых полей при обновлении (см. async_update).
+    """
+    router = APIRouter(prefix=prefix)
+    # Список и чтение по ключу выбирают только поля схемы ответа
+    page_fields = tuple(schema_get.model_fields)
+
+    def to_pk(item_id):
+        return str(item_id) if pk_type is UUID else item_id
+
+    def route(operation, method, path, **kwargs):
+        if operation in operations:
+            return method(path, **kwargs)
+        return lambda func: func
+
+    @route('all', router.get, f'/all_{plural}', response_model=List[schema_get])
+    async def get_all(
+        response: Response,
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+        cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+        descending: bool = Query(False, description="Сортировка по убыванию"),
+        filter_values: dict = Depends(filters),
+        db: AsyncSession = Depends(get_async_db),
+        user: dict = Depends(get_current_user)
+    ):
+        validators = version_validators(request, await db.run_sync(get_cached_table_version, model.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        rows, next_cursor = await async_get_all(db, model, limit, cursor, filter_values, descending, page_fields)
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[schema_get], rows, response)
+
+    @route('get', router.get, f'/get_{name}/{{item_id}}', response_model=schema_get)
+    async def get_by_id(
+        item_id: pk_type,
+        db: AsyncSession = Depends(get_async_db),
+        user: dict = Depends(get_current_user)
+    ):
+        return json_response(schema_get, await async_get_by_pk(db, model, to_pk(item_id), page_fields))
+
+    @route('create', router.post, f'/create_{name}', response_model=schema_get)
+    async def create(
+        item: schema_post,
+        db: AsyncSession = Depends(get_async_db),
+        user: dict = Depends(get_current_user)
+    ):
+        values = item.model_dump()
+        for field, value in values.items():
+            if isinstance(value, UUID):
+                values[field] = str(value)
+        created = await async_create(db, model(**values))
+        if on_created:
+            on_created(created)
+        return created
+
+    @route('update', router.patch, f'/update_{name}/{{item_id}}', response_model=schema_get)
+    async def update(
+        item_id: pk_type,
+        item: schema_update,
+        db: AsyncSession = Depends(get_async_db),
+        user: dict = Depends(get_current_user)
+    ):
+        changes = item.model_dump(exclude_unset=True)
+        for field, value in changes.items():
+            if isinstance(value, UUID):
+                changes[field] = str(value)
+        return await async_update(db, model, to_pk(item_id), changes, prepare_changes)
+
+    @route('delete', router.delete, f'/delete_{name}/{{item_id}}')
+    async def delete(
+        item_id: pk_type,
+        db: AsyncSession = Depends(get_async_db),
+        user: dict = Depends(get_current_user)
+    ):
+        await async_delete(db, model, to_pk(item_id))
+        return {"detail": "Запись успешно удалена"}
+
+    return router
+
+
+async_routers = [
+    build_async_router('/device_models', 'device_model', 'device_models', DeviceModels, int,
+                       DeviceModelSchemaGet, DeviceModelSchemaPost, DeviceModelSchemaPost),
+    build_async_router('/device', 'device', 'devices', Devices, UUID,
+                       DeviceSchemaGet, DeviceSchemaPost, DeviceSchemaUpdate, device_filters),
+    build_async_router('/enterprise', 'enterprise', 'enterprises', Enterprises, str,
+                       EnterprisesSchema, EnterprisesSchema, EnterprisesSchemaUpdate),
+    build_async_router('/filial_enterprise', 'filial_enterprise', 'filial_enterprises', FilialEnterprises, int,
+                       FilialEnterprisesSchemaGet, FilialEnterprisesSchemaPost, FilialEnterprisesSchemaUpdate,
+                       filial_enterprise_filters),
+    build_async_router('/regular_time', 'regular_time', 'regular_times', RegularTimes, int,
+                       RegularTimesSchemaGet, RegularTimesSchemaPost, RegularTimesSchemaUpdate,
+                       regular_time_filters, prepare_changes=regular_time_changes),
+    # Список и чтение заданий остаются синхронными: у них есть фильтр по времени и чтение из архива
+    build_async_router('/task_list', 'task_list', 'task_lists', TaskLists, UUID,
+                       TaskListsSchemaGet, TaskListsSchemaPost, TaskListsSchemaUpdate,
+                       operations=('create', 'update', 'delete'),
+                       on_created=lambda task: task_event_hub.publish_tasks(
+                           [TaskListsSchemaGet.model_validate(task).model_dump()])),
+]
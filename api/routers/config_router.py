@@ -1,10 +1,15 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from api.responses import json_response, version_validators, not_modified_response
 from api.schemas.config_schema import ConfigSchemaGet, ConfigSchemaPost
 from authorization.auth import get_current_user
-from database.crud.configs_crud import get_all_settings, set_setting_value, get_setting_by_name
+from database.config_snapshot import config_snapshot
+from database.crud.configs_crud import get_all_settings, set_setting_value
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
 from database.db import get_db
+from database.models import Configs
 
 config_router = APIRouter(prefix='/config')
 
@@ -13,20 +18,34 @@ config_router = APIRouter(prefix='/config')
     '/get_all_settings',
     response_model=List[ConfigSchemaGet],
     summary="Получить все настройки",
-    description="Возвращает список всех конфигурационных параметров системы."
+    description="Возвращает страницу конфигурационных параметров системы. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+                "Поддерживаются условные запросы: ETag/If-None-Match и Last-Modified/If-Modified-Since."
 )
 def get_all(
+        response: Response,
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+        cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+        descending: bool = Query(False, description="Сортировка по убыванию"),
         db: Session = Depends(get_db),
         user: dict = Depends(get_current_user)
 ):
     """
-    Получает все настройки из базы данных.
+    Получает страницу настроек из базы данных.
     Требует авторизации.
     """
     try:
-        orm_models = get_all_settings(db)
-        result = [ConfigSchemaGet.model_validate(m) for m in orm_models]
-        return result
+        validators = version_validators(request, get_cached_table_version(db, Configs.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        orm_models, next_cursor = get_all_settings(db, limit=limit, cursor=cursor, descending=descending)
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[ConfigSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -42,22 +61,23 @@ def get_all(
 )
 def get_by_name(
         config_name: str,
-        db: Session = Depends(get_db),
         user: dict = Depends(get_current_user)
 ):
     """
-    Получает конкретную настройку по её имени.
+    Получает конкретную настройку по её имени из снимка настроек в памяти.
 
     Возвращает 404 если настройка не найдена.
     """
     try:
-        setting = get_setting_by_name(db, config_name)
+        setting = config_snapshot.get(config_name)
         if not setting:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Настройка '{config_name}' не найдена"
             )
-        return setting
+        return json_response(ConfigSchemaGet, setting._asdict())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,6 +1,7 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from api.responses import json_response, version_validators, not_modified_response
 from api.schemas.device_models_schema import DeviceModelSchemaPost, DeviceModelSchemaGet
 from authorization.auth import get_current_user
 from database.crud.device_models_crud import (
@@ -10,6 +11,8 @@ from database.crud.device_models_crud import (
     delete_device_model,
     update_device_model
 )
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
 from database.db import get_db
 from database.models import DeviceModels
 
@@ -20,19 +23,34 @@ device_model_router = APIRouter(prefix='/device_models')
     '/all_device_models',
     response_model=List[DeviceModelSchemaGet],
     summary="Получить все модели устройств",
-    description="Возвращает список всех моделей устройств из базы данных."
+    description="Возвращает страницу моделей устройств. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+                "Поддерживаются условные запросы: ETag/If-None-Match и Last-Modified/If-Modified-Since."
 )
 def all_device_models(
+    response: Response,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+    descending: bool = Query(False, description="Сортировка по убыванию"),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
     """
-    Получает список всех моделей устройств.
+    Получает страницу моделей устройств.
     Требует авторизации.
     """
     try:
-        orm_models = get_all_device_models(db)
-        return [DeviceModelSchemaGet.model_validate(m) for m in orm_models]
+        validators = version_validators(request, get_cached_table_version(db, DeviceModels.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        orm_models, next_cursor = get_all_device_models(db, limit=limit, cursor=cursor, descending=descending)
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[DeviceModelSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,7 +80,7 @@ def device_model_by_id(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Модель устройства с ID {device_model_id} не найдена"
             )
-        return DeviceModelSchemaGet.model_validate(orm_model)
+        return json_response(DeviceModelSchemaGet, orm_model)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,11 +1,17 @@
 from uuid import UUID
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response, File, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from api.schemas.devices_schema import DeviceSchemaGet, DeviceSchemaPost, DeviceSchemaUpdate
+from typing import List, Literal, Optional
+from api.responses import json_response, version_validators, not_modified_response, export_response
+from api.schemas.devices_schema import DeviceSchemaGet, DeviceSchemaPost, DeviceSchemaUpdate, DeviceImportResult
+from api.uploads import read_upload_records, validated_chunks
 from authorization.auth import get_current_user
-from database.crud.devices_crud import get_all_devices, get_device_by_id, create_device, update_device, delete_device
-from database.db import get_db
+from database.crud.devices_crud import get_all_devices, get_device_by_id, create_device, update_device, delete_device, \
+    iter_devices, import_devices_chunk
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
+from database.db import get_db, read_session
 from database.models import Devices
 
 device_router = APIRouter(prefix='/device')
@@ -15,19 +21,38 @@ device_router = APIRouter(prefix='/device')
     '/all_devices',
     response_model=List[DeviceSchemaGet],
     summary="Получить все устройства",
-    description="Возвращает список всех устройств из базы данных."
+    description="Возвращает страницу устройств с фильтрами. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+                "Поддерживаются условные запросы: ETag/If-None-Match и Last-Modified/If-Modified-Since."
 )
 def all_devices(
+    response: Response,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+    filial_id: Optional[int] = Query(None, gt=0, description="Фильтр по ID филиала"),
+    model_id: Optional[int] = Query(None, gt=0, description="Фильтр по ID модели устройства"),
+    descending: bool = Query(False, description="Сортировка по убыванию"),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
     """
-    Получает список всех устройств.
+    Получает страницу устройств.
     Требует авторизации.
     """
     try:
-        orm_models = get_all_devices(db)
-        return [DeviceSchemaGet.model_validate(m) for m in orm_models]
+        validators = version_validators(request, get_cached_table_version(db, Devices.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        orm_models, next_cursor = get_all_devices(
+            db, limit=limit, cursor=cursor, filial_id=filial_id, model_id=model_id, descending=descending
+        )
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[DeviceSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -35,6 +60,78 @@ def all_devices(
         )
 
 
+@device_router.get(
+    '/export_devices',
+    response_class=StreamingResponse,
+    summary="Выгрузить устройства",
+    description="Потоковая выгрузка всех устройств с фильтрами в NDJSON или CSV, "
+                "при gzip=true - сжатым файлом .gz. Порядок записей не гарантируется."
+)
+def export_devices(
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format', description="Формат выгрузки"),
+    compress: bool = Query(False, alias='gzip', description="Сжать выгрузку gzip"),
+    filial_id: Optional[int] = Query(None, gt=0, description="Фильтр по ID филиала"),
+    model_id: Optional[int] = Query(None, gt=0, description="Фильтр по ID модели устройства"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Выгружает устройства потоком.
+    Сессия открывается на время выгрузки (а не запроса) и читает с реплики, если она доступна.
+    Требует авторизации.
+    """
+    def rows():
+        with read_session() as db:
+            yield from iter_devices(db, filial_id=filial_id, model_id=model_id)
+
+    return export_response(rows(), DeviceSchemaGet, export_format, compress, 'devices')
+
+
+@device_router.post(
+    '/import_devices',
+    response_model=DeviceImportResult,
+    summary="Импортировать устройства из файла",
+    description="Создает устройства из файла CSV (заголовок model_id,serial_number,filial_id) или JSONL "
+                "(объект на строку). Формат берется из параметра format или расширения файла. "
+                "Корректные строки создаются пачками, отклоненные возвращаются с номерами строк и причинами."
+)
+def import_devices(
+    file: UploadFile = File(description="Файл CSV или JSONL"),
+    import_format: Optional[Literal['csv', 'jsonl']] = Query(None, alias='format', description="Формат файла"),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Импортирует устройства: файл читается и проверяется пачками, каждая пачка - одна транзакция,
+    поэтому при ошибке в середине файла уже созданные устройства остаются.
+    Требует авторизации.
+    """
+    if import_format is None:
+        extension = (file.filename or '').rsplit('.', 1)[-1].lower()
+        if extension not in ('csv', 'jsonl'):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Не удалось определить формат файла, укажите format=csv или format=jsonl."
+            )
+        import_format = extension
+    try:
+        created = 0
+        errors = []
+        seen_serial_numbers = set()
+        for rows, chunk_errors in validated_chunks(read_upload_records(file.file, import_format), DeviceSchemaPost):
+            chunk_created, rejected = import_devices_chunk(db, rows, seen_serial_numbers)
+            created += chunk_created
+            errors.extend(chunk_errors)
+            errors.extend(rejected)
+        return {'created': created, 'errors': sorted(errors, key=lambda error: error['line'])}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при импорте устройств: {str(e)}"
+        )
+
+
 @device_router.get(
     '/get_device/{device_id}',
     response_model=DeviceSchemaGet,
@@ -57,7 +154,7 @@ def device_by_id(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Устройство с ID {device_id} не найдено"
             )
-        return DeviceSchemaGet.model_validate(orm_model)
+        return json_response(DeviceSchemaGet, orm_model)
     except HTTPException:
         raise
     except Exception as e:
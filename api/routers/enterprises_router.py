@@ -1,12 +1,15 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
+from api.responses import json_response, version_validators, not_modified_response
 from authorization.auth import get_current_user
 from database.crud.enterprices_crud import get_enterprise_by_inn, get_all_enterprises, create_enterprise, \
     update_enterprise, delete_enterprise
 from api.schemas.enterprices_schema import EnterprisesSchema, EnterprisesSchemaUpdate
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
 from database.db import get_db
 from database.models import Enterprises
-from typing import List
+from typing import List, Optional
 
 enterprise_router = APIRouter(prefix='/enterprise')
 
@@ -15,20 +18,32 @@ enterprise_router = APIRouter(prefix='/enterprise')
     '/all_enterprises',
     response_model=List[EnterprisesSchema],
     summary="Получить все предприятия",
-    description="Возвращает список всех предприятий из базы данных."
+    description="Возвращает страницу предприятий, отсортированных по ИНН. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+                "Поддерживаются условные запросы: ETag/If-None-Match и Last-Modified/If-Modified-Since."
 )
 def all_enterprises(
+        response: Response,
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+        cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+        descending: bool = Query(False, description="Сортировка по убыванию"),
         db: Session = Depends(get_db),
         user: dict = Depends(get_current_user)
 ):
     """
-    Получение списка всех предприятий.
+    Получение страницы предприятий.
     Требуется авторизация.
     """
     try:
-        orm_models = get_all_enterprises(db)
-        result = [EnterprisesSchema.model_validate(m) for m in orm_models]
-        return result
+        validators = version_validators(request, get_cached_table_version(db, Enterprises.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        orm_models, next_cursor = get_all_enterprises(db, limit=limit, cursor=cursor, descending=descending)
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[EnterprisesSchema], orm_models, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -59,8 +74,7 @@ def enterprise_by_inn(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Предприятие с ИНН '{enterprise_inn}' не найдено"
             )
-        result = EnterprisesSchema.model_validate(orm_model)
-        return result
+        return json_response(EnterprisesSchema, orm_model)
     except HTTPException:
         raise
     except Exception as e:
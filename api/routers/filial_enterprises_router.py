@@ -1,5 +1,6 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
+from api.responses import json_response, version_validators, not_modified_response
 from api.schemas.filial_enterprises_schema import (
     FilialEnterprisesSchemaGet,
     FilialEnterprisesSchemaPost,
@@ -13,9 +14,11 @@ from database.crud.filial_enterprises_crud import (
     update_filial_enterprise,
     delete_filial_enterprise,
 )
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
 from database.db import get_db
 from database.models import FilialEnterprises
-from typing import List
+from typing import List, Optional
 
 filial_enterprise_router = APIRouter(prefix='/filial_enterprise')
 
@@ -24,15 +27,33 @@ filial_enterprise_router = APIRouter(prefix='/filial_enterprise')
     '/all_filial_enterprises',
     response_model=List[FilialEnterprisesSchemaGet],
     summary="Получить все филиалы предприятий",
-    description="Возвращает список всех филиалов предприятий."
+    description="Возвращает страницу филиалов предприятий с фильтром по ИНН. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+                "Поддерживаются условные запросы: ETag/If-None-Match и Last-Modified/If-Modified-Since."
 )
 def all_filial_enterprises(
+        response: Response,
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+        cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+        inn: Optional[str] = Query(None, min_length=10, max_length=12, description="Фильтр по ИНН предприятия"),
+        descending: bool = Query(False, description="Сортировка по убыванию"),
         db: Session = Depends(get_db),
         user: dict = Depends(get_current_user)
 ):
     try:
-        orm_models = get_all_filial_enterprises(db)
-        return [FilialEnterprisesSchemaGet.model_validate(m) for m in orm_models]
+        validators = version_validators(request, get_cached_table_version(db, FilialEnterprises.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        orm_models, next_cursor = get_all_filial_enterprises(
+            db, limit=limit, cursor=cursor, inn=inn, descending=descending
+        )
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[FilialEnterprisesSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка получения филиалов: {e}")
 
@@ -52,7 +73,7 @@ def filial_enterprise_by_id(
         orm_model = get_filial_enterprise_by_id(db, filial_enterprise_id)
         if not orm_model:
             raise HTTPException(status_code=404, detail="Филиал предприятия не найден")
-        return FilialEnterprisesSchemaGet.model_validate(orm_model)
+        return json_response(FilialEnterprisesSchemaGet, orm_model)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,10 +1,14 @@
-from fastapi import Depends, APIRouter, HTTPException, status
+from datetime import time
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from api.responses import json_response, version_validators, not_modified_response
 from api.schemas.regular_times_schema import RegularTimesSchemaGet, RegularTimesSchemaPost, RegularTimesSchemaUpdate
 from authorization.auth import get_current_user
 from database.crud.regular_times_crud import get_all_regular_times, get_regular_time_by_id, \
-    create_regular_time, update_regular_time, delete_regular_time
+    create_regular_time, update_regular_time, delete_regular_time, get_regular_times_firing
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.crud.table_versions_crud import get_cached_table_version
 from database.db import get_db
 from database.models import RegularTimes
 
@@ -15,20 +19,73 @@ regular_time_router = APIRouter(prefix='/regular_time')
     '/all_regular_times',
     response_model=List[RegularTimesSchemaGet],
     summary="Получить все регулярные времена",
-    description="Возвращает список всех записей регулярного времени."
+    description="Возвращает страницу записей регулярного времени с фильтром по периодичности. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+                "Поддерживаются условные запросы: ETag/If-None-Match и Last-Modified/If-Modified-Since."
 )
 def all_regular_times(
+    response: Response,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+    period: Optional[Literal['Еженедельно', 'Ежедневно']] = Query(None, description="Фильтр по периодичности"),
+    descending: bool = Query(False, description="Сортировка по убыванию"),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
     """
-    Получает все записи регулярного времени из базы данных.
+    Получает страницу записей регулярного времени из базы данных.
     Требует авторизации.
     """
     try:
-        orm_models = get_all_regular_times(db)
-        result = [RegularTimesSchemaGet.model_validate(m) for m in orm_models]
-        return result
+        validators = version_validators(request, get_cached_table_version(db, RegularTimes.__tablename__))
+        if not_modified := not_modified_response(request, validators):
+            return not_modified
+        orm_models, next_cursor = get_all_regular_times(
+            db, limit=limit, cursor=cursor, period=period, descending=descending
+        )
+        response.headers.update(validators)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[RegularTimesSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при получении записей: {str(e)}"
+        )
+
+
+@regular_time_router.get(
+    '/firing_regular_times',
+    response_model=List[RegularTimesSchemaGet],
+    summary="Получить расписания, срабатывающие в интервале",
+    description="Возвращает расписания, срабатывающие в указанный день недели "
+                "(1 - понедельник, 7 - воскресенье) в интервале времени [time_from, time_to]."
+)
+def firing_regular_times(
+    response: Response,
+    weekday: int = Query(ge=1, le=7, description="День недели"),
+    time_from: time = Query(description="Начало интервала"),
+    time_to: time = Query(description="Конец интервала"),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Получает расписания, срабатывающие в заданный день недели и интервал времени.
+    Требует авторизации.
+    """
+    if time_from > time_to:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Начало интервала должно быть не позже конца."
+        )
+    try:
+        orm_models = get_regular_times_firing(db, weekday, time_from, time_to)
+        return json_response(List[RegularTimesSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -59,8 +116,7 @@ def regular_time_by_id(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Запись с ID {regular_time_id} не найдена"
             )
-        result = RegularTimesSchemaGet.model_validate(orm_model)
-        return result
+        return json_response(RegularTimesSchemaGet, orm_model)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,35 +1,75 @@
+from datetime import datetime
 from uuid import UUID
-from fastapi import Depends, APIRouter, HTTPException, status
+import asyncio
+import json
+from fastapi import Depends, APIRouter, HTTPException, status, Query, Request, Response, WebSocket, \
+    WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from api.schemas.task_lists_schema import TaskListsSchemaGet, TaskListsSchemaPost, TaskListsSchemaUpdate
+from typing import List, Literal, Optional
+from api.responses import adapter_for, json_response, export_response
+from api.schemas.task_lists_schema import TaskListsSchemaGet, TaskListsSchemaPost, TaskListsSchemaUpdate, \
+    TaskListsBulkResult, TaskListsAckItem, TaskListsAckResult
 from authorization.auth import get_current_user
+from background.task_acks import task_ack_batcher
+from background.task_events import task_event_hub, wait_tasks
+from database.crud.devices_crud import resolve_device_id
 from database.crud.task_lists_crud import get_all_task_lists, get_task_list_by_id, \
-    create_task_list, update_task_list, delete_task_list
-from database.db import get_db
+    create_task_list, update_task_list, delete_task_list, claim_due_task_lists, bulk_create_task_lists, \
+    bulk_ack_task_lists, iter_task_lists
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from database.db import get_db, session_maker, read_session
 from database.models import TaskLists
 
 task_list_router = APIRouter(prefix='/task_list')
 
+# Максимальное число заданий в одном пакетном запросе
+MAX_BULK_TASK_LISTS = 10000
+
+task_lists_adapter = adapter_for(List[TaskListsSchemaGet])
+task_acks_adapter = TypeAdapter(List[TaskListsAckItem])
+
 
 @task_list_router.get(
     '/all_task_lists',
     response_model=List[TaskListsSchemaGet],
     summary="Получить все списки задач",
-    description="Возвращает список всех списков задач в системе."
+    description="Возвращает страницу списков задач с фильтрами. "
+                "Курсор следующей страницы передается в заголовке X-Next-Cursor."
 )
 def all_task_lists(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+    device_id: Optional[UUID] = Query(None, description="Фильтр по UUID устройства"),
+    task_status: Optional[Literal[
+        'Ожидает', 'Выполняется', 'Успешно', 'Ошибка', 'Зарегистрировано на устройстве'
+    ]] = Query(None, alias='status', description="Фильтр по статусу"),
+    timing_from: Optional[datetime] = Query(None, description="Начало интервала времени выполнения"),
+    timing_to: Optional[datetime] = Query(None, description="Конец интервала времени выполнения"),
+    sort_by: Literal['timing', 'id'] = Query('timing', description="Ключ сортировки"),
+    descending: bool = Query(False, description="Сортировка по убыванию"),
+    include_archive: bool = Query(False, description="Включить завершенные задания из архива"),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
     """
-    Получает все списки задач из базы данных.
+    Получает страницу списков задач из базы данных.
     Требует авторизации.
     """
     try:
-        orm_models = get_all_task_lists(db)
-        result = [TaskListsSchemaGet.model_validate(m) for m in orm_models]
-        return result
+        orm_models, next_cursor = get_all_task_lists(
+            db, limit=limit, cursor=cursor, device_id=device_id, status=task_status,
+            timing_from=timing_from, timing_to=timing_to, sort_by=sort_by, descending=descending,
+            include_archive=include_archive
+        )
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return json_response(List[TaskListsSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -37,6 +77,211 @@ def all_task_lists(
         )
 
 
+@task_list_router.get(
+    '/export_task_lists',
+    response_class=StreamingResponse,
+    summary="Выгрузить списки задач",
+    description="Потоковая выгрузка всех списков задач с фильтрами в NDJSON или CSV, "
+                "при gzip=true - сжатым файлом .gz. Порядок записей не гарантируется."
+)
+def export_task_lists(
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format', description="Формат выгрузки"),
+    compress: bool = Query(False, alias='gzip', description="Сжать выгрузку gzip"),
+    device_id: Optional[UUID] = Query(None, description="Фильтр по UUID устройства"),
+    task_status: Optional[Literal[
+        'Ожидает', 'Выполняется', 'Успешно', 'Ошибка', 'Зарегистрировано на устройстве'
+    ]] = Query(None, alias='status', description="Фильтр по статусу"),
+    timing_from: Optional[datetime] = Query(None, description="Начало интервала времени выполнения"),
+    timing_to: Optional[datetime] = Query(None, description="Конец интервала времени выполнения"),
+    include_archive: bool = Query(False, description="Включить завершенные задания из архива"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Выгружает списки задач потоком.
+    Сессия открывается на время выгрузки (а не запроса) и читает с реплики, если она доступна.
+    Требует авторизации.
+    """
+    def rows():
+        with read_session() as db:
+            yield from iter_task_lists(db, device_id=device_id, status=task_status, timing_from=timing_from,
+                                       timing_to=timing_to, include_archive=include_archive)
+
+    return export_response(rows(), TaskListsSchemaGet, export_format, compress, 'task_lists')
+
+
+@task_list_router.post(
+    '/claim_task_lists/{device_id}',
+    response_model=List[TaskListsSchemaGet],
+    summary="Захватить наступившие задания устройства",
+    description="Атомарно переводит наступившие задания устройства из статуса 'Ожидает' "
+                "в 'Выполняется' и возвращает их. Параллельные опросы не получают одни и те же задания."
+)
+def claim_task_lists(
+    response: Response,
+    device_id: UUID,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT, description="Максимальное число заданий"),
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Захватывает наступившие задания для опроса устройством.
+    Требует авторизации.
+    """
+    try:
+        orm_models = claim_due_task_lists(db, device_id, limit)
+        return json_response(List[TaskListsSchemaGet], orm_models, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при захвате заданий: {str(e)}"
+        )
+
+
+@task_list_router.get(
+    '/wait_task_lists/{device_id}',
+    response_model=List[TaskListsSchemaGet],
+    summary="Дождаться новых заданий устройства (long-poll)",
+    description="Держит запрос, пока для устройства не будет создано или не наступит задание, "
+                "либо до истечения timeout. По таймауту возвращает пустой список."
+)
+async def wait_task_lists(
+    device_id: UUID,
+    timeout: float = Query(30, gt=0, le=120, description="Максимальное время ожидания в секундах"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Long-poll ожидание заданий устройства.
+    Пока запрос ждет, соединение с БД не занимается.
+    """
+    queue = task_event_hub.subscribe(str(device_id))
+    try:
+        tasks = await wait_tasks(queue, timeout)
+    finally:
+        task_event_hub.unsubscribe(str(device_id), queue)
+    return json_response(List[TaskListsSchemaGet], tasks)
+
+
+@task_list_router.get(
+    '/stream_task_lists/{device_id}',
+    summary="Поток новых заданий устройства (SSE)",
+    description="Server-Sent Events: событие 'tasks' с JSON-списком заданий при создании "
+                "или наступлении задания устройства, комментарий-пинг при простое."
+)
+async def stream_task_lists(
+    device_id: UUID,
+    request: Request,
+    heartbeat: float = Query(15, gt=0, le=120, description="Интервал пинга в секундах"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Подписка устройства на задания через SSE.
+    Пока поток простаивает, соединение с БД не занимается.
+    """
+    queue = task_event_hub.subscribe(str(device_id))
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                tasks = await wait_tasks(queue, heartbeat)
+                if not tasks:
+                    yield ': ping\n\n'
+                    continue
+                payload = task_lists_adapter.dump_json(task_lists_adapter.validate_python(tasks)).decode()
+                yield f'event: tasks\ndata: {payload}\n\n'
+        finally:
+            task_event_hub.unsubscribe(str(device_id), queue)
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _with_session(func, *args):
+    db = session_maker()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+@task_list_router.websocket('/ws_task_lists')
+async def ws_task_lists(
+    websocket: WebSocket,
+    token: str = Query(description="Токен доступа"),
+    device_id: Optional[UUID] = Query(None, description="UUID устройства"),
+    serial_number: Optional[str] = Query(None, max_length=50, description="Серийный номер устройства"),
+):
+    """
+    Командный канал устройства.
+
+    Сервер отправляет {"type": "tasks", "tasks": [...]} при создании или наступлении заданий устройства.
+    Устройство отправляет:
+        {"type": "ack", "acks": [{"task_id": ..., "status": ...}]} - подтверждения статусов,
+            записываются пачками в фоне;
+        {"type": "claim"} - захватить наступившие задания (например, после переподключения).
+    Пока соединение простаивает, сессия БД не занимается.
+    """
+    try:
+        await get_current_user(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    resolved_id = await run_in_threadpool(_with_session, resolve_device_id, device_id, serial_number)
+    if resolved_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    queue = task_event_hub.subscribe(resolved_id)
+
+    async def send_tasks(tasks):
+        payload = task_lists_adapter.dump_python(task_lists_adapter.validate_python(tasks), mode='json')
+        await websocket.send_json({'type': 'tasks', 'tasks': payload})
+
+    async def push():
+        while True:
+            tasks = await queue.get()
+            while not queue.empty():
+                tasks = tasks + queue.get_nowait()
+            await send_tasks(tasks)
+
+    async def receive():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({'type': 'error', 'detail': 'Сообщение должно быть JSON.'})
+                continue
+            message_type = message.get('type') if isinstance(message, dict) else None
+            if message_type == 'ack':
+                try:
+                    acks = task_acks_adapter.validate_python(message.get('acks'))
+                except ValidationError as e:
+                    await websocket.send_json({'type': 'error', 'detail': e.errors(include_url=False)})
+                    continue
+                task_ack_batcher.add(resolved_id, [(str(ack.task_id), ack.status) for ack in acks])
+                await websocket.send_json({'type': 'ack_queued', 'count': len(acks)})
+            elif message_type == 'claim':
+                try:
+                    tasks = await run_in_threadpool(_with_session, claim_due_task_lists, resolved_id)
+                except HTTPException as e:
+                    await websocket.send_json({'type': 'error', 'detail': e.detail})
+                    continue
+                await send_tasks(tasks)
+            else:
+                await websocket.send_json({'type': 'error', 'detail': 'Неизвестный тип сообщения.'})
+
+    pusher = asyncio.create_task(push())
+    try:
+        await receive()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        pusher.cancel()
+        task_event_hub.unsubscribe(resolved_id, queue)
+
+
 @task_list_router.get(
     '/get_task_list/{task_list_id}',
     response_model=TaskListsSchemaGet,
@@ -45,6 +290,7 @@ def all_task_lists(
 )
 def task_list_by_id(
     task_list_id: UUID,
+    include_archive: bool = Query(False, description="Искать также в архиве завершенных заданий"),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
@@ -54,14 +300,13 @@ def task_list_by_id(
     Возвращает 404 если список задач не найден.
     """
     try:
-        orm_model = get_task_list_by_id(db, task_list_id)
+        orm_model = get_task_list_by_id(db, task_list_id, include_archive)
         if not orm_model:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Список задач с ID {task_list_id} не найден"
             )
-        result = TaskListsSchemaGet.model_validate(orm_model)
-        return result
+        return json_response(TaskListsSchemaGet, orm_model)
     except HTTPException:
         raise
     except Exception as e:
@@ -87,7 +332,7 @@ def add_task_list(
     """
     try:
         db_task_list = TaskLists(
-            device_id=task_list.device_id,
+            device_id=str(task_list.device_id),
             cmd=task_list.cmd,
             is_regular=task_list.is_regular,
             timing=task_list.timing,
@@ -95,6 +340,7 @@ def add_task_list(
             status=task_list.status
         )
         result = create_task_list(db, db_task_list)
+        task_event_hub.publish_tasks([TaskListsSchemaGet.model_validate(result).model_dump()])
         return result
     except Exception as e:
         raise HTTPException(
@@ -103,6 +349,72 @@ def add_task_list(
         )
 
 
+@task_list_router.post(
+    '/bulk_create',
+    response_model=List[TaskListsBulkResult],
+    summary="Пакетно создать задания",
+    description="Создает список заданий одной транзакцией. "
+                "Возвращает результат по каждому элементу: UUID созданного задания или причину отказа."
+)
+def bulk_add_task_lists(
+    task_lists: List[TaskListsSchemaPost],
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Создает задания пачкой: одна проверка ссылок и многострочная вставка.
+    """
+    if len(task_lists) > MAX_BULK_TASK_LISTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не более {MAX_BULK_TASK_LISTS} заданий в одном запросе."
+        )
+    try:
+        results = bulk_create_task_lists(db, [task_list.model_dump() for task_list in task_lists])
+        task_event_hub.publish_tasks([dict(task_lists[r['index']].model_dump(), id=r['id'])
+                                      for r in results if r['id'] is not None])
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при создании списков задач: {str(e)}"
+        )
+
+
+@task_list_router.post(
+    '/bulk_ack/{device_id}',
+    response_model=TaskListsAckResult,
+    summary="Пакетно подтвердить статусы заданий",
+    description="Устройство передает пары (task_id, status). Статусы применяются одной транзакцией, "
+                "в ответе перечислены UUID заданий, не найденных у устройства."
+)
+def bulk_ack_task_lists_by_device(
+    device_id: UUID,
+    acks: List[TaskListsAckItem],
+    db: Session = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Применяет подтверждения статусов заданий устройства пачкой.
+    """
+    if len(acks) > MAX_BULK_TASK_LISTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Не более {MAX_BULK_TASK_LISTS} подтверждений в одном запросе."
+        )
+    try:
+        return bulk_ack_task_lists(db, device_id, [(str(ack.task_id), ack.status) for ack in acks])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при подтверждении статусов: {str(e)}"
+        )
+
+
 @task_list_router.patch(
     '/update_task_list/{task_list_id}',
     response_model=TaskListsSchemaGet,
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field
 
@@ -39,3 +39,27 @@ class DeviceSchemaUpdate(BaseModel):
     model_id: Optional[int] = Field(default=None, gt=0, description="Новый ID модели устройства")
     serial_number: Optional[str] = Field(default=None, max_length=50, description="Новый серийный номер устройства")
     filial_id: Optional[int] = Field(default=None, gt=0, description="Новый ID филиала")
+
+
+class DeviceImportError(BaseModel):
+    """
+    Отклоненная строка файла при импорте устройств.
+
+    Поля:
+        line: Номер строки в загруженном файле
+        detail: Причина отказа
+    """
+    line: int = Field(description="Номер строки в загруженном файле")
+    detail: str = Field(description="Причина отказа")
+
+
+class DeviceImportResult(BaseModel):
+    """
+    Итог импорта устройств из файла.
+
+    Поля:
+        created: Число созданных устройств
+        errors: Отклоненные строки в порядке номеров строк
+    """
+    created: int = Field(ge=0, description="Число созданных устройств")
+    errors: List[DeviceImportError] = Field(default_factory=list, description="Отклоненные строки")
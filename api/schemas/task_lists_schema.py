@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, Field, conint
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 
 class TaskListsSchemaPost(BaseModel):
@@ -54,3 +54,46 @@ class TaskListsSchemaUpdate(BaseModel):
     status: Optional[Literal[
         'Ожидает', 'Выполняется', 'Успешно', 'Ошибка', 'Зарегистрировано на устройстве'
     ]] = Field(default=None, description="Новый статус задания")
+
+
+class TaskListsBulkResult(BaseModel):
+    """
+    Результат создания одного задания при пакетной загрузке.
+
+    Поля:
+        index: Позиция задания во входном списке
+        id: UUID созданного задания (None, если задание отклонено)
+        detail: Причина отказа (None, если задание создано)
+    """
+    index: int = Field(ge=0, description="Позиция задания во входном списке")
+    id: Optional[UUID] = Field(default=None, description="UUID созданного задания")
+    detail: Optional[str] = Field(default=None, description="Причина отказа")
+
+
+class TaskListsAckItem(BaseModel):
+    """
+    Подтверждение статуса одного задания устройством.
+
+    Поля:
+        task_id: UUID задания
+        status: Новый статус задания
+    """
+    task_id: UUID = Field(description="UUID задания")
+    status: Literal[
+        'Ожидает', 'Выполняется', 'Успешно', 'Ошибка', 'Зарегистрировано на устройстве'
+    ] = Field(description="Новый статус задания")
+
+    class Config:
+        extra = "forbid"
+
+
+class TaskListsAckResult(BaseModel):
+    """
+    Результат пакетного подтверждения статусов.
+
+    Поля:
+        updated: Число обновленных заданий
+        unknown_ids: UUID заданий, не найденных у устройства
+    """
+    updated: int = Field(ge=0, description="Число обновленных заданий")
+    unknown_ids: List[UUID] = Field(default_factory=list, description="UUID заданий, не найденных у устройства")
@@ -1,4 +1,8 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from api.routers.admin_router import admin_router
+from api.routers.async_routers import async_routers
 from api.routers.config_router import config_router
 from api.routers.devices_router import device_router
 from api.routers.enterprises_router import enterprise_router
@@ -7,8 +11,59 @@ from api.routers.device_models_router import device_model_router
 from api.routers.regular_times_router import regular_time_router
 from api.routers.task_lists_router import task_list_router
 from authorization.auth import auth_router
+from authorization.wp_client import wp_client
+from background.regular_times_expander import RegularTimesExpander
+from background.task_acks import task_ack_batcher
+from background.task_events import task_event_hub, watch_due_task_lists
+from background.task_lists_archiver import TaskListsArchiver
+from config import settings
+from database.config_snapshot import config_snapshot
+from database.db import session_maker, ASYNC_MODE
+
+SchedulerConf = settings.get('scheduler', {})
+regular_times_expander = RegularTimesExpander(
+    session_maker,
+    horizon_hours=SchedulerConf.get('horizon_hours', 24),
+    tick_seconds=SchedulerConf.get('tick_seconds', 60),
+    reload_seconds=SchedulerConf.get('reload_seconds', 300),
+    on_created=task_event_hub.publish_tasks,
+)
+TaskEventsConf = settings.get('task_events', {})
+ArchiveConf = settings.get('archive', {})
+task_lists_archiver = TaskListsArchiver(
+    session_maker,
+    interval_seconds=ArchiveConf.get('interval_seconds', 600),
+    batch_size=ArchiveConf.get('batch_size', 1000),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Снимок таблицы configs в памяти процесса с фоновой сверкой версии
+    config_snapshot.start()
+    # Фоновая генерация заданий по регулярным расписаниям
+    if SchedulerConf.get('enabled', True):
+        regular_times_expander.start()
+    # Перенос завершенных заданий в архивную таблицу
+    if ArchiveConf.get('enabled', True):
+        task_lists_archiver.start()
+    # Рассылка наступивших заданий подписанным устройствам
+    due_watcher = asyncio.create_task(
+        watch_due_task_lists(task_event_hub, session_maker, TaskEventsConf.get('due_poll_seconds', 1.0))
+    )
+    # Пакетная запись подтверждений статусов, полученных по WebSocket
+    ack_writer = asyncio.create_task(task_ack_batcher.run())
+    yield
+    due_watcher.cancel()
+    ack_writer.cancel()
+    regular_times_expander.stop()
+    task_lists_archiver.stop()
+    config_snapshot.stop()
+    await wp_client.aclose()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Основа API",
     description=(
         "API для управления устройствами, заданиями, расписаниями и организациями.\n\n"
@@ -16,6 +71,12 @@ app = FastAPI(
     )
 )
 
+# В асинхронном режиме стандартные CRUD-эндпоинты обслуживаются асинхронными обработчиками:
+# их роутеры подключаются первыми и перехватывают совпадающие пути
+if ASYNC_MODE:
+    for router in async_routers:
+        app.include_router(router, tags=["Асинхронный режим"])
+
 # Подключение роутеров с тегами для документации
 app.include_router(device_model_router, tags=["Модели устройств"])
 app.include_router(device_router, tags=["Устройства"])
@@ -25,3 +86,4 @@ app.include_router(task_list_router, tags=["Список задач"])
 app.include_router(regular_time_router, tags=["Регулярные расписания"])
 app.include_router(config_router, tags=["Настройки системы"])
 app.include_router(auth_router, tags=["Авторизация"])
+app.include_router(admin_router, tags=["Администрирование"])
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Literal, Union
+
+from pydantic import ValidationError
+
+from api.responses import adapter_for
+
+# Сколько записей загружаемого файла проверяется и вставляется за один шаг
+IMPORT_CHUNK_SIZE = 1000
+
+
+def read_upload_records(file: BinaryIO, fmt: Literal['csv', 'jsonl']) -> Iterator[tuple[int, Union[dict, str]]]:
+    """
+    Записи загруженного файла по одной: пары (номер строки файла, словарь полей).
+    CSV читается с заголовком (имена полей в первой строке), JSONL - объект JSON на строку.
+    Для нечитаемой записи вместо словаря отдается текст ошибки; ошибка кодировки
+    или формата CSV останавливает чтение.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    line = 0
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for record in reader:
+                line = reader.line_num
+                if None in record or None in record.values():
+                    yield line, "Число значений не совпадает с заголовком."
+                else:
+                    yield line, record
+        else:
+            for line, raw in enumerate(text, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except ValueError as e:
+                    yield line, f"Некорректный JSON: {e}"
+                    continue
+                yield line, record if isinstance(record, dict) else "Ожидается объект JSON."
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield line + 1, f"Чтение файла остановлено: {e}"
+    finally:
+        text.detach()
+
+
+def _error_detail(error: ValidationError) -> str:
+    return '; '.join(f"{'.'.join(map(str, item['loc'])) or 'запись'}: {item['msg']}" for item in error.errors())
+
+
+def validated_chunks(records: Iterable[tuple[int, Union[dict, str]]], schema,
+                     chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[tuple[list[tuple[int, dict]], list[dict]]]:
+    """
+    Проверить записи схемой пачками по chunk_size.
+    Для каждой пачки отдает (корректные записи [(номер строки, словарь полей схемы)],
+    ошибки [{'line', 'detail'}]). Пачка проверяется одним вызовом; по одной записи
+    проверяются только пачки с ошибками, чтобы найти виновные строки.
+    """
+    adapter = adapter_for(List[schema])
+    item_adapter = adapter_for(schema)
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        errors = [{'line': line, 'detail': record} for line, record in chunk if isinstance(record, str)]
+        chunk = [(line, record) for line, record in chunk if not isinstance(record, str)]
+        try:
+            items = adapter.validate_python([record for _, record in chunk])
+            yield [(line, item.model_dump()) for (line, _), item in zip(chunk, items)], errors
+            continue
+        except ValidationError:
+            pass
+        rows = []
+        for line, record in chunk:
+            try:
+                rows.append((line, item_adapter.validate_python(record).model_dump()))
+            except ValidationError as e:
+                errors.append({'line': line, 'detail': _error_detail(e)})
+        yield rows, errors
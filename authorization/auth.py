@@ -1,73 +1,80 @@
-import secrets
-import requests
+import time
 from fastapi import HTTPException, APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
+from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 import config
-from database.crud.configs_crud import set_setting_value, get_setting_by_name
+from authorization.token_cache import TokenCache
+from authorization.wp_client import wp_client, WordPressUnavailable
+from authorization.wp_user_cache import WordPressUserCache
+from database.config_snapshot import config_snapshot
+from database.crud.configs_crud import set_setting_value
 from database.db import get_db
-from database.models import Configs
 from pydantic import BaseModel
 
 auth_router = APIRouter()
 
-WP_TOKEN_URL = 'https://petsfans.ru/wp-json/jwt-auth/v1/token'
-WP_USER_INFO_URL = 'https://petsfans.ru/wp-json/wp/v2/users/me'
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/authorization_local")
 
 
-def get_wp_token(username: str, password: str) -> Optional[str]:
+async def get_wp_token(username: str, password: str) -> Optional[str]:
     """
     Получить JWT токен WordPress через API.
+    WordPressUnavailable - если WordPress не отвечает (см. WordPressClient).
     """
-    response = requests.post(WP_TOKEN_URL, json={"username": username, "password": password})
-    if response.status_code == 200:
-        return response.json().get("token")
-    return None
+    return await wp_client.get_token(username, password)
 
 
-def get_wp_user_info(token: str) -> Optional[dict]:
+async def get_wp_user_info(token: str) -> Optional[dict]:
     """
     Получить информацию о пользователе из WordPress API по JWT токену.
+    WordPressUnavailable - если WordPress не отвечает (см. WordPressClient).
     """
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(WP_USER_INFO_URL, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    return None
+    return await wp_client.get_user_info(token)
 
 
-def get_local_user_info(token: str) -> Optional[dict]:
+def create_local_token(username: str, user_data: dict, category: List[str]) -> str:
     """
-    Получить информацию о пользователе по локальному токену.
+    Выпустить подписанный JWT локального пользователя.
+    Все данные, нужные get_current_user, лежат в claims: проверка токена не обращается
+    ни к хранилищу пользователей, ни к настройкам ролей.
     """
-    # Проверяем, что токен начинается с "local-token-"
-    if not token.startswith("local-token-"):
-        return None
+    now = int(time.time())
+    claims = {
+        "sub": username,
+        "uid": user_data["id"],
+        "name": user_data["name"],
+        "roles": user_data["roles"],
+        "category": category,
+        "iat": now,
+        "exp": now + LOCAL_TOKEN_TTL_SECONDS,
+    }
+    return jwt.encode(claims, LOCAL_JWT_TOKEN, algorithm=LOCAL_ALGORITHM)
 
+
+def get_local_user_info(token: str) -> Optional[dict]:
+    """
+    Получить информацию о пользователе по локальному токену: проверяются только подпись и срок действия.
+    Уже проверенные токены берутся из LRU-кэша до истечения их срока.
+    """
+    if user_info := verified_tokens.get(token):
+        return user_info
     try:
-        # Извлекаем username из токена: local-token-USERNAME-hexcode
-        parts = token.split("-")
-        if len(parts) >= 3:
-            username = parts[2]
-
-            # Проверяем, существует ли пользователь
-            if username in local_users_db:
-                user_data = local_users_db[username]
-                return {
-                    "name": user_data["name"],
-                    "id": user_data["id"],
-                    "user": {
-                        "roles": user_data["roles"]
-                    }
-                }
-    except (IndexError, KeyError, AttributeError):
-        pass
-
-    return None
+        claims = jwt.decode(token, LOCAL_JWT_TOKEN, algorithms=[LOCAL_ALGORITHM])
+        user_info = {
+            "name": claims["name"],
+            "id": claims["uid"],
+            "category": claims["category"],
+            "user": {
+                "roles": claims["roles"]
+            }
+        }
+    except (JWTError, KeyError):
+        return None
+    verified_tokens.put(token, user_info, claims["exp"])
+    return user_info
 
 
 test_wp_roles_dict = {
@@ -77,54 +84,78 @@ test_wp_roles_dict = {
 }
 
 
+# Соответствие групп ролей WordPress и категорий в настройках system.roles.<категория>
+ROLE_GROUP_CATEGORIES = {
+    "admins": "administrator",
+    "moders": "moderator",
+    "users": "user",
+}
+ROLES_CONFIG_PREFIX = 'system.roles.'
+
+
+def _build_roles_by_category(configs: dict) -> dict:
+    """
+    Категория -> множество ролей из настроек system.roles.*.
+    """
+    roles_by_category = {}
+    for name, entry in configs.items():
+        parts = name.split('.')
+        if name.startswith(ROLES_CONFIG_PREFIX) and len(parts) >= 3:
+            roles_by_category.setdefault(parts[2], set()).update(entry.value or [])
+    return {category: frozenset(roles) for category, roles in roles_by_category.items()}
+
+
+def _build_role_categories(configs: dict) -> dict:
+    """
+    Роль -> список категорий, в которые она входит (обратная карта к _build_roles_by_category).
+    """
+    role_categories = {}
+    for category, roles in _build_roles_by_category(configs).items():
+        for role in roles:
+            role_categories.setdefault(role, set()).add(category)
+    return {role: frozenset(categories) for role, categories in role_categories.items()}
+
+
 def update_roles_in_config(db: Session, wp_roles: dict):
     """
     Синхронизировать роли из WordPress с настройками в базе данных.
     Если роли отличаются - обновить в конфигурации.
+    Сравнение идет с картой ролей из снимка настроек, запись в БД - только при расхождении.
     """
-    admins_roles_in_wp = wp_roles["admins"]
-    admins_roles_list = db.query(Configs).filter(Configs.name.ilike('%administrator%')).first()
-    admin_roles_in_db = admins_roles_list.value if admins_roles_list else []
-    if sorted(admin_roles_in_db) != sorted(admins_roles_in_wp):
-        set_setting_value(db, 'system.roles.administrator', admins_roles_in_wp, is_force=True)
-
-    moder_roles_in_wp = wp_roles["moders"]
-    moders_roles_list = db.query(Configs).filter(Configs.name.ilike('%moderator%')).first()
-    moder_roles_in_db = moders_roles_list.value if moders_roles_list else []
-    if sorted(moder_roles_in_db) != sorted(moder_roles_in_wp):
-        set_setting_value(db, 'system.roles.moderator', moder_roles_in_wp, is_force=True)
-
-    user_roles_in_wp = wp_roles["users"]
-    users_roles_list = db.query(Configs).filter(Configs.name.ilike('%user%')).first()
-    user_roles_in_db = users_roles_list.value if users_roles_list else []
-    if sorted(user_roles_in_db) != sorted(user_roles_in_wp):
-        set_setting_value(db, 'system.roles.user', user_roles_in_wp, is_force=True)
+    roles_by_category = config_snapshot.derive('roles_by_category', _build_roles_by_category)
+    for group, category in ROLE_GROUP_CATEGORIES.items():
+        roles_in_wp = wp_roles[group]
+        if roles_by_category.get(category, frozenset()) != frozenset(roles_in_wp):
+            set_setting_value(db, f'{ROLES_CONFIG_PREFIX}{category}', roles_in_wp, is_force=True)
 
 
 def get_user_category(db: Session, user_roles: List[str]) -> List[str]:
     """
-    Определить категорию пользователя на основе его ролей и конфигурации в БД.
+    Определить категорию пользователя на основе его ролей и настроек system.roles.*.
+    Карта роль -> категории строится один раз на версию снимка настроек.
     """
+    role_categories = config_snapshot.derive('role_categories', _build_role_categories)
     categories = set()
-    configs = db.query(Configs).filter(Configs.name.ilike('%roles%')).all()
-
     for role in user_roles:
-        for config in configs:
-            if role in config.value:
-                parts = config.name.split('.')
-                if len(parts) >= 3:
-                    categories.add(parts[2])
+        categories.update(role_categories.get(role, ()))
 
     return list(categories) if categories else ["unknown"]
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Получить текущего пользователя по JWT токену.
     Если токен неверный или просрочен - выбросить ошибку 401.
+    При authorization.backend = 'wordpress' токен проверяет WordPress, ответы кэшируются (wp_user_cache).
     """
-    # user_info = get_wp_user_info(token) # При авторизации через WordPress
-    user_info = get_local_user_info(token)
+    if AUTH_BACKEND == 'wordpress':
+        try:
+            user_info = await wp_user_cache.get(token)
+        except WordPressUnavailable:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail='Сервис авторизации WordPress временно недоступен.')
+    else:
+        user_info = get_local_user_info(token)
     if not user_info:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -163,11 +194,14 @@ async def external_login(
     if not username or not password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Неверные логин или пароль.')
 
-    token = get_wp_token(username, password)
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Некорректные данные для входа.')
-
-    user_info = get_wp_user_info(token)
+    try:
+        token = await get_wp_token(username, password)
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Некорректные данные для входа.')
+        user_info = await get_wp_user_info(token)
+    except WordPressUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail='Сервис авторизации WordPress временно недоступен.')
     if not user_info:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail='Не удалось получить данные пользователя.')
 
@@ -188,6 +222,17 @@ async def external_login(
 Conf = config.settings['authorization']
 LOCAL_JWT_TOKEN = Conf["local_jwt_key"]
 LOCAL_ALGORITHM = "HS256"
+LOCAL_TOKEN_TTL_SECONDS = int(Conf.get("local_token_ttl_minutes", 60) * 60)
+# Проверенные локальные токены: повторная проверка подписи не нужна до истечения срока
+verified_tokens = TokenCache(Conf.get("token_cache_size", 1024))
+# Кто проверяет токены запросов: 'local' (локальные JWT) или 'wordpress'
+AUTH_BACKEND = Conf.get("backend", "local")
+wp_user_cache = WordPressUserCache(
+    get_wp_user_info,
+    ttl=Conf.get("wp_user_cache_ttl", 60),
+    negative_ttl=Conf.get("wp_user_cache_negative_ttl", 10),
+    maxsize=Conf.get("wp_user_cache_size", 10000),
+)
 
 local_users_db = {
     "admin": {
@@ -224,14 +269,15 @@ async def local_login(
     if username not in local_users_db or password != username:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Некорректные данные для входа.')
 
-    # Создаем токен
-    token = f"local-token-{username}-{secrets.token_hex(8)}"
     user_data = local_users_db[username]
 
     # Обновляем конфигурацию ролей
     update_roles_in_config(db, test_wp_roles_dict)
     category = get_user_category(db, user_data["roles"])
 
+    # Создаем подписанный токен с ролями и категорией пользователя
+    token = create_local_token(username, user_data, category)
+
     return ExternalLoginResponse(
         username=user_data["name"],
         wp_id=user_data["id"],
@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TokenCache:
+    """
+    LRU-кэш проверенных токенов: токен -> данные пользователя до момента expires_at.
+
+    Повторные запросы с тем же токеном не проверяют подпись заново. Просроченная запись
+    при обращении удаляется, поэтому кэш не продлевает жизнь токена. При переполнении
+    вытесняется давно не использованный токен.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._items[token]
+                self.misses += 1
+                return None
+            self._items.move_to_end(token)
+            self.hits += 1
+            return value
+
+    def put(self, token: str, value: Any, expires_at: float):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[token] = (value, expires_at)
+            self._items.move_to_end(token)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+WP_TOKEN_PATH = '/wp-json/jwt-auth/v1/token'
+WP_USER_INFO_PATH = '/wp-json/wp/v2/users/me'
+# Ответы, после которых запрос повторяется: WordPress или прокси перед ним временно недоступны
+RETRY_STATUSES = (502, 503, 504)
+
+
+class WordPressUnavailable(Exception):
+    """
+    WordPress не ответил за отведенное время и число попыток или цепь разомкнута.
+    """
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи: после failure_threshold подряд неудачных запросов запросы не отправляются
+    reset_seconds секунд, затем пропускается один пробный запрос. Успех замыкает цепь,
+    неудача снова размыкает ее, а прерванный без результата пробный запрос (отмена)
+    освобождается через release_probe, и пробу делает следующий запрос.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    Бюджет повторов: каждый запрос пополняет его на ratio, каждый повтор тратит единицу.
+    Так повторы не превышают заданной доли от общего потока и не умножают нагрузку
+    на и без того перегруженный WordPress. min_per_second повторов разрешено всегда.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class WordPressClient:
+    """
+    Асинхронный клиент WordPress API с пулом соединений, таймаутами,
+    бюджетом повторов и размыкателем цепи.
+
+    httpx.AsyncClient создается при первом запросе (в цикле событий приложения)
+    и закрывается через aclose() при остановке приложения.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 5.0, connect_timeout: float = 2.0,
+                 max_connections: int = 20, max_retries: int = 2, backoff_seconds: float = 0.1,
+                 breaker: Optional[CircuitBreaker] = None, retry_budget: Optional[RetryBudget] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits,
+                                             transport=self.transport)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Выполнить запрос с повторами при сетевых ошибках и ответах 502/503/504.
+        Ответы 4xx считаются успешными для цепи: WordPress доступен, просто отказал.
+        """
+        if not self.breaker.allow():
+            raise WordPressUnavailable('Цепь разомкнута: WordPress недавно был недоступен')
+        # Между allow() и этой проверкой нет await: полуоткрытая цепь значит, что это пробный запрос
+        probe = self.breaker.state == 'half-open'
+        try:
+            return await self._send(method, path, **kwargs)
+        except WordPressUnavailable:
+            raise
+        except BaseException:
+            # Запрос прерван без результата (отмена при отключении клиента и т.п.): без освобождения
+            # пробы цепь осталась бы разомкнутой до перезапуска воркера
+            if probe:
+                self.breaker.release_probe()
+            raise
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                response = await self._http().request(method, path, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                error = f'WordPress ответил {response.status_code}'
+            except httpx.TransportError as e:
+                error = f'{type(e).__name__}: {e}'
+            if attempt >= self.max_retries or not self.retry_budget.withdraw():
+                self.breaker.record_failure()
+                logger.warning('Запрос %s %s к WordPress не удался: %s', method, path, error)
+                raise WordPressUnavailable(error)
+            attempt += 1
+            await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+
+    async def get_token(self, username: str, password: str) -> Optional[str]:
+        response = await self._request('POST', WP_TOKEN_PATH, json={"username": username, "password": password})
+        if response.status_code == 200:
+            return response.json().get("token")
+        return None
+
+    async def get_user_info(self, token: str) -> Optional[dict]:
+        response = await self._request('GET', WP_USER_INFO_PATH, headers={"Authorization": f"Bearer {token}"})
+        if response.status_code == 200:
+            return response.json()
+        return None
+
+
+WordPressConf = settings.get('wordpress', {})
+wp_client = WordPressClient(
+    WordPressConf.get('base_url', 'https://petsfans.ru'),
+    timeout=WordPressConf.get('timeout', 5.0),
+    connect_timeout=WordPressConf.get('connect_timeout', 2.0),
+    max_connections=WordPressConf.get('max_connections', 20),
+    max_retries=WordPressConf.get('max_retries', 2),
+    breaker=CircuitBreaker(WordPressConf.get('breaker_failures', 5), WordPressConf.get('breaker_reset_seconds', 30)),
+    retry_budget=RetryBudget(WordPressConf.get('retry_ratio', 0.2)),
+)
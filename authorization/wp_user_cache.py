@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from jose import jwt, JWTError
+
+from authorization.token_cache import TokenCache
+
+# Отметка в кэше для токена, который WordPress отверг
+_INVALID = object()
+
+
+class WordPressUserCache:
+    """
+    Кэш ответов WordPress users/me: токен -> данные пользователя.
+
+    - Успешный ответ хранится ttl секунд, но не дольше срока действия самого JWT (claim exp).
+    - Отказ WordPress (неверный или просроченный токен) хранится negative_ttl секунд,
+      чтобы перебор неверных токенов не превращался в поток запросов к WordPress.
+    - Одновременные запросы с одним и тем же непроверенным токеном ждут один общий запрос к WordPress;
+      если его отменили (клиент отключился), ожидающие повторяют проверку сами.
+    - Ошибки доступности WordPress не кэшируются и передаются всем ожидающим.
+    Размер ограничен maxsize записей с вытеснением давно не использованных.
+    """
+
+    def __init__(self, lookup: Callable[[str], Awaitable[Optional[dict]]], ttl: float = 60.0,
+                 negative_ttl: float = 10.0, maxsize: int = 10000):
+        self.lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = TokenCache(maxsize)
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _expires_at(self, token: str, now: float) -> float:
+        expires_at = now + self.ttl
+        try:
+            token_exp = jwt.get_unverified_claims(token).get('exp')
+        except JWTError:
+            token_exp = None
+        if isinstance(token_exp, (int, float)):
+            expires_at = min(expires_at, token_exp)
+        return expires_at
+
+    async def get(self, token: str) -> Optional[dict]:
+        """
+        Данные пользователя по токену или None, если WordPress его не принял.
+        """
+        cached = self._cache.get(token)
+        if cached is _INVALID:
+            self.negative_hits += 1
+            return None
+        if cached is not None:
+            self.hits += 1
+            return cached
+        if future := self._in_flight.get(token):
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменен ведущий запрос (например, его клиент отключился), а не этот:
+                # проверка повторяется, и этот запрос может сам стать ведущим
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get(token)
+                raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[token] = future
+        try:
+            user_info = await self.lookup(token)
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже передано вызывающему; без этого asyncio предупредит о непрочитанном исключении
+            future.exception()
+            raise
+        except BaseException:
+            # Запрос к WordPress отменен: ожидающие не должны ждать результата вечно
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[token]
+        now = time.time()
+        if user_info:
+            self._cache.put(token, user_info, self._expires_at(token, now))
+        else:
+            self._cache.put(token, _INVALID, now + self.negative_ttl)
+        future.set_result(user_info)
+        return user_info
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        return {
+            'size': len(self._cache),
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_ratio': round((self.hits + self.negative_hits + self.coalesced) / lookups, 4) if lookups else None,
+        }
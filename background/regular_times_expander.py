@@ -0,0 +1,146 @@
+import heapq
+import logging
+import threading
+import time as monotonic_time
+from datetime import datetime, timedelta, time
+from typing import Optional
+
+from fastapi import HTTPException
+
+from database.crud.regular_times_crud import get_regular_time_schedules
+from database.crud.task_lists_crud import bulk_insert_task_lists, get_regular_task_templates
+from database.models.regular_times_model import weekday_bit
+
+logger = logging.getLogger(__name__)
+
+
+def next_fire_time(days_mask: int, timing: Optional[time], after: datetime) -> Optional[datetime]:
+    """
+    Ближайшее время срабатывания расписания строго после after.
+    days_mask - 7-битная маска дней недели (см. RegularTimes.days_mask).
+    Возвращает None, если расписание никогда не срабатывает.
+    """
+    if timing is None or not days_mask:
+        return None
+    for offset in range(8):
+        day = after.date() + timedelta(days=offset)
+        candidate = datetime.combine(day, timing)
+        if candidate > after and days_mask & weekday_bit(candidate.isoweekday()):
+            return candidate
+    return None
+
+
+class RegularTimesExpander:
+    """
+    Генератор заданий по регулярным расписаниям.
+
+    Для каждого расписания создает задания TaskLists на horizon_hours вперед.
+    Шаблоны заданий (устройство и команда) берутся из уже существующих заданий,
+    ссылающихся на расписание через regular_time_id.
+
+    Расписания хранятся в куче по времени следующего срабатывания, поэтому
+    каждый тик обрабатывает только наступившие слоты, а не все расписания.
+    Перед вставкой уже существующие слоты отсеиваются, так что перезапуск
+    или несколько воркеров не создают дублей.
+    """
+
+    def __init__(self, session_factory, horizon_hours: int = 24, tick_seconds: int = 60,
+                 reload_seconds: int = 300, batch_size: int = 500, on_created=None):
+        self.session_factory = session_factory
+        self.on_created = on_created
+        self.horizon = timedelta(hours=horizon_hours)
+        self.tick_seconds = tick_seconds
+        self.reload_seconds = reload_seconds
+        self.batch_size = batch_size
+
+        self._heap: list[tuple[datetime, int]] = []
+        self._schedules: dict[int, tuple] = {}
+        self._templates: dict[int, list[tuple[str, str]]] = {}
+        self._loaded_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def reload(self, db, now: datetime):
+        """
+        Перечитать расписания и шаблоны и заново построить кучу от текущего момента.
+        """
+        self._schedules = {row.id: (row.days_mask, row.timing) for row in get_regular_time_schedules(db)}
+        self._templates = get_regular_task_templates(db)
+        self._heap = []
+        for regular_time_id, (days_mask, timing) in self._schedules.items():
+            fire_at = next_fire_time(days_mask, timing, now)
+            if fire_at is not None:
+                self._heap.append((fire_at, regular_time_id))
+        heapq.heapify(self._heap)
+        self._loaded_at = monotonic_time.monotonic()
+
+    def _pop_due(self, until: datetime) -> list[tuple[int, datetime]]:
+        due = []
+        while self._heap and self._heap[0][0] <= until:
+            fire_at, regular_time_id = heapq.heappop(self._heap)
+            due.append((regular_time_id, fire_at))
+            days_mask, timing = self._schedules[regular_time_id]
+            next_at = next_fire_time(days_mask, timing, fire_at)
+            if next_at is not None:
+                heapq.heappush(self._heap, (next_at, regular_time_id))
+        return due
+
+    def run_once(self, now: Optional[datetime] = None) -> list[dict]:
+        """
+        Один тик: создать задания для слотов, попадающих в горизонт планирования.
+        Возвращает список вставленных строк.
+        """
+        now = now or datetime.now()
+        db = self.session_factory()
+        try:
+            if self._loaded_at is None or monotonic_time.monotonic() - self._loaded_at >= self.reload_seconds:
+                self.reload(db, now)
+
+            due = self._pop_due(now + self.horizon)
+            rows = []
+            for regular_time_id, fire_at in due:
+                for device_id, cmd in self._templates.get(regular_time_id, []):
+                    rows.append({'device_id': device_id,
+                                 'cmd': cmd,
+                                 'is_regular': True,
+                                 'timing': fire_at,
+                                 'regular_time_id': regular_time_id,
+                                 'status': 'Ожидает'})
+            if not rows:
+                return []
+            # Уже созданные слоты (повторный проход, другой воркер) bulk_insert_task_lists пропускает
+            rows = bulk_insert_task_lists(db, rows, self.batch_size)
+            if not rows:
+                return []
+            if self.on_created:
+                self.on_created(rows)
+            return rows
+        except HTTPException as e:
+            # Например, гонка с другим воркером: слоты будут перепроверены после перезагрузки
+            logger.warning('Не удалось создать регулярные задания: %s', e.detail)
+            self._loaded_at = None
+            return []
+        finally:
+            db.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception('Ошибка генератора регулярных заданий')
+                self._loaded_at = None
+            self._stop.wait(self.tick_seconds)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='regular-times-expander', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.tick_seconds)
+            self._thread = None
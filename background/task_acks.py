@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database.crud.task_lists_crud import bulk_ack_task_lists
+from database.db import session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class TaskAckBatcher:
+    """
+    Накопитель подтверждений статусов заданий от устройств.
+
+    Подтверждения складываются в память и записываются пачками через
+    bulk_ack_task_lists: по достижении max_batch или раз в flush_interval секунд.
+    Соединения (WebSocket) не держат сессию БД - она открывается только на время записи.
+    """
+
+    def __init__(self, session_factory, flush_interval: float = 0.5, max_batch: int = 1000):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: dict[str, list[tuple[str, str]]] = {}
+        self._size = 0
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def add(self, device_id: str, acks: list[tuple[str, str]]):
+        """
+        Поставить подтверждения устройства в очередь на запись. Вызывается из цикла событий.
+        """
+        self._pending.setdefault(str(device_id), []).extend(acks)
+        self._size += len(acks)
+        if self._size >= self.max_batch and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _write(self, batch: dict[str, list[tuple[str, str]]]):
+        db = self.session_factory()
+        try:
+            for device_id, acks in batch.items():
+                try:
+                    bulk_ack_task_lists(db, device_id, acks)
+                except HTTPException as e:
+                    logger.warning('Не удалось записать подтверждения устройства %s: %s', device_id, e.detail)
+        finally:
+            db.close()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending, self._size = self._pending, {}, 0
+        await run_in_threadpool(self._write, batch)
+
+    async def run(self):
+        """
+        Фоновый цикл записи. Запускается в lifespan приложения.
+        """
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception('Ошибка записи подтверждений заданий')
+        finally:
+            await self.flush()
+
+
+TaskEventsConf = settings.get('task_events', {})
+task_ack_batcher = TaskAckBatcher(
+    session_maker,
+    flush_interval=TaskEventsConf.get('ack_flush_seconds', 0.5),
+    max_batch=TaskEventsConf.get('ack_max_batch', 1000),
+)
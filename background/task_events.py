@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from database.crud.task_lists_crud import get_task_lists_due_between
+
+logger = logging.getLogger(__name__)
+
+
+class TaskEventHub:
+    """
+    Внутрипроцессная рассылка заданий подписанным устройствам.
+
+    Подписчик - asyncio.Queue на устройство (long-poll, SSE, WebSocket).
+    Публикация потокобезопасна: ее можно вызывать из синхронных обработчиков
+    и фоновых потоков, доставка выполняется в цикле событий.
+    Одно событие раздается всем подписчикам устройства без обращения к БД.
+    Хаб работает в пределах одного процесса: другие воркеры узнают о задании
+    через проверку наступивших заданий (watch_due_task_lists).
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, device_id: str) -> asyncio.Queue:
+        """
+        Подписать устройство. Вызывается из цикла событий.
+        """
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(str(device_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, device_id: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(str(device_id))
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[str(device_id)]
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish_tasks(self, tasks: list[dict]):
+        """
+        Разослать задания подписчикам их устройств.
+        """
+        if not tasks or self._loop is None or not self._subscribers:
+            return
+        by_device = {}
+        for task in tasks:
+            by_device.setdefault(str(task['device_id']), []).append(task)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(by_device)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, by_device)
+
+    def _deliver(self, by_device: dict[str, list[dict]]):
+        for device_id, tasks in by_device.items():
+            with self._lock:
+                queues = list(self._subscribers.get(device_id, ()))
+            for queue in queues:
+                if queue.full():
+                    # Медленный подписчик: отбрасываем самое старое событие
+                    queue.get_nowait()
+                queue.put_nowait(tasks)
+
+
+async def wait_tasks(queue: asyncio.Queue, timeout: float) -> list[dict]:
+    """
+    Дождаться заданий из очереди подписчика (не дольше timeout секунд)
+    и забрать все, что уже накопилось.
+    """
+    try:
+        tasks = list(await asyncio.wait_for(queue.get(), timeout))
+    except asyncio.TimeoutError:
+        return []
+    while not queue.empty():
+        tasks.extend(queue.get_nowait())
+    return tasks
+
+
+async def watch_due_task_lists(hub: TaskEventHub, session_factory, interval: float = 1.0):
+    """
+    Периодически находит задания, время которых наступило с прошлой проверки,
+    и рассылает их через хаб. Один запрос на тик для всех подписчиков;
+    пока подписчиков нет, БД не опрашивается.
+    """
+    since = datetime.now()
+    while True:
+        await asyncio.sleep(interval)
+        if not hub.has_subscribers():
+            since = datetime.now()
+            continue
+        until = datetime.now()
+        db = session_factory()
+        try:
+            tasks = await run_in_threadpool(get_task_lists_due_between, db, since, until)
+            hub.publish_tasks(tasks)
+            since = until
+        except Exception:
+            logger.exception('Ошибка проверки наступивших заданий')
+        finally:
+            db.close()
+
+
+task_event_hub = TaskEventHub()
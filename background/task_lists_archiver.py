@@ -0,0 +1,80 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from database.config_snapshot import config_snapshot
+from database.crud.task_lists_crud import archive_finished_task_lists
+
+logger = logging.getLogger(__name__)
+
+# Настройка в Configs: возраст завершенных заданий (в днях), после которого они уходят в архив
+ARCHIVE_AGE_SETTING = 'system.archive.task_lists_max_age_days'
+DEFAULT_ARCHIVE_AGE_DAYS = 30
+
+
+class TaskListsArchiver:
+    """
+    Фоновый перенос завершенных заданий в task_lists_archive.
+
+    Раз в interval_seconds переносит задания старше возраста из Configs
+    пачками по batch_size, делая паузу между пачками, пока не перенесет все.
+    """
+
+    def __init__(self, session_factory, interval_seconds: int = 600, batch_size: int = 1000,
+                 pause_seconds: float = 0.1):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _max_age(self) -> timedelta:
+        try:
+            days = config_snapshot.value(ARCHIVE_AGE_SETTING, DEFAULT_ARCHIVE_AGE_DAYS)
+            return timedelta(days=float(days))
+        except (TypeError, ValueError):
+            return timedelta(days=DEFAULT_ARCHIVE_AGE_DAYS)
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Перенести все задания, подлежащие архивации. Возвращает число перенесенных заданий.
+        """
+        now = now or datetime.now()
+        older_than = now - self._max_age()
+        db = self.session_factory()
+        try:
+            total = 0
+            while not self._stop.is_set():
+                moved = archive_finished_task_lists(db, older_than, self.batch_size)
+                total += moved
+                if moved < self.batch_size:
+                    break
+                self._stop.wait(self.pause_seconds)
+            return total
+        finally:
+            db.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                moved = self.run_once()
+                if moved:
+                    logger.info('Перенесено в архив заданий: %s', moved)
+            except Exception:
+                logger.exception('Ошибка архивации заданий')
+            self._stop.wait(self.interval_seconds)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='task-lists-archiver', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
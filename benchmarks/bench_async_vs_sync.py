@@ -0,0 +1,90 @@
+"""
+Сравнение пропускной способности CRUD-эндпоинтов в синхронном и асинхронном режимах.
+
+Запуск: python -m benchmarks.bench_async_vs_sync [--seconds 5] [--concurrency 50]
+Каждый режим запускается в отдельном процессе на своем SQLite-файле
+(sqlite+pysqlite для синхронного, sqlite+aiosqlite для асинхронного).
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from tests.settings import install_settings, create_schema
+
+
+async def _load(app, seconds: float, concurrency: int, ids: list[int]):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        login = await client.post('/authorization_local', data={'username': 'admin', 'password': 'admin'})
+        headers = {'Authorization': f"Bearer {login.json()['access_token']}"}
+        done = 0
+        errors = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker(n: int):
+            nonlocal done, errors
+            i = n
+            while time.perf_counter() < deadline:
+                if i % 2:
+                    response = await client.get('/device_models/all_device_models', params={'limit': 50},
+                                                headers=headers)
+                else:
+                    response = await client.get(f'/device_models/get_device_model/{ids[i % len(ids)]}',
+                                                headers=headers)
+                if response.status_code == 200:
+                    done += 1
+                else:
+                    errors += 1
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {'requests': done, 'errors': errors, 'rps': round(done / elapsed, 1)}
+
+
+def run_mode(mode: str, seconds: float, concurrency: int):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    install_settings(db_path, database={'async_mode': mode == 'async'})
+    create_schema()
+    from database.db import session_maker
+    from database.models import DeviceModels
+    db = session_maker()
+    db.add_all([DeviceModels(name=f'model-{i}') for i in range(1000)])
+    db.commit()
+    ids = [row.id for row in db.query(DeviceModels.id)]
+    db.close()
+
+    from api.service import app
+    result = asyncio.run(_load(app, seconds, concurrency, ids))
+    result['mode'] = mode
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['sync', 'async'])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.seconds, args.concurrency)
+        return
+    for mode in ('sync', 'async'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_async_vs_sync', '--mode', mode,
+             '--seconds', str(args.seconds), '--concurrency', str(args.concurrency)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        print(f"{result['mode']:>5}: {result['rps']} req/s ({result['requests']} ok, {result['errors']} errors)")
+
+
+if __name__ == '__main__':
+    main()
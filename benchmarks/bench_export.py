@@ -0,0 +1,84 @@
+"""
+Выгрузка заданий: одним ответом JSON (все записи в памяти) против потоковой выгрузки
+export_task_lists (серверный курсор + пачки по EXPORT_CHUNK_SIZE).
+
+Запуск: python -m benchmarks.bench_export [--rows 200000 500000]
+Для каждого числа строк измеряются время и пик памяти по tracemalloc;
+у потоковой выгрузки пик не должен расти с числом строк.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+from tests.settings import install_settings, create_schema
+
+
+def _measure(func) -> tuple[float, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = func()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[200000, 500000])
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    create_schema()
+    from sqlalchemy import delete, insert
+    from api.responses import export_response, json_response
+    from api.schemas.task_lists_schema import TaskListsSchemaGet
+    from database.crud.task_lists_crud import iter_task_lists
+    from database.db import session_maker, read_session
+    from database.models import TaskLists
+
+    def whole_response() -> int:
+        with read_session() as db:
+            return len(json_response(List[TaskListsSchemaGet], list(iter_task_lists(db))).body)
+
+    def streamed(compress: bool):
+        def run() -> int:
+            def rows():
+                with read_session() as db:
+                    yield from iter_task_lists(db)
+
+            async def consume() -> int:
+                response = export_response(rows(), TaskListsSchemaGet, 'ndjson', compress, 'task_lists')
+                return sum([len(chunk) async for chunk in response.body_iterator])
+            return asyncio.run(consume())
+        return run
+
+    started_at = datetime(2026, 1, 1)
+    for count in args.rows:
+        db = session_maker()
+        db.execute(delete(TaskLists))
+        for start in range(0, count, 10000):
+            db.execute(insert(TaskLists), [
+                {'id': str(uuid4()), 'device_id': str(uuid4()), 'cmd': f'feed {i % 50}',
+                 'is_regular': bool(i % 2), 'timing': started_at + timedelta(seconds=i),
+                 'regular_time_id': None, 'status': 'Ожидает'}
+                for i in range(start, min(start + 10000, count))
+            ])
+        db.commit()
+        db.close()
+        print(f'строк: {count}')
+        for name, run in {'один ответ JSON': whole_response,
+                          'поток NDJSON': streamed(False),
+                          'поток NDJSON + gzip': streamed(True)}.items():
+            seconds, peak_mb, size = _measure(run)
+            print(f'{name:>22}: {seconds:7.2f} с, пик памяти {peak_mb:7.1f} МБ, ответ {size / 2 ** 20:7.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Регистрация устройств: по одному create_device (отдельный commit на устройство)
+против импорта файла пачками (import_devices_chunk).
+
+Запуск: python -m benchmarks.bench_import [--devices 20000]
+Печатается время регистрации всех устройств каждым способом.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from tests.settings import install_settings, create_schema
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, default=20000)
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    create_schema()
+    from sqlalchemy import delete
+    from api.schemas.devices_schema import DeviceSchemaPost
+    from api.uploads import read_upload_records, validated_chunks
+    from database.crud.devices_crud import create_device, import_devices_chunk
+    from database.db import session_maker
+    from database.models import Devices, DeviceModels, Enterprises, FilialEnterprises
+
+    db = session_maker()
+    db.add(Enterprises(inn='1234567890', ogrn='1234567890123', kpp='123456789', name='bench', adres='bench'))
+    db.add_all([DeviceModels(name=f'model-{i}') for i in range(10)])
+    db.add_all([FilialEnterprises(inn='1234567890', adres=f'filial-{i}') for i in range(10)])
+    db.commit()
+
+    def records():
+        return [{'model_id': i % 10 + 1, 'serial_number': f'SN-{i:08d}', 'filial_id': i % 10 + 1}
+                for i in range(args.devices)]
+
+    def one_by_one():
+        for record in records():
+            create_device(db, Devices(**DeviceSchemaPost.model_validate(record).model_dump()))
+            db.expunge_all()
+
+    def imported():
+        body = 'model_id,serial_number,filial_id\n' + ''.join(
+            f"{record['model_id']},{record['serial_number']},{record['filial_id']}\n" for record in records())
+        seen_serial_numbers = set()
+        for rows, errors in validated_chunks(read_upload_records(io.BytesIO(body.encode()), 'csv'), DeviceSchemaPost):
+            created, rejected = import_devices_chunk(db, rows, seen_serial_numbers)
+            assert not errors and not rejected
+
+    print(f'устройств: {args.devices}')
+    for name, run in {'по одному create_device': one_by_one, 'импорт файла пачками': imported}.items():
+        db.execute(delete(Devices))
+        db.commit()
+        started = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - started
+        print(f'{name:>26}: {seconds:7.2f} с, {args.devices / seconds:9.0f} устройств/с, '
+              f'в таблице {db.query(Devices).count()}')
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
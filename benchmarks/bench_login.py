@@ -0,0 +1,83 @@
+"""
+Задержка локального логина (/authorization_local): прежняя схема с ilike-запросами к configs
+на каждый вход против карты ролей из снимка настроек.
+
+Запуск: python -m benchmarks.bench_login [--logins 2000]
+Прежняя схема воспроизводится функциями ниже (как они были в authorization/auth.py)
+и подставляется в модуль авторизации вместо текущих.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from tests.settings import install_settings, create_schema
+
+
+def legacy_update_roles_in_config(db, wp_roles: dict):
+    from authorization.auth import set_setting_value
+    from database.models import Configs
+    for group, pattern, name in (('admins', '%administrator%', 'system.roles.administrator'),
+                                 ('moders', '%moderator%', 'system.roles.moderator'),
+                                 ('users', '%user%', 'system.roles.user')):
+        row = db.query(Configs).filter(Configs.name.ilike(pattern)).first()
+        if sorted(row.value if row else []) != sorted(wp_roles[group]):
+            set_setting_value(db, name, wp_roles[group], is_force=True)
+
+
+def legacy_get_user_category(db, user_roles: list) -> list:
+    from database.models import Configs
+    categories = set()
+    configs = db.query(Configs).filter(Configs.name.ilike('%roles%')).all()
+    for role in user_roles:
+        for config in configs:
+            if role in config.value:
+                parts = config.name.split('.')
+                if len(parts) >= 3:
+                    categories.add(parts[2])
+    return list(categories) if categories else ["unknown"]
+
+
+async def _logins(app, count: int) -> list[float]:
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.post('/authorization_local', data={'username': 'admin', 'password': 'admin'})
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def _report(name: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f'{name:>8}: среднее {statistics.mean(latencies):.2f} мс, p50 {statistics.median(latencies):.2f} мс, '
+          f'p95 {p95:.2f} мс')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--logins', type=int, default=2000)
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    create_schema()
+    import authorization.auth as auth
+    from api.service import app
+    current = (auth.update_roles_in_config, auth.get_user_category)
+
+    # Прогрев: первый вход записывает роли в configs
+    asyncio.run(_logins(app, 10))
+    auth.update_roles_in_config, auth.get_user_category = legacy_update_roles_in_config, legacy_get_user_category
+    _report('прежний', asyncio.run(_logins(app, args.logins)))
+    auth.update_roles_in_config, auth.get_user_category = current
+    _report('текущий', asyncio.run(_logins(app, args.logins)))
+
+
+if __name__ == '__main__':
+    main()
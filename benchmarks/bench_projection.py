@@ -0,0 +1,112 @@
+"""
+Чтение списков заданий: прежняя схема (полные ORM-объекты TaskLists, затем копирование полей в словари)
+против выборки только нужных столбцов.
+
+Запуск: python -m benchmarks.bench_projection [--rows 500000] [--page 1000]
+Измеряются обход всей таблицы страницами get_all_task_lists и одна большая выборка
+get_task_lists_due_between по всем строкам; для каждой - время и пик памяти по tracemalloc.
+Прежняя схема воспроизводится функциями ниже (как они были в database/crud/task_lists_crud.py).
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from tests.settings import install_settings, create_schema
+
+
+def _as_dict(task) -> dict:
+    return {'id': task.id,
+            'device_id': task.device_id,
+            'cmd': task.cmd,
+            'is_regular': task.is_regular,
+            'timing': task.timing,
+            'regular_time_id': task.regular_time_id,
+            'status': task.status}
+
+
+def legacy_page(db, limit: int, cursor):
+    from database.crud.pagination import apply_keyset, split_page
+    from database.models import TaskLists
+    query = db.query(TaskLists).filter(TaskLists.timing.isnot(None))
+    tasks = apply_keyset(query, [TaskLists.timing, TaskLists.id], cursor, limit).all()
+    return split_page([_as_dict(task) for task in tasks], ['timing', 'id'], limit)
+
+
+def legacy_due_between(db, since: datetime, until: datetime) -> list:
+    from database.models import TaskLists
+    tasks = (
+        db.query(TaskLists)
+        .filter(TaskLists.status == 'Ожидает', TaskLists.timing > since, TaskLists.timing <= until)
+        .all()
+    )
+    return [_as_dict(task) for task in tasks]
+
+
+def _measure(func) -> tuple[float, float, int]:
+    started = time.perf_counter()
+    count = func()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20, count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--page', type=int, default=1000)
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    create_schema()
+    from sqlalchemy import insert
+    from database.crud.task_lists_crud import get_all_task_lists, get_task_lists_due_between
+    from database.db import session_maker
+    from database.models import TaskLists
+
+    started_at = datetime(2026, 1, 1)
+    device_ids = [str(uuid4()) for _ in range(100)]
+    db = session_maker()
+    for start in range(0, args.rows, 10000):
+        db.execute(insert(TaskLists), [
+            {'id': str(uuid4()), 'device_id': device_ids[i % len(device_ids)], 'cmd': f'feed {i % 50}',
+             'is_regular': bool(i % 2), 'timing': started_at + timedelta(seconds=i),
+             'regular_time_id': None, 'status': 'Ожидает'}
+            for i in range(start, min(start + 10000, args.rows))
+        ])
+    db.commit()
+
+    def walk(read_page):
+        def run():
+            rows, cursor = read_page(None)
+            count = len(rows)
+            while cursor:
+                rows, cursor = read_page(cursor)
+                count += len(rows)
+                db.expunge_all()
+            return count
+        return run
+
+    since, until = started_at - timedelta(seconds=1), started_at + timedelta(seconds=args.rows)
+    results = {
+        'страницы, ORM-объекты': walk(lambda cursor: legacy_page(db, args.page, cursor)),
+        'страницы, столбцы': walk(lambda cursor: get_all_task_lists(db, limit=args.page, cursor=cursor)),
+        'одна выборка, ORM-объекты': lambda: len(legacy_due_between(db, since, until)),
+        'одна выборка, только столбцы': lambda: len(get_task_lists_due_between(db, since, until)),
+    }
+    print(f'строк: {args.rows}, страница: {args.page}')
+    for name, run in results.items():
+        db.expunge_all()
+        seconds, peak_mb, count = _measure(run)
+        print(f'{name:>34}: {seconds:7.2f} с, пик памяти {peak_mb:7.1f} МБ, строк {count}')
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Чтение справочников через кэш запросов: без кэша, MemoryCacheBackend и RedisCacheBackend
+(на локальной замене Redis с задержкой команды --redis-latency).
+
+Запуск: python -m benchmarks.bench_query_cache [--reads 20000] [--write-every 200] [--redis-latency 0.0002]
+Поток чтений страниц и записей по ключу моделей устройств; каждая write-every-я операция -
+изменение модели (сбрасывает кэш таблицы). Печатается среднее время операции и доля попаданий.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from tests.settings import install_settings, create_schema
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reads', type=int, default=20000)
+    parser.add_argument('--write-every', type=int, default=200)
+    parser.add_argument('--redis-latency', type=float, default=0.0002)
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    create_schema()
+    from benchmarks.fake_redis import FakeRedis
+    from database.crud.device_models_crud import get_all_device_models, get_device_model_by_id, update_device_model
+    from database.db import session_maker
+    from database.models import DeviceModels
+    from database.query_cache import query_cache, MemoryCacheBackend, RedisCacheBackend
+
+    db = session_maker()
+    db.add_all([DeviceModels(name=f'model-{i}') for i in range(500)])
+    db.commit()
+
+    def run() -> float:
+        started = time.perf_counter()
+        for i in range(args.reads):
+            if i % args.write_every == 0:
+                update_device_model(db, 1, {'name': f'model-{i}'})
+            elif i % 2:
+                get_all_device_models(db, limit=100)
+            else:
+                get_device_model_by_id(db, i % 50 + 1)
+            db.expunge_all()
+        return (time.perf_counter() - started) / args.reads * 1e6
+
+    backends = {
+        'без кэша': None,
+        'memory': MemoryCacheBackend(),
+        f'redis (замена, {args.redis_latency * 1e6:.0f} мкс/команда)': RedisCacheBackend(FakeRedis(args.redis_latency)),
+    }
+    for name, backend in backends.items():
+        query_cache.enabled = backend is not None
+        if backend is not None:
+            query_cache.backend = backend
+        before = query_cache.stats()
+        microseconds = run()
+        after = query_cache.stats()
+        hits, misses = after['hits'] - before['hits'], after['misses'] - before['misses']
+        ratio = f'{hits / (hits + misses):.3f}' if hits + misses else '-'
+        print(f'{name:>36}: {microseconds:8.1f} мкс/операция, доля попаданий {ratio}')
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
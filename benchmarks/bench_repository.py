@@ -0,0 +1,63 @@
+"""
+Накладные расходы на чтение записи по первичному ключу: запрос, собираемый на каждый вызов
+(db.query(...).filter(...).first(), как было в CRUD-модулях), против готового запроса Repository.
+
+Запуск: python -m benchmarks.bench_repository [--calls 20000]
+Отдельно измеряется только построение запроса и ключа кэша компиляции, без обращения к БД.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from tests.settings import install_settings, create_schema
+
+
+def _per_call(func, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    create_schema()
+    from sqlalchemy import bindparam, select
+    from database.crud.device_models_crud import device_models_repository
+    from database.db import session_maker
+    from database.models import DeviceModels
+
+    db = session_maker()
+    db.add_all([DeviceModels(name=f'model-{i}') for i in range(1000)])
+    db.commit()
+    ids = [row.id for row in db.query(DeviceModels.id)]
+
+    def ad_hoc(i):
+        db.query(DeviceModels).filter(DeviceModels.id == ids[i % len(ids)]).first()
+        db.expunge_all()
+
+    def repository(i):
+        device_models_repository.get(db, ids[i % len(ids)])
+        db.expunge_all()
+
+    prebuilt = select(DeviceModels).where(DeviceModels.id == bindparam('pk_value'))
+    results = {
+        'построение запроса, ad hoc': _per_call(
+            lambda i: select(DeviceModels).where(DeviceModels.id == ids[i % len(ids)])._generate_cache_key(),
+            args.calls),
+        'построение запроса, готовый': _per_call(lambda i: prebuilt._generate_cache_key(), args.calls),
+        'чтение по ключу, ad hoc': _per_call(ad_hoc, args.calls),
+        'чтение по ключу, Repository': _per_call(repository, args.calls),
+    }
+    db.close()
+    for name, microseconds in results.items():
+        print(f'{name:>30}: {microseconds:8.1f} мкс/вызов')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Сериализация большого списка заданий: прежний путь (model_validate на каждую строку в обработчике,
+затем повторная проверка и сериализация через response_model и JSONResponse, как делает FastAPI)
+против json_response (одна проверка TypeAdapter и сериализация pydantic-core сразу в байты).
+
+Запуск: python -m benchmarks.bench_serialization [--rows 100000] [--repeat 3]
+Для каждого пути печатается лучшее время из repeat прогонов и пик памяти по tracemalloc.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+from tests.settings import install_settings
+
+
+def _measure(func, repeat: int) -> tuple[float, float, int]:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    size = len(func())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2 ** 20, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+    from api.responses import json_response
+    from api.schemas.task_lists_schema import TaskListsSchemaGet
+    from database.models import TaskLists
+
+    started_at = datetime(2026, 1, 1)
+    device_ids = [str(uuid4()) for _ in range(100)]
+    rows = [
+        TaskLists(id=str(uuid4()), device_id=device_ids[i % len(device_ids)], cmd=f'feed {i % 50}',
+                  is_regular=bool(i % 2), timing=started_at + timedelta(minutes=i),
+                  regular_time_id=i % 10 or None, status='Ожидает')
+        for i in range(args.rows)
+    ]
+    field = create_model_field(name='Response', type_=List[TaskListsSchemaGet], mode='serialization')
+
+    def double_validation():
+        validated = [TaskListsSchemaGet.model_validate(m) for m in rows]
+        content = asyncio.run(serialize_response(field=field, response_content=validated))
+        return JSONResponse(content).body
+
+    def single_validation():
+        return json_response(List[TaskListsSchemaGet], rows).body
+
+    results = {
+        'model_validate + response_model': _measure(double_validation, args.repeat),
+        'json_response': _measure(single_validation, args.repeat),
+    }
+    print(f'строк: {args.rows}')
+    for name, (seconds, peak_mb, size) in results.items():
+        print(f'{name:>32}: {seconds * 1000:8.1f} мс, пик памяти {peak_mb:7.1f} МБ, ответ {size / 2 ** 20:.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Пропускная способность /authorization_wp при медленном WordPress (локальная замена с задержкой).
+
+Запуск: python -m benchmarks.bench_wp_login [--seconds 5] [--concurrency 50] [--latency 0.05]
+Сравниваются асинхронный клиент WordPressClient и прежние блокирующие вызовы без таймаутов,
+которые останавливали цикл событий на время каждого запроса к WordPress.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from tests.settings import install_settings, create_schema
+from benchmarks.fake_wordpress import create_fake_wordpress, free_port, serve_in_thread
+
+
+async def _load(app, seconds: float, concurrency: int):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+        done = errors = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal done, errors
+            while time.perf_counter() < deadline:
+                response = await client.post('/authorization_wp', data={'username': 'admin', 'password': 'admin'})
+                if response.status_code == 200:
+                    done += 1
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return done, errors, done / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = serve_in_thread(create_fake_wordpress(latency=args.latency), port)
+    base_url = f'http://127.0.0.1:{port}'
+    install_settings(os.path.join(tempfile.mkdtemp(), 'bench.db'),
+                     wordpress={'base_url': base_url, 'max_connections': args.concurrency})
+    create_schema()
+    import httpx
+    import authorization.auth as auth
+    from api.service import app
+
+    async def blocking_token(username, password):
+        response = httpx.post(f'{base_url}/wp-json/jwt-auth/v1/token', json={"username": username, "password": password})
+        return response.json().get("token") if response.status_code == 200 else None
+
+    async def blocking_user_info(token):
+        response = httpx.get(f'{base_url}/wp-json/wp/v2/users/me', headers={"Authorization": f"Bearer {token}"})
+        return response.json() if response.status_code == 200 else None
+
+    current = (auth.get_wp_token, auth.get_wp_user_info)
+    auth.get_wp_token, auth.get_wp_user_info = blocking_token, blocking_user_info
+    done, errors, rps = asyncio.run(_load(app, args.seconds, args.concurrency))
+    print(f'блокирующий: {rps:.1f} логинов/с ({done} ok, {errors} errors)')
+    auth.get_wp_token, auth.get_wp_user_info = current
+    done, errors, rps = asyncio.run(_load(app, args.seconds, args.concurrency))
+    print(f'асинхронный: {rps:.1f} логинов/с ({done} ok, {errors} errors)')
+    server.should_exit = True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Локальная замена клиента Redis для проверки RedisCacheBackend без сервера Redis.
+
+Реализует используемую кэшем часть интерфейса redis.Redis: get, mget, set (с ex), incr.
+Один экземпляр, переданный в несколько RedisCacheBackend, изображает общий Redis
+для нескольких воркеров. latency - задержка каждой команды (сетевой круг до Redis).
+"""
+import threading
+import time
+from typing import Optional
+
+
+class FakeRedis:
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.commands = 0
+        self._data: dict[str, tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _call(self):
+        self.commands += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._call()
+        with self._lock:
+            return self._get(key)
+
+    def mget(self, keys: list[str]) -> list[Optional[bytes]]:
+        self._call()
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        self._call()
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def incr(self, key: str) -> int:
+        self._call()
+        with self._lock:
+            number = int(self._get(key) or 0) + 1
+            self._data[key] = (str(number).encode(), None)
+            return number
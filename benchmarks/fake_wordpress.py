@@ -0,0 +1,88 @@
+"""
+Локальная замена WordPress для проверки авторизации и нагрузочных тестов.
+
+Запуск: python -m benchmarks.fake_wordpress [--port 8081] [--latency 0.05] [--fail-rate 0.0]
+В настройках приложения указывается settings['wordpress']['base_url'] = 'http://127.0.0.1:8081'.
+Пользователи: пароль совпадает с логином, роли - из FAKE_USERS.
+"""
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+
+from fastapi import FastAPI, Header, HTTPException
+
+FAKE_USERS = {
+    "admin": {"id": 1, "name": "Администратор", "roles": ["administrator"]},
+    "editor": {"id": 2, "name": "Редактор", "roles": ["editor"]},
+    "subscriber": {"id": 3, "name": "Подписчик", "roles": ["subscriber"]},
+}
+
+
+def create_fake_wordpress(latency: float = 0.0, fail_rate: float = 0.0) -> FastAPI:
+    """
+    Приложение с эндпоинтами JWT-токена и текущего пользователя WordPress.
+    latency - задержка каждого ответа в секундах, fail_rate - доля ответов 503.
+    """
+    app = FastAPI()
+    app.state.calls = 0
+
+    async def _simulate():
+        app.state.calls += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if fail_rate and random.random() < fail_rate:
+            raise HTTPException(status_code=503, detail='Service Unavailable')
+
+    @app.post('/wp-json/jwt-auth/v1/token')
+    async def token(credentials: dict):
+        await _simulate()
+        username = credentials.get('username')
+        if username not in FAKE_USERS or credentials.get('password') != username:
+            raise HTTPException(status_code=403, detail='incorrect_password')
+        return {"token": f"fake-{username}"}
+
+    @app.get('/wp-json/wp/v2/users/me')
+    async def users_me(authorization: str = Header('')):
+        await _simulate()
+        username = authorization.removeprefix('Bearer fake-')
+        if username not in FAKE_USERS:
+            raise HTTPException(status_code=401, detail='jwt_auth_invalid_token')
+        user = FAKE_USERS[username]
+        return {"id": user["id"], "name": user["name"], "user": {"roles": user["roles"]}}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app: FastAPI, port: int):
+    """
+    Запустить приложение в uvicorn в фоновом потоке. Возвращает сервер (server.should_exit = True для остановки).
+    """
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_fake_wordpress(args.latency, args.fail_rate), host='127.0.0.1', port=args.port)
+
+
+if __name__ == '__main__':
+    main()
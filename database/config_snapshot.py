@@ -0,0 +1,147 @@
+import logging
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+
+from config import settings
+from database.crud.table_versions_crud import get_table_version, get_table_versions
+from database.db import session_maker
+from database.models import Configs
+from database.query_cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigEntry(NamedTuple):
+    id: int
+    name: str
+    value: Any
+
+
+class ConfigSnapshot:
+    """
+    Снимок таблицы configs в памяти процесса: чтение настройки - поиск в словаре по имени.
+
+    Фоновый поток раз в refresh_seconds читает версию configs из table_versions и перечитывает
+    таблицу, только если версия изменилась, поэтому изменения из других процессов становятся
+    видны не позже чем через refresh_seconds. В своем процессе set_setting_value помечает снимок
+    устаревшим, и следующее чтение перезагружает его сразу.
+    Значения общие для всех читателей и не должны изменяться на месте.
+
+    derive() хранит производные от снимка структуры (например, карту ролей), которые
+    пересчитываются только после перезагрузки снимка.
+    """
+
+    def __init__(self, session_factory, refresh_seconds: float = 5.0):
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._entries: dict[str, ConfigEntry] = {}
+        self._derived: dict[str, tuple[dict, Any]] = {}
+        self._version = None
+        self._loaded = False
+        self._stale = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_version(self, db):
+        row = get_table_version(db, Configs.__tablename__)
+        return row.version if row else 0
+
+    def load(self):
+        """
+        Перечитать все настройки. Версия читается до данных: если между запросами произойдет
+        запись, снимок получит более новые данные со старой версией и просто перечитается еще раз.
+        """
+        db = self.session_factory()
+        try:
+            version = self._read_version(db)
+            rows = db.query(Configs.id, Configs.name, Configs.value).all()
+        finally:
+            db.close()
+        entries = {row.name: ConfigEntry(row.id, row.name, row.value) for row in rows}
+        with self._lock:
+            self._entries = entries
+            self._version = version
+            self._loaded = True
+            self._stale = False
+
+    def refresh(self) -> bool:
+        """
+        Сверить версию configs и перечитать снимок, если она изменилась. Возвращает True при перезагрузке.
+        Попутно версии всех таблиц передаются кэшу запросов (query_cache.sync_versions), чтобы кэш
+        в памяти воркера узнавал о записях других воркеров и для чтений без ETag.
+        """
+        db = self.session_factory()
+        try:
+            versions = get_table_versions(db)
+        finally:
+            db.close()
+        query_cache.sync_versions(versions)
+        version = versions.get(Configs.__tablename__, 0)
+        if self._loaded and not self._stale and version == self._version:
+            return False
+        self.load()
+        return True
+
+    def mark_stale(self):
+        self._stale = True
+
+    def _current(self) -> dict[str, ConfigEntry]:
+        if not self._loaded or self._stale:
+            self.load()
+        return self._entries
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self, name: str) -> Optional[ConfigEntry]:
+        return self._current().get(name)
+
+    def value(self, name: str, default: Any = None) -> Any:
+        entry = self._current().get(name)
+        return entry.value if entry else default
+
+    def with_prefix(self, prefix: str) -> list[ConfigEntry]:
+        return [entry for name, entry in self._current().items() if name.startswith(prefix)]
+
+    def derive(self, key: str, build: Callable[[dict[str, ConfigEntry]], Any]) -> Any:
+        """
+        Вернуть build(настройки), вычисленное для текущего снимка; после перезагрузки снимка
+        значение вычисляется заново при следующем обращении.
+        """
+        entries = self._current()
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] is entries:
+            return cached[1]
+        value = build(entries)
+        self._derived[key] = (entries, value)
+        return value
+
+    def _loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                if self.refresh():
+                    logger.info('Снимок настроек перечитан, версия %s', self._version)
+            except Exception:
+                logger.exception('Ошибка обновления снимка настроек')
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        try:
+            self.load()
+        except Exception:
+            logger.exception('Не удалось загрузить снимок настроек, повтор в фоне')
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='config-snapshot', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+config_snapshot = ConfigSnapshot(session_maker, refresh_seconds=settings.get('configs', {}).get('refresh_seconds', 5))
@@ -0,0 +1,190 @@
+from typing import Any, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError, DataError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, apply_keyset, split_page
+from database.crud.statements import check_fields, cascade_deletes
+from database.crud.table_versions_crud import bump_table_versions
+from database.query_cache import query_cache
+
+# Асинхронные версии CRUD-операций для AsyncSession.
+# Функции параметризуются моделью, поэтому одинаково работают для всех сущностей.
+# Версии таблиц увеличиваются той же синхронной bump_table_versions через AsyncSession.run_sync.
+# Чтения идут через тот же кэш запросов, что и синхронные CRUD-функции: кэшируются таблицы,
+# зарегистрированные в query_cache, остальные читаются из БД.
+
+
+def _pk_column(model):
+    return model.__mapper__.primary_key[0]
+
+
+async def async_create(db: AsyncSession, obj):
+    try:
+        db.add(obj)
+        await db.flush()
+        await db.run_sync(bump_table_versions, [obj.__tablename__])
+        await db.commit()
+        query_cache.invalidate([obj.__tablename__])
+        await db.refresh(obj)
+        return obj
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
+        )
+    except DataError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail="Не удалось создать, неверный тип данных или размер."
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+async def async_get_all(db: AsyncSession, model, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+                        filters: Optional[dict] = None, descending: bool = False,
+                        fields: Optional[Sequence[str]] = None):
+    """
+    Получить страницу записей модели, отсортированную по первичному ключу.
+    filters - равенства по полям модели, значения None пропускаются.
+    fields - выбираемые столбцы (по умолчанию все столбцы модели), среди них должен быть первичный ключ.
+    Возвращает (список словарей, курсор следующей страницы или None).
+    """
+    fields = tuple(fields or model.__mapper__.column_attrs.keys())
+    filters = {field: value for field, value in (filters or {}).items() if value is not None}
+
+    async def compute():
+        pk = _pk_column(model)
+        stmt = select(*[getattr(model, field) for field in fields])
+        for field, value in filters.items():
+            stmt = stmt.where(getattr(model, field) == value)
+        result = await db.execute(apply_keyset(stmt, [getattr(model, pk.key)], cursor, limit, descending))
+        return split_page([row._asdict() for row in result], [pk.key], limit)
+
+    try:
+        key = f'async_get_all:{fields!r}:{limit}:{cursor!r}:{sorted(filters.items())!r}:{descending}'
+        return await query_cache.aget_or_compute(model.__tablename__, key, compute)
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+async def async_get_by_pk(db: AsyncSession, model, pk_value: Any, fields: Optional[Sequence[str]] = None):
+    """
+    Получить запись по первичному ключу в виде словаря полей fields (по умолчанию все столбцы модели) или 404.
+    """
+    fields = tuple(fields or model.__mapper__.column_attrs.keys())
+
+    async def compute():
+        stmt = select(*[getattr(model, field) for field in fields]).where(_pk_column(model) == pk_value)
+        row = (await db.execute(stmt)).first()
+        return row._asdict() if row else None
+
+    try:
+        key = f'async_get_by_pk:{fields!r}:{pk_value!r}'
+        if row := await query_cache.aget_or_compute(model.__tablename__, key, compute):
+            return row
+        raise HTTPException(status_code=404, detail="Запись не найдена.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+async def async_update(db: AsyncSession, model, pk_value: Any, changes: dict, prepare_changes=None):
+    """
+    Обновить запись одним UPDATE (с RETURNING, если СУБД его поддерживает).
+    prepare_changes - необязательная корутина (db, pk_value, changes) -> changes
+    для вычисляемых полей, которые при set-based UPDATE не заполняются валидаторами модели.
+    """
+    try:
+        if prepare_changes:
+            changes = await prepare_changes(db, pk_value, changes)
+        check_fields(model, changes)
+        pk = _pk_column(model)
+        if not changes:
+            obj = await db.get(model, pk_value)
+        else:
+            stmt = update(model).where(pk == pk_value).values(**changes) \
+                .execution_options(synchronize_session=False)
+            if db.get_bind().dialect.update_returning:
+                obj = (await db.scalars(stmt.returning(model))).first()
+            elif (await db.execute(stmt)).rowcount:
+                obj = await db.get(model, changes.get(pk.key, pk_value))
+            else:
+                obj = None
+        if obj is None:
+            raise HTTPException(status_code=404, detail="Запись не найдена.")
+        await db.run_sync(bump_table_versions, [model.__tablename__])
+        await db.commit()
+        query_cache.invalidate([model.__tablename__])
+        return obj
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
+        )
+    except DataError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail="Не удалось создать, неверный тип данных или размер."
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+async def async_delete(db: AsyncSession, model, pk_value: Any):
+    try:
+        criterion = _pk_column(model) == pk_value
+        # Дочерние записи удаляются set-based запросами вместо каскадной загрузки ORM
+        changed_tables = {model.__tablename__}
+        for stmt in cascade_deletes(model, criterion):
+            if (await db.execute(stmt)).rowcount:
+                changed_tables.add(stmt.table.name)
+        stmt = delete(model).where(criterion).execution_options(synchronize_session=False)
+        if not (await db.execute(stmt)).rowcount:
+            raise HTTPException(status_code=404, detail="Запись не найдена.")
+        await db.run_sync(bump_table_versions, changed_tables)
+        await db.commit()
+        query_cache.invalidate(changed_tables)
+        return {'msg': f'Удаление записи с id {pk_value} прошло успешно.'}
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
@@ -1,69 +1,46 @@
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from database.crud.pagination import DEFAULT_PAGE_LIMIT
+from database.config_snapshot import config_snapshot
+from database.crud.repository import Repository, handle_db_errors
+from database.crud.table_versions_crud import bump_table_version
 from database.models import Configs
-from sqlalchemy.exc import IntegrityError, DataError
+from database.query_cache import query_cache
+
+configs_repository = Repository(Configs, fields=('id', 'name', 'value'))
 
 
 def set_setting_value(db: Session, name: str, value: dict, is_force: bool):
-    try:
-        config = db.query(Configs).filter(Configs.name == name).first()
+    with handle_db_errors(db):
+        config = configs_repository.find_by(db, Configs.name, name)
         if config:
-            updated_values = value
-            config.value = updated_values
+            config.value = value
         elif is_force:
             config = Configs(name=name, value=value)
             db.add(config)
         else:
             raise HTTPException(status_code=422, detail=f'Конфигурация с названием {name} не существует.')
+        bump_table_version(db, Configs.__tablename__)
         db.commit()
-        if config:
-            db.refresh(config)
+        config_snapshot.mark_stale()
+        query_cache.invalidate([Configs.__tablename__])
+        db.refresh(config)
         return config
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
 
 
 def get_setting_by_name(db: Session, config_name: str):
-    try:
-        if config := db.query(Configs).filter(Configs.name == config_name).first():
+    with handle_db_errors(db):
+        if config := configs_repository.find_by(db, Configs.name, config_name):
             return config
-        else:
-            raise HTTPException(status_code=404, detail='Запись не найдена.')
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+        raise HTTPException(status_code=404, detail='Запись не найдена.')
+
 
-def get_all_settings(db: Session):
-    try:
-        configs = db.query(Configs).all()
-        configs_list = []
-        for config in configs:
-            configs_list.append({'id': config.id,
-                                'name': config.name,
-                                'value': config.value})
-        return configs_list
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+@query_cache.cached(Configs.__tablename__)
+def get_all_settings(db: Session, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+                     descending: bool = False):
+    """
+    Получить страницу настроек, отсортированную по id.
+    Возвращает (список настроек, курсор следующей страницы или None).
+    """
+    return configs_repository.page(db, limit, cursor, descending)
@@ -1,29 +1,43 @@
-from uuid import UUID
+from typing import Optional
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError, DataError
 from sqlalchemy.orm import Session
-from database.models import Devices
+from database.crud.pagination import DEFAULT_PAGE_LIMIT
+from database.crud.repository import Repository
+from database.crud.table_versions_crud import bump_table_versions
+from database.models import Devices, DeviceModels, FilialEnterprises
+from database.query_cache import query_cache
+
+devices_repository = Repository(Devices, fields=('id', 'model_id', 'serial_number', 'filial_id'))
 
 
 def create_device(db: Session, device: Devices):
+    return devices_repository.create(db, device)
+
+
+def import_devices_chunk(db: Session, rows: list[tuple[int, dict]], seen_serial_numbers: set[str],
+                         batch_size: int = 500):
+    """
+    Создать пачку устройств из файла импорта в одной транзакции.
+
+    rows - проверенные схемой строки (номер строки файла, поля устройства).
+    Модели и филиалы проверяются одним запросом на таблицу, занятые серийные номера - одним
+    запросом к devices; seen_serial_numbers - номера, уже созданные из предыдущих пачек файла
+    (пополняется здесь после commit). Корректные устройства вставляются многострочными INSERT по batch_size.
+    Возвращает (число созданных устройств, ошибки [{'line', 'detail'}]).
+    """
+    if not rows:
+        return 0, []
     try:
-        db.add(device)
-        db.commit()
-        db.refresh(device)
-        return device
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
+        known_models = set(db.scalars(select(DeviceModels.id).where(
+            DeviceModels.id.in_({row['model_id'] for _, row in rows}))))
+        known_filials = set(db.scalars(select(FilialEnterprises.id).where(
+            FilialEnterprises.id.in_({row['filial_id'] for _, row in rows}))))
+        taken = set(db.scalars(select(Devices.serial_number).where(
+            Devices.serial_number.in_({row['serial_number'] for _, row in rows}))))
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -31,88 +45,83 @@ def create_device(db: Session, device: Devices):
             detail=f"Непредвиденная ошибка: {str(e)}"
         )
 
+    errors = []
+    accepted = {}
+    for line, row in rows:
+        serial_number = row['serial_number']
+        if serial_number in seen_serial_numbers or serial_number in accepted:
+            errors.append({'line': line, 'detail': f"Серийный номер {serial_number} повторяется в файле."})
+        elif serial_number in taken:
+            errors.append({'line': line, 'detail': f"Устройство с серийным номером {serial_number} уже существует."})
+        elif row['model_id'] not in known_models:
+            errors.append({'line': line, 'detail': f"Модель устройства {row['model_id']} не найдена."})
+        elif row['filial_id'] not in known_filials:
+            errors.append({'line': line, 'detail': f"Филиал {row['filial_id']} не найден."})
+        else:
+            accepted[serial_number] = (line, dict(row, id=str(uuid4())))
+    if not accepted:
+        return 0, errors
 
-def get_all_devices(db: Session):
+    values = [row for _, row in accepted.values()]
     try:
-        devices = db.query(Devices).all()
-        devices_list = []
-        for dev in devices:
-            devices_list.append({'id': dev.id, 'model_id': dev.model_id, 'serial_number': dev.serial_number, 'filial_id': dev.filial_id})
-        return devices_list
+        for start in range(0, len(values), batch_size):
+            db.execute(insert(Devices), values[start:start + batch_size])
+        bump_table_versions(db, [Devices.__tablename__])
+        db.commit()
+    except (IntegrityError, DataError) as e:
+        # Параллельная запись заняла номер или значение не подошло столбцу: пачка не вставлена целиком
+        db.rollback()
+        return 0, errors + [{'line': line, 'detail': f"Пачка строк не вставлена: {e.orig}"}
+                           for line, _ in accepted.values()]
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Непредвиденная ошибка: {str(e)}"
         )
+    seen_serial_numbers.update(accepted)
+    query_cache.invalidate([Devices.__tablename__])
+    return len(values), errors
+
+
+def get_all_devices(db: Session, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+                    filial_id: Optional[int] = None, model_id: Optional[int] = None, descending: bool = False):
+    """
+    Получить страницу устройств с фильтрами, отсортированную по id.
+    Возвращает (список устройств, курсор следующей страницы или None).
+    """
+    return devices_repository.page(db, limit, cursor, descending, filial_id=filial_id, model_id=model_id)
+
+
+def iter_devices(db: Session, filial_id: Optional[int] = None, model_id: Optional[int] = None):
+    """
+    Все устройства с фильтрами для выгрузки: генератор словарей, строки читаются потоком.
+    """
+    return devices_repository.iter_rows(db, filial_id=filial_id, model_id=model_id)
+
+
+def resolve_device_id(db: Session, device_id: Optional[UUID] = None, serial_number: Optional[str] = None):
+    """
+    Найти id устройства по UUID или серийному номеру. Возвращает id или None.
+    """
+    query = db.query(Devices.id)
+    if device_id is not None:
+        query = query.filter(Devices.id == str(device_id))
+    elif serial_number is not None:
+        query = query.filter(Devices.serial_number == serial_number)
+    else:
+        return None
+    row = query.first()
+    return row.id if row else None
 
 
 def get_device_by_id(db: Session, device_id: UUID):
-    try:
-        if device := db.query(Devices).filter(Devices.id == str(device_id)).first():
-            return device
-        else:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return devices_repository.get(db, str(device_id))
 
 
 def update_device(db: Session, device_id: UUID, changes: dict):
-    try:
-        device = db.query(Devices).filter(Devices.id == str(device_id)).first()
-        if not device:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-
-        for field, value in changes.items():
-            if hasattr(device, field):
-                setattr(device, field, value)
-            else:
-                db.rollback()
-                raise HTTPException(status_code=422, detail=f'Поле "{field}" не существует в модели.')
-        db.commit()
-        db.refresh(device)
-        return device
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return devices_repository.update(db, str(device_id), changes)
 
 
 def delete_device(db: Session, device_id: UUID):
-    try:
-        device = db.query(Devices).filter(Devices.id == str(device_id)).first()
-        if not device:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-        db.delete(device)
-        db.commit()
-        return {'msg': f'Удаление записи с id {device_id} прошло успешно.'}
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
\ No newline at end of file
+    return devices_repository.delete(db, str(device_id))
@@ -1,118 +1,35 @@
-from fastapi import HTTPException
+from typing import Optional
 from sqlalchemy.orm import Session
+from database.crud.pagination import DEFAULT_PAGE_LIMIT
+from database.crud.repository import Repository
 from database.models import Enterprises
-from sqlalchemy.exc import IntegrityError, DataError
+from database.query_cache import query_cache
+
+enterprises_repository = Repository(Enterprises, fields=('inn', 'ogrn', 'kpp', 'name', 'adres'))
 
 
 def create_enterprise(db: Session, enterprise: Enterprises):
-    try:
-        db.add(enterprise)
-        db.commit()
-        db.refresh(enterprise)
-        return enterprise
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return enterprises_repository.create(db, enterprise)
 
 
-def get_all_enterprises(db: Session):
-    try:
-        enterprises = db.query(Enterprises).all()
-        enterprises_list = []
-        for ent_prise in enterprises:
-            enterprises_list.append({'inn': ent_prise.inn, 'ogrn': ent_prise.ogrn,
-                                     'kpp': ent_prise.kpp,
-                                     'name': ent_prise.name,
-                                     'adres': ent_prise.adres})
-        return enterprises_list
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+@query_cache.cached(Enterprises.__tablename__)
+def get_all_enterprises(db: Session, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+                        descending: bool = False):
+    """
+    Получить страницу предприятий, отсортированную по ИНН.
+    Возвращает (список предприятий, курсор следующей страницы или None).
+    """
+    return enterprises_repository.page(db, limit, cursor, descending)
 
 
+@query_cache.cached(Enterprises.__tablename__)
 def get_enterprise_by_inn(db: Session, enterprise_inn: str):
-    try:
-        enterprise = db.query(Enterprises).filter(Enterprises.inn == enterprise_inn).first()
-        if not enterprise:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-        else:
-            return enterprise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return enterprises_repository.row(db, enterprise_inn)
 
 
 def update_enterprise(db: Session, enterprise_inn: str, changes: dict):
-    try:
-        enterprise = db.query(Enterprises).filter(Enterprises.inn == enterprise_inn).first()
-        if not enterprise:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-
-        for field, value in changes.items():
-            if hasattr(enterprise, field):
-                setattr(enterprise, field, value)
-            else:
-                db.rollback()
-                raise HTTPException(status_code=422, detail=f'Поле "{field}" не существует в модели.')
-        db.commit()
-        db.refresh(enterprise)
-        return enterprise
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return enterprises_repository.update(db, enterprise_inn, changes)
 
 
 def delete_enterprise(db: Session, enterprise_inn: str):
-    try:
-        enterprise = db.query(Enterprises).filter(Enterprises.inn == enterprise_inn).first()
-        if not enterprise:
-            raise HTTPException(status_code=404, detail='Запись для удаления не найдена.')
-        db.delete(enterprise)
-        db.commit()
-        return {"msg": f'Удаление записи с inn {enterprise_inn} прошло успешно.'}
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
\ No newline at end of file
+    return enterprises_repository.delete(db, enterprise_inn)
@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Размер страницы по умолчанию и верхняя граница для параметра limit
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+def _dump_value(value: Any):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _load_value(column, value: Any):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Упаковать значения ключа сортировки последней строки страницы в непрозрачный курсор.
+    """
+    raw = json.dumps([_dump_value(v) for v in values], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    """
+    Распаковать курсор обратно в значения ключа сортировки.
+    Некорректный курсор приводит к ошибке 422.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_load_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=422, detail='Некорректный курсор пагинации.')
+
+
+def apply_keyset(stmt, columns: Sequence, cursor: Optional[str], limit: int, descending: bool = False):
+    """
+    Добавить к запросу (Query или select) условие "после курсора", сортировку и limit.
+
+    columns - столбцы ключа сортировки, последний из них должен быть уникальным (первичный ключ),
+    чтобы порядок был стабильным. Выбирается limit + 1 строка, чтобы понять, есть ли следующая страница.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (a, b) > (x, y) раскрывается в a > x OR (a = x AND b > y): такой вид MySQL превращает в range scan
+        conditions = []
+        for i, column in enumerate(columns):
+            equal_prefix = [columns[j] == values[j] for j in range(i)]
+            after = column < values[i] if descending else column > values[i]
+            conditions.append(and_(*equal_prefix, after))
+        stmt = stmt.where(or_(*conditions))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def split_page(rows: list, keys: Sequence[str], limit: int):
+    """
+    Отрезать лишнюю строку, выбранную apply_keyset, и построить курсор следующей страницы.
+    Строки могут быть словарями или объектами с атрибутами.
+    Возвращает (строки страницы, курсор или None).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        values = [last[key] for key in keys]
+    else:
+        values = [getattr(last, key) for key in keys]
+    return rows, encode_cursor(values)
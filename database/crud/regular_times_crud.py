@@ -1,44 +1,58 @@
+from datetime import time
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError, DataError
+from database.crud.pagination import DEFAULT_PAGE_LIMIT
+from database.crud.repository import Repository
 from database.models import RegularTimes
+from database.models.regular_times_model import weekday_bit, with_days_mask
+from database.query_cache import query_cache
+
+regular_times_repository = Repository(RegularTimes, fields=('id', 'period', 'days', 'timing'))
 
 
 def create_regular_time(db: Session, regular_time: RegularTimes):
-    try:
-        db.add(regular_time)
-        db.commit()
-        db.refresh(regular_time)
-        return regular_time
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return regular_times_repository.create(db, regular_time)
 
 
-def get_all_regular_times(db: Session):
+@query_cache.cached(RegularTimes.__tablename__)
+def get_all_regular_times(db: Session, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+                          period: Optional[str] = None, descending: bool = False):
+    """
+    Получить страницу регулярных расписаний с фильтром по периодичности, отсортированную по id.
+    Возвращает (список расписаний, курсор следующей страницы или None).
+    """
+    return regular_times_repository.page(db, limit, cursor, descending, period=period)
+
+
+def get_regular_time_schedules(db: Session):
+    """
+    Получить все расписания в виде легких строк (id, days_mask, timing) для генератора заданий.
+    """
+    return db.query(RegularTimes.id, RegularTimes.days_mask, RegularTimes.timing).all()
+
+
+@query_cache.cached(RegularTimes.__tablename__)
+def get_regular_times_firing(db: Session, weekday: int, time_from: time, time_to: time):
+    """
+    Получить расписания, срабатывающие в день недели weekday (1-7) в интервале [time_from, time_to].
+    Один запрос по индексу (timing, days_mask): диапазон по timing, проверка бита маски по индексу.
+    """
     try:
-        regular_times = db.query(RegularTimes).all()
+        regular_times = (
+            db.query(RegularTimes)
+            .filter(RegularTimes.timing >= time_from,
+                    RegularTimes.timing <= time_to,
+                    RegularTimes.days_mask.op('&')(weekday_bit(weekday)) != 0)
+            .order_by(RegularTimes.timing, RegularTimes.id)
+            .all()
+        )
         regular_times_list = []
-        for time in regular_times:
-            regular_times_list.append({'id': time.id,
-                                    'period': time.period,
-                                    'days': time.days,
-                                    'timing': time.timing})
+        for time_row in regular_times:
+            regular_times_list.append({'id': time_row.id,
+                                       'period': time_row.period,
+                                       'days': time_row.days,
+                                       'timing': time_row.timing})
         return regular_times_list
     except Exception as e:
         db.rollback()
@@ -48,72 +62,25 @@ def get_all_regular_times(db: Session):
         )
 
 
+@query_cache.cached(RegularTimes.__tablename__)
 def get_regular_time_by_id(db: Session, regular_time_id: int):
-    try:
-        if regular_time := db.query(RegularTimes).filter(RegularTimes.id == regular_time_id).first():
-            return regular_time
-        else:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+    return regular_times_repository.row(db, regular_time_id)
 
 
-def update_regular_time(db: Session, regular_time_id: int, changes: dict):
-    try:
-        regular_time = db.query(RegularTimes).filter(RegularTimes.id == regular_time_id).first()
-        if not regular_time:
+def _regular_time_changes(db: Session, regular_time_id: int, changes: dict):
+    if ('days' in changes) != ('period' in changes):
+        # Для пересчета маски дней нужно текущее значение неизменяемого поля
+        current = db.query(RegularTimes.days, RegularTimes.period) \
+            .filter(RegularTimes.id == regular_time_id).first()
+        if not current:
             raise HTTPException(status_code=404, detail="Запись не найдена.")
+        return with_days_mask(changes, current.days, current.period)
+    return with_days_mask(changes)
 
-        for field, value in changes.items():
-            if hasattr(regular_time, field):
-                setattr(regular_time, field, value)
-            else:
-                db.rollback()
-                raise HTTPException(status_code=422, detail=f'Поле "{field}" не существует в модели.')
-        db.commit()
-        db.refresh(regular_time)
-        return regular_time
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except DataError:
-        db.rollback()
-        raise HTTPException(
-            status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
+
+def update_regular_time(db: Session, regular_time_id: int, changes: dict):
+    return regular_times_repository.update(db, regular_time_id, changes, _regular_time_changes)
 
 
 def delete_regular_time(db: Session, regular_time_id: int):
-    try:
-        regular_time = db.query(RegularTimes).filter(RegularTimes.id == regular_time_id).first()
-        if not regular_time:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-        db.delete(regular_time)
-        db.commit()
-        return {'msg': f'Удаление записи с id {regular_time_id} прошло успешно.'}
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=500,
-            detail=f"Непредвиденная ошибка: {str(e)}"
-        )
\ No newline at end of file
+    return regular_times_repository.delete(db, regular_time_id)
@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, select
+from sqlalchemy.exc import IntegrityError, DataError
+from sqlalchemy.orm import Session
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, apply_keyset, split_page
+from database.crud.statements import pk_column, update_by_pk, delete_by_pk, delete_children
+from database.crud.table_versions_crud import bump_table_versions
+from database.query_cache import query_cache
+
+# Сколько строк за раз забирается из курсора при потоковом чтении больших выборок
+STREAM_BATCH_SIZE = 1000
+
+
+@contextmanager
+def handle_db_errors(db: Session):
+    """
+    Единая обработка ошибок CRUD-операций: откат транзакции и HTTPException с кодом по типу ошибки.
+    """
+    try:
+        yield
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
+        )
+    except DataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail="Не удалось создать, неверный тип данных или размер."
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+class Repository:
+    """
+    Стандартные CRUD-операции над моделью.
+
+    Запросы по ключу строятся один раз при создании репозитория и выполняются с bind-параметром:
+    SQLAlchemy запоминает ключ кэша у готового объекта запроса, поэтому на каждый вызов
+    не тратится ни построение select(), ни вычисление ключа кэша компиляции.
+
+    fields - поля, которые попадают в словари страницы списка (по умолчанию все столбцы модели),
+    среди них должен быть первичный ключ. Страница выбирается только этими столбцами, без ORM-объектов.
+
+    create/update/delete увеличивают версию таблицы (и таблиц, затронутых каскадным удалением)
+    в той же транзакции, что и изменение данных (см. bump_table_versions), а после commit
+    сбрасывают кэш запросов этих таблиц (см. QueryCache.invalidate).
+    """
+
+    def __init__(self, model, fields: Optional[Sequence[str]] = None):
+        self.model = model
+        self.pk = pk_column(model)
+        self.fields = tuple(fields or model.__mapper__.column_attrs.keys())
+        self._columns = [getattr(model, field) for field in self.fields]
+        self._by_pk = select(model).where(self.pk == bindparam('pk_value'))
+        self._row_by_pk = select(*self._columns).where(self.pk == bindparam('pk_value'))
+        self._by_column = {}
+
+    def create(self, db: Session, obj):
+        with handle_db_errors(db):
+            db.add(obj)
+            # Ошибка вставки должна возникнуть здесь, а не внутри savepoint при создании строки версии
+            db.flush()
+            bump_table_versions(db, [self.model.__tablename__])
+            db.commit()
+            query_cache.invalidate([self.model.__tablename__])
+            db.refresh(obj)
+            return obj
+
+    def get(self, db: Session, pk_value: Any):
+        """
+        Получить запись по первичному ключу, отсутствие записи - ошибка 404.
+        """
+        with handle_db_errors(db):
+            if obj := db.execute(self._by_pk, {'pk_value': pk_value}).scalar():
+                return obj
+            raise HTTPException(status_code=404, detail="Запись не найдена.")
+
+    def row(self, db: Session, pk_value: Any) -> dict:
+        """
+        Получить поля fields записи по первичному ключу в виде словаря, отсутствие записи - ошибка 404.
+        Словарь, в отличие от ORM-объекта, можно кэшировать и передавать между сессиями.
+        """
+        with handle_db_errors(db):
+            if row := db.execute(self._row_by_pk, {'pk_value': pk_value}).first():
+                return row._asdict()
+            raise HTTPException(status_code=404, detail="Запись не найдена.")
+
+    def find_by(self, db: Session, column, value: Any):
+        """
+        Найти первую запись по значению столбца (например, настройку по имени) или вернуть None.
+        """
+        stmt = self._by_column.get(column.key)
+        if stmt is None:
+            stmt = self._by_column[column.key] = select(self.model).where(column == bindparam('value')).limit(1)
+        return db.execute(stmt, {'value': value}).scalar()
+
+    def page(self, db: Session, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+             descending: bool = False, **filters):
+        """
+        Получить страницу записей, отсортированную по первичному ключу.
+        filters - равенства по полям модели, значения None пропускаются.
+        Возвращает (список словарей с полями fields, курсор следующей страницы или None).
+        """
+        with handle_db_errors(db):
+            rows = db.execute(apply_keyset(self._select(filters), [self.pk], cursor, limit, descending))
+            return split_page([row._asdict() for row in rows], [self.pk.key], limit)
+
+    def iter_rows(self, db: Session, batch_size: int = STREAM_BATCH_SIZE, **filters) -> Iterator[dict]:
+        """
+        Все записи с фильтрами (как в page) в виде словарей полей fields, без сортировки.
+        Строки читаются из серверного курсора пачками по batch_size, память не растет с числом записей.
+        """
+        stmt = self._select(filters).execution_options(yield_per=batch_size)
+        for row in db.execute(stmt):
+            yield row._asdict()
+
+    def _select(self, filters: dict):
+        stmt = select(*self._columns)
+        for field, value in filters.items():
+            if value is not None:
+                stmt = stmt.where(getattr(self.model, field) == value)
+        return stmt
+
+    def update(self, db: Session, pk_value: Any, changes: dict, prepare_changes=None):
+        """
+        Обновить запись одним UPDATE (см. update_by_pk).
+        prepare_changes(db, pk_value, changes) -> changes дополняет вычисляемые поля,
+        которые при set-based UPDATE не заполняются валидаторами модели.
+        """
+        with handle_db_errors(db):
+            if prepare_changes:
+                changes = prepare_changes(db, pk_value, changes)
+            obj = update_by_pk(db, self.model, pk_value, changes)
+            bump_table_versions(db, [self.model.__tablename__])
+            db.commit()
+            query_cache.invalidate([self.model.__tablename__])
+            return obj
+
+    def delete(self, db: Session, pk_value: Any):
+        """
+        Удалить запись и ее дочерние записи (cascade='delete') set-based запросами.
+        """
+        with handle_db_errors(db):
+            changed_tables = delete_children(db, self.model, self.pk == pk_value)
+            delete_by_pk(db, self.model, pk_value)
+            changed_tables.add(self.model.__tablename__)
+            bump_table_versions(db, changed_tables)
+            db.commit()
+            query_cache.invalidate(changed_tables)
+            return {'msg': f'Удаление записи с id {pk_value} прошло успешно.'}
@@ -0,0 +1,102 @@
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import update, delete, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ONETOMANY
+
+# Set-based изменение и удаление по первичному ключу: один UPDATE/DELETE вместо
+# SELECT + изменение ORM-объекта + COMMIT + refresh. Функции не делают commit,
+# чтобы вызывающий код мог выполнить несколько операторов в одной транзакции.
+
+
+def pk_column(model):
+    return model.__mapper__.primary_key[0]
+
+
+def check_fields(model, changes: dict):
+    """
+    Проверить, что все изменяемые поля являются столбцами модели.
+    """
+    columns = model.__mapper__.column_attrs
+    for field in changes:
+        if field not in columns:
+            raise HTTPException(status_code=422, detail=f'Поле "{field}" не существует в модели.')
+
+
+def update_by_pk(db: Session, model, pk_value: Any, changes: dict):
+    """
+    Обновить запись по первичному ключу одним UPDATE.
+
+    Если СУБД поддерживает UPDATE ... RETURNING (PostgreSQL, SQLite, MariaDB не поддерживает),
+    обновленная строка возвращается тем же запросом, иначе читается SELECT по ключу.
+    Отсутствие записи определяется по rowcount (ошибка 404).
+    Возвращаемый объект отсоединен от сессии и не истекает после commit.
+    """
+    check_fields(model, changes)
+    pk = pk_column(model)
+    if not changes:
+        obj = db.get(model, pk_value)
+    else:
+        stmt = update(model).where(pk == pk_value).values(**changes) \
+            .execution_options(synchronize_session=False)
+        if db.get_bind(clause=stmt).dialect.update_returning:
+            obj = db.scalars(stmt.returning(model)).first()
+        elif db.execute(stmt).rowcount:
+            # Ключ мог измениться этим же UPDATE
+            obj = db.get(model, changes.get(pk.key, pk_value))
+        else:
+            obj = None
+    if obj is None:
+        raise HTTPException(status_code=404, detail="Запись не найдена.")
+    db.expunge(obj)
+    return obj
+
+
+def delete_by_pk(db: Session, model, pk_value: Any):
+    """
+    Удалить запись по первичному ключу одним DELETE, отсутствие записи - ошибка 404.
+    ORM-каскады не выполняются: дочерние записи удаляются заранее через delete_children.
+    """
+    deleted = delete_where(db, model, pk_column(model) == pk_value)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Запись не найдена.")
+    return deleted
+
+
+def delete_where(db: Session, model, *criteria) -> int:
+    """
+    Удалить записи по условию без загрузки в сессию. Возвращает число удаленных строк.
+    """
+    stmt = delete(model).where(*criteria).execution_options(synchronize_session=False)
+    return db.execute(stmt).rowcount
+
+
+def cascade_deletes(model, *criteria) -> list:
+    """
+    DELETE-запросы для дочерних записей, которые ORM удалил бы каскадом (cascade='delete'),
+    в порядке от самых глубоких потомков. Дочерние строки выбираются подзапросом
+    по внешнему ключу, объекты в сессию не загружаются.
+    """
+    statements = []
+    for relationship in model.__mapper__.relationships:
+        if not relationship.cascade.delete or relationship.direction is not ONETOMANY:
+            continue
+        (parent_column, child_column), = relationship.local_remote_pairs
+        child = relationship.mapper.class_
+        child_criteria = child_column.in_(select(parent_column).where(*criteria))
+        statements.extend(cascade_deletes(child, child_criteria))
+        statements.append(delete(child).where(child_criteria).execution_options(synchronize_session=False))
+    return statements
+
+
+def delete_children(db: Session, model, *criteria) -> set:
+    """
+    Удалить дочерние записи (см. cascade_deletes) перед set-based удалением родителя.
+    Возвращает имена таблиц, в которых что-то было удалено.
+    """
+    changed_tables = set()
+    for stmt in cascade_deletes(model, *criteria):
+        if db.execute(stmt).rowcount:
+            changed_tables.add(stmt.table.name)
+    return changed_tables
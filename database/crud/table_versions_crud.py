@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database.models import TableVersions
+from database.query_cache import query_cache
+
+# Таблицы справочников, для которых ведется версия изменений (ETag списков, сброс кэшей).
+# Задания сюда не входят: они меняются постоянно, и общая строка версии стала бы точкой
+# блокировки для всех транзакций с заданиями.
+VERSIONED_TABLES = frozenset({'devices', 'device_models', 'enterprises', 'filial_enterprises',
+                              'regular_times', 'configs'})
+
+
+def bump_table_version(db: Session, table_name: str):
+    """
+    Увеличить версию таблицы в текущей транзакции; commit выполняет вызывающий код,
+    поэтому новая версия становится видна вместе с изменением данных.
+    """
+    now = datetime.now()
+    stmt = update(TableVersions).where(TableVersions.table_name == table_name) \
+        .values(version=TableVersions.version + 1, updated_at=now) \
+        .execution_options(synchronize_session=False)
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(TableVersions).values(table_name=table_name, version=1, updated_at=now))
+    except IntegrityError:
+        # Строку версии одновременно создала другая транзакция
+        db.execute(stmt)
+
+
+def bump_table_versions(db: Session, table_names: Iterable[str]):
+    """
+    Увеличить версии измененных таблиц из VERSIONED_TABLES (остальные пропускаются).
+    Строки версий обновляются в порядке имен, чтобы параллельные транзакции не блокировали друг друга.
+    """
+    for table_name in sorted(set(table_names) & VERSIONED_TABLES):
+        bump_table_version(db, table_name)
+
+
+def get_table_version(db: Session, table_name: str) -> Optional[Row]:
+    """
+    Получить (version, updated_at) таблицы или None, если таблица еще не менялась.
+    """
+    return db.execute(
+        select(TableVersions.version, TableVersions.updated_at).where(TableVersions.table_name == table_name)
+    ).first()
+
+
+def get_table_versions(db: Session) -> dict[str, int]:
+    """
+    Получить версии всех таблиц, которые уже менялись: {имя таблицы: версия}.
+    """
+    return {row.table_name: row.version
+            for row in db.execute(select(TableVersions.table_name, TableVersions.version))}
+
+
+def get_cached_table_version(db: Session, table_name: str) -> Optional[Row]:
+    """
+    get_table_version для условного GET списка.
+
+    С общим хранилищем кэша (Redis) версия кэшируется и сбрасывается вместе с данными таблицы,
+    и условный GET не обращается к БД совсем. С кэшем в памяти воркера версия читается из БД
+    (запрос по первичному ключу) и сверяется с кэшем: запись из другого воркера сбрасывает
+    кэш таблицы до чтения данных, поэтому ETag и тело ответа не расходятся.
+    """
+    if query_cache.shared:
+        return query_cache.get_or_compute(table_name, 'table_version', lambda: get_table_version(db, table_name))
+    table_version = get_table_version(db, table_name)
+    query_cache.sync_versions({table_name: table_version.version if table_version else 0})
+    return table_version
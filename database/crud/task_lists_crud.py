@@ -1,16 +1,67 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
+from sqlalchemy import insert, literal, select, update
 from sqlalchemy.exc import IntegrityError, DataError
-from database.models import TaskLists
+from database.crud.pagination import DEFAULT_PAGE_LIMIT, apply_keyset, split_page
+from database.crud.repository import Repository, STREAM_BATCH_SIZE
+from database.models import TaskLists, TaskListsArchive, Devices, RegularTimes
+
+# Статусы завершенных заданий, которые переносятся в архив
+FINISHED_STATUSES = ('Успешно', 'Ошибка')
+# Поля задания в ответах; списки выбираются только этими столбцами, без ORM-объектов
+TASK_LIST_FIELDS = ('id', 'device_id', 'cmd', 'is_regular', 'timing', 'regular_time_id', 'status')
+
+task_lists_repository = Repository(TaskLists)
+task_lists_archive_repository = Repository(TaskListsArchive)
+
+
+def task_list_columns(model=TaskLists):
+    """
+    Столбцы TASK_LIST_FIELDS рабочей (TaskLists) или архивной (TaskListsArchive) таблицы.
+    """
+    return [getattr(model, field) for field in TASK_LIST_FIELDS]
 
 
 def create_task_list(db: Session, task_list: TaskLists):
+    return task_lists_repository.create(db, task_list)
+
+
+def _regular_slot(row: dict) -> Optional[tuple]:
+    if row.get('regular_time_id') is None:
+        return None
+    return row['regular_time_id'], str(row['device_id']), row['cmd'], row['timing']
+
+
+def _taken_regular_slots(db: Session, rows: list[dict]) -> list[bool]:
+    """
+    Для каждой строки: занят ли ее слот регулярного задания (regular_time_id, device_id, cmd, timing) -
+    уже создан в БД или встречается раньше в этой же пачке. Слоты в БД проверяются одним запросом.
+    """
+    slots = [_regular_slot(row) for row in rows]
+    regular = [slot for slot in slots if slot is not None]
+    existing = get_existing_regular_slots(
+        db,
+        list({slot[0] for slot in regular}),
+        min(slot[3] for slot in regular),
+        max(slot[3] for slot in regular),
+    ) if regular else set()
+    taken = []
+    for slot in slots:
+        taken.append(slot is not None and slot in existing)
+        if slot is not None:
+            existing.add(slot)
+    return taken
+
+
+def _insert_task_lists(db: Session, rows: list[dict], batch_size: int):
     try:
-        db.add(task_list)
+        for start in range(0, len(rows), batch_size):
+            db.execute(insert(TaskLists), rows[start:start + batch_size])
         db.commit()
-        db.refresh(task_list)
-        return task_list
+        return rows
     except IntegrityError:
         db.rollback()
         raise HTTPException(
@@ -31,33 +82,43 @@ def create_task_list(db: Session, task_list: TaskLists):
         )
 
 
-def get_all_task_lists(db: Session):
+def bulk_insert_task_lists(db: Session, rows: list[dict], batch_size: int = 500):
+    """
+    Вставить задания многострочными INSERT пачками по batch_size в одной транзакции.
+    Идентификаторы генерируются здесь, если не переданы. Регулярные задания, слот которых
+    уже занят (в БД или в этой же пачке), пропускаются. Возвращает список вставленных строк.
+    """
     try:
-        task_lists = db.query(TaskLists).all()
-        task_lists_list = []
-        for task in task_lists:
-            task_lists_list.append({'id': task.id,
-                                    'device_id': task.device_id,
-                                    'cmd': task.cmd,
-                                    'is_regular': task.is_regular,
-                                    'timing': task.timing,
-                                    'regular_time_id': task.regular_time_id,
-                                    'status': task.status})
-        return task_lists_list
+        taken = _taken_regular_slots(db, rows)
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Непредвиденная ошибка: {str(e)}"
         )
+    rows = [row for row, is_taken in zip(rows, taken) if not is_taken]
+    for row in rows:
+        row.setdefault('id', str(uuid4()))
+    return _insert_task_lists(db, rows, batch_size) if rows else []
+
 
+def bulk_create_task_lists(db: Session, items: list[dict]):
+    """
+    Создать пачку заданий в одной транзакции.
 
-def get_task_list_by_id(db: Session, task_list_id: UUID):
+    Ссылки на устройства и расписания и занятые слоты регулярных заданий проверяются
+    одним запросом на каждую таблицу, корректные задания вставляются многострочными INSERT.
+    Возвращает результат по каждому элементу: {'index', 'id', 'detail'}.
+    """
+    rows = [dict(item, device_id=str(item['device_id'])) for item in items]
+    device_ids = {row['device_id'] for row in rows}
+    regular_time_ids = {row['regular_time_id'] for row in rows if row.get('regular_time_id') is not None}
     try:
-        if task_list := db.query(TaskLists).filter(TaskLists.id == str(task_list_id)).first():
-            return task_list
-        else:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
+        known_devices = {row.id for row in db.query(Devices.id).filter(Devices.id.in_(device_ids))} \
+            if device_ids else set()
+        known_regular_times = {row.id for row in db.query(RegularTimes.id).filter(RegularTimes.id.in_(regular_time_ids))} \
+            if regular_time_ids else set()
+        taken = _taken_regular_slots(db, rows)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -65,33 +126,60 @@ def get_task_list_by_id(db: Session, task_list_id: UUID):
             detail=f"Непредвиденная ошибка: {str(e)}"
         )
 
+    results = []
+    valid = []
+    for index, (row, is_taken) in enumerate(zip(rows, taken)):
+        if row['device_id'] not in known_devices:
+            results.append({'index': index, 'id': None, 'detail': f"Устройство {row['device_id']} не найдено."})
+        elif row.get('regular_time_id') is not None and row['regular_time_id'] not in known_regular_times:
+            results.append({'index': index, 'id': None,
+                            'detail': f"Расписание {row['regular_time_id']} не найдено."})
+        elif is_taken:
+            results.append({'index': index, 'id': None,
+                            'detail': f"Задание расписания {row['regular_time_id']} на это время уже создано."})
+        else:
+            row['id'] = str(uuid4())
+            valid.append(row)
+            results.append({'index': index, 'id': row['id'], 'detail': None})
 
-def update_task_list(db: Session, task_list_id: UUID, changes: dict):
+    if valid:
+        _insert_task_lists(db, valid, 500)
+    return results
+
+
+def bulk_ack_task_lists(db: Session, device_id: UUID, acks: list[tuple[str, str]], batch_size: int = 1000):
+    """
+    Применить пачку подтверждений статусов заданий устройства в одной транзакции.
+
+    acks - пары (task_id, status); при повторе одного task_id действует последний статус.
+    Обновление выполняется множественными UPDATE ... WHERE id IN (...), сгруппированными по статусу.
+    Возвращает {'updated': число обновленных заданий, 'unknown_ids': неизвестные устройству задания}.
+    """
+    latest = {}
+    for task_id, status in acks:
+        latest[str(task_id)] = status
     try:
-        task_list = db.query(TaskLists).filter(TaskLists.id == str(task_list_id)).first()
-        if not task_list:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-
-        for field, value in changes.items():
-            if hasattr(task_list, field):
-                setattr(task_list, field, value)
-            else:
-                db.rollback()
-                raise HTTPException(status_code=422, detail=f'Поле "{field}" не существует в модели.')
+        known = set()
+        ids = list(latest)
+        for start in range(0, len(ids), batch_size):
+            known.update(row.id for row in db.query(TaskLists.id).filter(
+                TaskLists.device_id == str(device_id),
+                TaskLists.id.in_(ids[start:start + batch_size])))
+
+        by_status = {}
+        for task_id in known:
+            by_status.setdefault(latest[task_id], []).append(task_id)
+        for status, task_ids in by_status.items():
+            for start in range(0, len(task_ids), batch_size):
+                db.query(TaskLists).filter(TaskLists.id.in_(task_ids[start:start + batch_size])) \
+                    .update({TaskLists.status: status}, synchronize_session=False)
         db.commit()
-        db.refresh(task_list)
-        return task_list
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
-        )
+        return {'updated': len(known), 'unknown_ids': [task_id for task_id in ids if task_id not in known]}
     except DataError:
         db.rollback()
         raise HTTPException(
             status_code=422,
-            detail="Не удалось создать, неверный тип данных или размер."
+            detail="Не удалось обновить, неверный тип данных или размер."
         )
     except Exception as e:
         db.rollback()
@@ -101,23 +189,226 @@ def update_task_list(db: Session, task_list_id: UUID, changes: dict):
         )
 
 
-def delete_task_list(db: Session, task_list_id: UUID):
+def archive_finished_task_lists(db: Session, older_than: datetime, batch_size: int = 1000):
+    """
+    Перенести одну пачку завершенных заданий ('Успешно', 'Ошибка') с timing < older_than
+    в task_lists_archive. Пачка ограничена batch_size, чтобы блокировки были короткими;
+    строки пачки блокируются (SKIP LOCKED), поэтому архиваторы нескольких воркеров не переносят одно задание дважды.
+    Возвращает число перенесенных заданий.
+    """
     try:
-        task_list = db.query(TaskLists).filter(TaskLists.id == str(task_list_id)).first()
-        if not task_list:
-            raise HTTPException(status_code=404, detail="Запись не найдена.")
-        db.delete(task_list)
+        ids = [row.id for row in db.query(TaskLists.id)
+               .filter(TaskLists.status.in_(FINISHED_STATUSES), TaskLists.timing < older_than)
+               .limit(batch_size)
+               .with_for_update(skip_locked=True)]
+        if not ids:
+            return 0
+        db.execute(
+            insert(TaskListsArchive).from_select(
+                list(TASK_LIST_FIELDS) + ['archived_at'],
+                select(*task_list_columns(), literal(datetime.now()))
+                .where(TaskLists.id.in_(ids))
+            )
+        )
+        db.query(TaskLists).filter(TaskLists.id.in_(ids)).delete(synchronize_session=False)
         db.commit()
-        return {'msg': f'Удаление записи с id {task_list_id} прошло успешно.'}
-    except IntegrityError:
+        return len(ids)
+    except Exception as e:
         db.rollback()
         raise HTTPException(
-            status_code=400,
-            detail="Не удалось создать, значения в полях должны быть уникальными и не пустыми."
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+def get_task_lists_due_between(db: Session, since: datetime, until: datetime):
+    """
+    Получить задания со статусом 'Ожидает', время выполнения которых наступило в интервале (since, until].
+    Один range scan по индексу (status, timing, id) независимо от числа устройств.
+    Выбираются только столбцы TASK_LIST_FIELDS, ORM-объекты не создаются. Возвращает список словарей:
+    функция вызывается в пуле потоков, и результат нужен целиком до закрытия сессии.
+    """
+    try:
+        stmt = (
+            select(*task_list_columns())
+            .where(TaskLists.status == 'Ожидает',
+                   TaskLists.timing > since,
+                   TaskLists.timing <= until)
         )
+        return [row._asdict() for row in db.execute(stmt)]
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Непредвиденная ошибка: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def get_regular_task_templates(db: Session):
+    """
+    Получить шаблоны регулярных заданий: уникальные пары (устройство, команда) для каждого расписания.
+    Возвращает словарь {regular_time_id: [(device_id, cmd), ...]}.
+    """
+    rows = (
+        db.query(TaskLists.regular_time_id, TaskLists.device_id, TaskLists.cmd)
+        .filter(TaskLists.regular_time_id.isnot(None))
+        .distinct()
+        .all()
+    )
+    templates = {}
+    for regular_time_id, device_id, cmd in rows:
+        templates.setdefault(regular_time_id, []).append((device_id, cmd))
+    return templates
+
+
+def get_existing_regular_slots(db: Session, regular_time_ids: list[int], timing_from: datetime, timing_to: datetime):
+    """
+    Получить уже созданные слоты регулярных заданий в интервале времени
+    в виде множества (regular_time_id, device_id, cmd, timing).
+    """
+    rows = (
+        db.query(TaskLists.regular_time_id, TaskLists.device_id, TaskLists.cmd, TaskLists.timing)
+        .filter(TaskLists.regular_time_id.in_(regular_time_ids),
+                TaskLists.timing >= timing_from,
+                TaskLists.timing <= timing_to)
+        .all()
+    )
+    return {tuple(row) for row in rows}
+
+
+def _task_lists_criteria(model, device_id: Optional[UUID], status: Optional[str],
+                         timing_from: Optional[datetime], timing_to: Optional[datetime]) -> list:
+    criteria = []
+    if device_id is not None:
+        criteria.append(model.device_id == str(device_id))
+    if status is not None:
+        criteria.append(model.status == status)
+    if timing_from is not None:
+        criteria.append(model.timing >= timing_from)
+    if timing_to is not None:
+        criteria.append(model.timing <= timing_to)
+    return criteria
+
+
+def _get_task_lists_page(db: Session, model, limit: int, cursor: Optional[str], device_id: Optional[UUID],
+                         status: Optional[str], timing_from: Optional[datetime], timing_to: Optional[datetime],
+                         keys: list[str], descending: bool):
+    stmt = select(*task_list_columns(model)) \
+        .where(*_task_lists_criteria(model, device_id, status, timing_from, timing_to))
+    if 'timing' in keys:
+        stmt = stmt.where(model.timing.isnot(None))
+    columns = [getattr(model, key) for key in keys]
+    return [row._asdict() for row in db.execute(apply_keyset(stmt, columns, cursor, limit, descending))]
+
+
+def get_all_task_lists(db: Session, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None,
+                       device_id: Optional[UUID] = None, status: Optional[str] = None,
+                       timing_from: Optional[datetime] = None, timing_to: Optional[datetime] = None,
+                       sort_by: str = 'timing', descending: bool = False, include_archive: bool = False):
+    """
+    Получить страницу заданий с фильтрами, отсортированную по (timing, id) или по id.
+    При сортировке по timing задания без времени выполнения не попадают в выборку.
+    С include_archive страница собирается из рабочей и архивной таблиц по тому же курсору.
+    Возвращает (список заданий, курсор следующей страницы или None).
+    """
+    try:
+        keys = ['timing', 'id'] if sort_by == 'timing' else ['id']
+        task_lists_list = _get_task_lists_page(db, TaskLists, limit, cursor, device_id, status,
+                                               timing_from, timing_to, keys, descending)
+        if include_archive:
+            task_lists_list += _get_task_lists_page(db, TaskListsArchive, limit, cursor, device_id, status,
+                                                    timing_from, timing_to, keys, descending)
+            task_lists_list.sort(key=lambda task: tuple(task[key] for key in keys), reverse=descending)
+            task_lists_list = task_lists_list[:limit + 1]
+        return split_page(task_lists_list, keys, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+def iter_task_lists(db: Session, device_id: Optional[UUID] = None, status: Optional[str] = None,
+                    timing_from: Optional[datetime] = None, timing_to: Optional[datetime] = None,
+                    include_archive: bool = False):
+    """
+    Все задания с фильтрами (как в get_all_task_lists) для выгрузки, без сортировки.
+    Генератор словарей: строки читаются из серверного курсора пачками по STREAM_BATCH_SIZE.
+    С include_archive после рабочей таблицы выгружается архив.
+    """
+    models = (TaskLists, TaskListsArchive) if include_archive else (TaskLists,)
+    for model in models:
+        stmt = select(*task_list_columns(model)) \
+            .where(*_task_lists_criteria(model, device_id, status, timing_from, timing_to)) \
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        for row in db.execute(stmt):
+            yield row._asdict()
+
+
+def claim_due_task_lists(db: Session, device_id: UUID, limit: int = 100):
+    """
+    Атомарно захватить наступившие задания устройства.
+
+    В одной транзакции выбирает задания со статусом 'Ожидает' и timing <= now,
+    блокирует их (SKIP LOCKED там, где СУБД это поддерживает, чтобы параллельные
+    опросы не ждали друг друга и не получали одни и те же задания),
+    переводит в статус 'Выполняется' и возвращает их.
+
+    UPDATE повторно проверяет статус 'Ожидает': там, где SKIP LOCKED не действует, параллельный
+    опрос мог успеть захватить те же задания. Возвращаются только задания, которые изменил
+    этот UPDATE (RETURNING); без RETURNING при неполном rowcount захват откатывается целиком,
+    и задания достаются следующему опросу.
+    """
+    try:
+        tasks = db.execute(
+            select(*task_list_columns())
+            .where(TaskLists.device_id == str(device_id),
+                   TaskLists.status == 'Ожидает',
+                   TaskLists.timing <= datetime.now())
+            .order_by(TaskLists.timing)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = [dict(task._asdict(), status='Выполняется') for task in tasks]
+        if claimed:
+            stmt = update(TaskLists) \
+                .where(TaskLists.id.in_([task['id'] for task in claimed]), TaskLists.status == 'Ожидает') \
+                .values(status='Выполняется') \
+                .execution_options(synchronize_session=False)
+            if db.get_bind().dialect.update_returning:
+                updated = set(db.scalars(stmt.returning(TaskLists.id)))
+                claimed = [task for task in claimed if task['id'] in updated]
+            elif db.execute(stmt).rowcount != len(claimed):
+                db.rollback()
+                return []
+        db.commit()
+        return claimed
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Непредвиденная ошибка: {str(e)}"
+        )
+
+
+def get_task_list_by_id(db: Session, task_list_id: UUID, include_archive: bool = False):
+    """
+    Получить задание по id; при include_archive отсутствующее в рабочей таблице задание ищется в архиве.
+    """
+    try:
+        return task_lists_repository.get(db, str(task_list_id))
+    except HTTPException as e:
+        if e.status_code != 404 or not include_archive:
+            raise
+    return task_lists_archive_repository.get(db, str(task_list_id))
+
+
+def update_task_list(db: Session, task_list_id: UUID, changes: dict):
+    return task_lists_repository.update(db, str(task_list_id), changes)
+
+
+def delete_task_list(db: Session, task_list_id: UUID):
+    return task_lists_repository.delete(db, str(task_list_id))
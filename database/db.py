@@ -1,20 +1,117 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from fastapi import Request, Response
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
+from database.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from database.replicas import ReplicaSet, RoutingSession, connect_replica
 
 
 Base = declarative_base()
 
 DBConf = settings['database']
-engine = create_engine(
-    f'mysql+pymysql://{DBConf["user"]}:{DBConf["password"]}@{DBConf["host"]}:{DBConf["port"]}/{DBConf["db"]}')
+# url/async_url позволяют подключить другую СУБД (например, SQLite-файл для локальной проверки)
+DB_URL = DBConf.get('url') or \
+    f'mysql+pymysql://{DBConf["user"]}:{DBConf["password"]}@{DBConf["host"]}:{DBConf["port"]}/{DBConf["db"]}'
+ASYNC_DB_URL = DBConf.get('async_url') or \
+    f'mysql+aiomysql://{DBConf["user"]}:{DBConf["password"]}@{DBConf["host"]}:{DBConf["port"]}/{DBConf["db"]}'
+# Асинхронный режим: CRUD-эндпоинты обслуживаются асинхронными обработчиками с AsyncSession
+ASYNC_MODE = bool(DBConf.get('async_mode', False))
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Параметры пула соединений из settings['database'].
+    pool_pre_ping отсекает соединения, закрытые MySQL по wait_timeout,
+    pool_recycle пересоздает соединения до истечения wait_timeout.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:'):
+        # База в памяти живет в единственном соединении, пул не настраивается
+        return {}
+    return {
+        'poolclass': InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        'pool_size': DBConf.get('pool_size', 10),
+        'max_overflow': DBConf.get('max_overflow', 20),
+        'pool_timeout': DBConf.get('pool_timeout', 30),
+        'pool_recycle': DBConf.get('pool_recycle', 1800),
+        'pool_pre_ping': DBConf.get('pool_pre_ping', True),
+    }
+
+
+def _replica_url(replica) -> str:
+    if isinstance(replica, str):
+        return replica
+    if replica.get('url'):
+        return replica['url']
+    conf = dict(DBConf, **replica)
+    return f'mysql+pymysql://{conf["user"]}:{conf["password"]}@{conf["host"]}:{conf["port"]}/{conf["db"]}'
+
+
+engine = create_engine(DB_URL, **engine_options(DB_URL))
 session_maker = sessionmaker(bind=engine)
 
+# Реплики для чтения: список URL или словарей с параметрами подключения (недостающие берутся из основной БД)
+replica_engines = [create_engine(url, **engine_options(url)) for url in map(_replica_url, DBConf.get('replicas', []))]
+replica_set = ReplicaSet(replica_engines, cooldown=DBConf.get('replica_cooldown', 30)) if replica_engines else None
+# Сколько секунд после записи клиент читает из основной БД (задержка репликации)
+REPLICA_LAG_WINDOW = DBConf.get('replica_lag_window', 5)
+PRIMARY_COOKIE = 'db_primary_until'
+
+async_engine = create_async_engine(ASYNC_DB_URL, **engine_options(ASYNC_DB_URL, is_async=True)) if ASYNC_MODE else None
+async_session_maker = async_sessionmaker(bind=async_engine, expire_on_commit=False) if ASYNC_MODE else None
+
+
+def _reads_from_replica(request: Request) -> bool:
+    if replica_set is None or request.method != 'GET':
+        return False
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) < time.time()
+    except ValueError:
+        return True
+
+
+def get_db(request: Request, response: Response):
+    """
+    Сессия БД для запроса.
+
+    GET-запросы читают с реплики (если реплики настроены и доступны), остальные работают
+    с основной БД. После изменяющего запроса клиенту ставится cookie, и следующие
+    REPLICA_LAG_WINDOW секунд его GET-запросы тоже читают из основной БД.
+    """
+    if replica_set is not None and request.method != 'GET':
+        # Код после yield выполняется уже после отправки ответа, поэтому cookie ставится заранее
+        response.set_cookie(PRIMARY_COOKIE, str(time.time() + REPLICA_LAG_WINDOW),
+                            max_age=REPLICA_LAG_WINDOW, httponly=True)
+    replica_connection = connect_replica(replica_set) if _reads_from_replica(request) else None
+    db = RoutingSession(engine, read_bind=replica_connection)
+    try:
+        yield db
+    finally:
+        db.close()
+        if replica_connection is not None:
+            replica_connection.close()
+
 
-def get_db():
-    db = session_maker()
+@contextmanager
+def read_session():
+    """
+    Сессия для долгого чтения вне зависимостей запроса (например, потоковой выгрузки,
+    которая продолжается после выхода из обработчика). Читает с реплики, если она доступна.
+    """
+    replica_connection = connect_replica(replica_set)
+    db = RoutingSession(engine, read_bind=replica_connection)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        if replica_connection is not None:
+            replica_connection.close()
+
+
+async def get_async_db():
+    async with async_session_maker() as db:
+        yield db
@@ -0,0 +1,6 @@
+from database.migrations.runner import MIGRATIONS, migrate
+
+__all__ = [
+    "MIGRATIONS",
+    "migrate",
+]
@@ -0,0 +1,10 @@
+import logging
+
+from database.db import engine
+from database.migrations import migrate
+
+# Запуск: python -m database.migrations (до старта uvicorn)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+applied = migrate(engine)
+logging.getLogger('database.migrations').info(
+    'Применено миграций: %s%s', len(applied), f" ({', '.join(applied)})" if applied else '')
@@ -0,0 +1,28 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def has_table(connection: Connection, table_name: str) -> bool:
+    return inspect(connection).has_table(table_name)
+
+
+def has_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    return column_name in {column['name'] for column in inspect(connection).get_columns(table_name)}
+
+
+def has_index(connection: Connection, table_name: str, index_name: str) -> bool:
+    inspector = inspect(connection)
+    names = {index['name'] for index in inspector.get_indexes(table_name)}
+    names.update(constraint['name'] for constraint in inspector.get_unique_constraints(table_name))
+    return index_name in names
+
+
+def create_index(connection: Connection, index_name: str, table_name: str, columns: tuple[str, ...],
+                 unique: bool = False):
+    """
+    Создать индекс, если его еще нет (повторный запуск миграции после сбоя ничего не ломает).
+    """
+    if has_index(connection, table_name, index_name):
+        return
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    connection.execute(text(f'CREATE {kind} {index_name} ON {table_name} ({", ".join(columns)})'))
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+# Определение зафиксировано на момент миграции и не следует за моделью TableVersions
+table_versions = Table(
+    'table_versions', MetaData(),
+    Column('table_name', String(64), primary_key=True),
+    Column('version', BigInteger, nullable=False, default=0),
+    Column('updated_at', DateTime, nullable=False),
+)
+
+
+def upgrade(connection: Connection):
+    """
+    Таблица версий справочников (ETag списков, сброс кэшей после записи).
+    """
+    table_versions.create(connection, checkfirst=True)
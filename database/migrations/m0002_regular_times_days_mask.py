@@ -0,0 +1,40 @@
+from sqlalchemy import JSON, Column, Integer, MetaData, SmallInteger, String, Table, bindparam, select, text, update
+from sqlalchemy.engine import Connection
+
+from database.migrations.helpers import create_index, has_column
+from database.models.regular_times_model import days_to_mask
+
+# Определение зафиксировано на момент миграции и не следует за моделью RegularTimes
+regular_times = Table(
+    'regular_times', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('period', String(11), nullable=False),
+    Column('days', JSON, nullable=False),
+    Column('days_mask', SmallInteger, nullable=False, default=0),
+)
+
+
+def upgrade(connection: Connection, batch_size: int = 1000):
+    """
+    Колонка days_mask расписаний, индекс (timing, days_mask) и маски для уже существующих строк.
+    Строки перебираются по id пачками по batch_size; версия таблицы не меняется:
+    приложение еще не запущено, и сбрасывать ему нечего.
+    """
+    if not has_column(connection, 'regular_times', 'days_mask'):
+        connection.execute(text('ALTER TABLE regular_times ADD COLUMN days_mask SMALLINT NOT NULL DEFAULT 0'))
+    create_index(connection, 'ix_regular_times_timing_days_mask', 'regular_times', ('timing', 'days_mask'))
+
+    stmt = (update(regular_times)
+            .where(regular_times.c.id == bindparam('b_id'))
+            .values(days_mask=bindparam('b_days_mask')))
+    last_id = 0
+    while rows := connection.execute(
+            select(regular_times.c.id, regular_times.c.period, regular_times.c.days)
+            .where(regular_times.c.days_mask == 0, regular_times.c.id > last_id)
+            .order_by(regular_times.c.id)
+            .limit(batch_size)).all():
+        last_id = rows[-1].id
+        changes = [{'b_id': row.id, 'b_days_mask': days_to_mask(row.days, row.period)} for row in rows]
+        changes = [change for change in changes if change['b_days_mask']]
+        if changes:
+            connection.execute(stmt, changes)
@@ -0,0 +1,25 @@
+from sqlalchemy import CHAR, Boolean, Column, DateTime, Enum, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+# Определение зафиксировано на момент миграции и не следует за моделью TaskListsArchive
+task_lists_archive = Table(
+    'task_lists_archive', MetaData(),
+    Column('id', CHAR(36), primary_key=True),
+    Column('device_id', CHAR(36), nullable=False),
+    Column('cmd', String(255), nullable=False),
+    Column('is_regular', Boolean),
+    Column('timing', DateTime),
+    Column('regular_time_id', Integer, nullable=True),
+    Column('status', Enum('Ожидает', 'Выполняется', 'Успешно', 'Ошибка', 'Зарегистрировано на устройстве')),
+    Column('archived_at', DateTime, nullable=False),
+    Index('ix_task_lists_archive_timing_id', 'timing', 'id'),
+    Index('ix_task_lists_archive_device_timing_id', 'device_id', 'timing', 'id'),
+    Index('ix_task_lists_archive_status_timing_id', 'status', 'timing', 'id'),
+)
+
+
+def upgrade(connection: Connection):
+    """
+    Холодная таблица завершенных заданий для фонового архиватора.
+    """
+    task_lists_archive.create(connection, checkfirst=True)
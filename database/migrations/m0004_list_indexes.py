@@ -0,0 +1,67 @@
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, and_, delete, func, select
+from sqlalchemy.engine import Connection
+
+from database.migrations.helpers import create_index
+
+# Определение зафиксировано на момент миграции и не следует за моделью TaskLists
+task_lists = Table(
+    'task_lists', MetaData(),
+    Column('id', String(36), primary_key=True),
+    Column('device_id', String(36), nullable=False),
+    Column('cmd', String(255), nullable=False),
+    Column('timing', DateTime),
+    Column('regular_time_id', Integer, nullable=True),
+    Column('status', String(30)),
+)
+
+SLOT_COLUMNS = ('regular_time_id', 'device_id', 'cmd', 'timing')
+
+# Индексы keyset-пагинации и фильтров списков: (имя, таблица, колонки)
+INDEXES = [
+    ('ix_task_lists_timing_id', 'task_lists', ('timing', 'id')),
+    ('ix_task_lists_device_timing_id', 'task_lists', ('device_id', 'timing', 'id')),
+    ('ix_task_lists_status_timing_id', 'task_lists', ('status', 'timing', 'id')),
+    ('ix_task_lists_device_status_timing', 'task_lists', ('device_id', 'status', 'timing')),
+    ('ix_devices_filial_id_id', 'devices', ('filial_id', 'id')),
+    ('ix_devices_model_id_id', 'devices', ('model_id', 'id')),
+    ('ix_filial_enterprises_inn_id', 'filial_enterprises', ('inn', 'id')),
+    ('ix_regular_times_period_id', 'regular_times', ('period', 'id')),
+]
+
+
+def _dedupe_regular_slots(connection: Connection, batch_size: int = 1000):
+    """
+    Оставить по одному заданию на слот расписания (regular_time_id, device_id, cmd, timing).
+    Сохраняется задание, которое уже взято в работу (статус не 'Ожидает'), иначе - с меньшим id.
+    """
+    slot = [task_lists.c[name] for name in SLOT_COLUMNS]
+    duplicates = (select(*slot)
+                  .where(task_lists.c.regular_time_id.is_not(None))
+                  .group_by(*slot)
+                  .having(func.count() > 1)
+                  .subquery())
+    rows = connection.execute(
+        select(task_lists.c.id, task_lists.c.status, *slot)
+        .join(duplicates, and_(*(column == duplicates.c[column.name] for column in slot)))
+        .order_by(*slot, task_lists.c.id)).all()
+    keep = {}
+    for row in rows:
+        key = tuple(row[2:])
+        if key not in keep or (keep[key].status == 'Ожидает' and row.status != 'Ожидает'):
+            keep[key] = row
+    kept = {row.id for row in keep.values()}
+    extra = [row.id for row in rows if row.id not in kept]
+    for start in range(0, len(extra), batch_size):
+        connection.execute(delete(task_lists).where(task_lists.c.id.in_(extra[start:start + batch_size])))
+
+
+def upgrade(connection: Connection):
+    """
+    Индексы списков и уникальность слота регулярного задания.
+    Перед созданием уникального индекса удаляются задания-дубли одного слота,
+    иначе на уже работающей базе индекс не создастся.
+    """
+    for index_name, table_name, columns in INDEXES:
+        create_index(connection, index_name, table_name, columns)
+    _dedupe_regular_slots(connection)
+    create_index(connection, 'uq_task_lists_regular_slot', 'task_lists', SLOT_COLUMNS, unique=True)
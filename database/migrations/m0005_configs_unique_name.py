@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, MetaData, String, Table, delete, func, select
+from sqlalchemy.engine import Connection
+
+from database.migrations.helpers import create_index
+
+# Определение зафиксировано на момент миграции и не следует за моделью Configs
+configs = Table(
+    'configs', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('name', String(255), nullable=False),
+)
+
+
+def upgrade(connection: Connection, batch_size: int = 1000):
+    """
+    Уникальность имени настройки. Из дублей одного имени остается запись с меньшим id:
+    до уникального индекса чтение и запись по имени (.first()) попадали именно в нее.
+    """
+    keep = (select(func.min(configs.c.id))
+            .group_by(configs.c.name)
+            .having(func.count() > 1)
+            .subquery())
+    duplicates = (select(configs.c.name)
+                  .group_by(configs.c.name)
+                  .having(func.count() > 1)
+                  .subquery())
+    extra = list(connection.scalars(
+        select(configs.c.id)
+        .where(configs.c.name.in_(select(duplicates.c.name)), configs.c.id.not_in(select(keep)))))
+    for start in range(0, len(extra), batch_size):
+        connection.execute(delete(configs).where(configs.c.id.in_(extra[start:start + batch_size])))
+    create_index(connection, 'uq_configs_name', 'configs', ('name',), unique=True)
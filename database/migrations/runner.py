@@ -0,0 +1,75 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from database.migrations import (
+    m0001_table_versions,
+    m0002_regular_times_days_mask,
+    m0003_task_lists_archive,
+    m0004_list_indexes,
+    m0005_configs_unique_name,
+)
+
+logger = logging.getLogger(__name__)
+
+# Миграции по порядку применения: (имя, функция upgrade(connection)).
+# Базовую схему создает mysql-init; миграции доводят ее до текущих моделей.
+MIGRATIONS = [
+    ('0001_table_versions', m0001_table_versions.upgrade),
+    ('0002_regular_times_days_mask', m0002_regular_times_days_mask.upgrade),
+    ('0003_task_lists_archive', m0003_task_lists_archive.upgrade),
+    ('0004_list_indexes', m0004_list_indexes.upgrade),
+    ('0005_configs_unique_name', m0005_configs_unique_name.upgrade),
+]
+
+# Блокировка MySQL, чтобы миграции не выполнялись одновременно из нескольких запусков
+MIGRATIONS_LOCK = 'feeder_api_migrations'
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('name', String(100), primary_key=True),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+@contextmanager
+def _migrations_lock(connection: Connection, timeout: int = 600):
+    if connection.dialect.name != 'mysql':
+        yield
+        return
+    if not connection.execute(text('SELECT GET_LOCK(:name, :timeout)'),
+                              {'name': MIGRATIONS_LOCK, 'timeout': timeout}).scalar():
+        raise RuntimeError('Не удалось получить блокировку миграций: их выполняет другой процесс.')
+    try:
+        yield
+    finally:
+        connection.execute(text('SELECT RELEASE_LOCK(:name)'), {'name': MIGRATIONS_LOCK})
+
+
+def migrate(engine: Engine) -> list[str]:
+    """
+    Применить непримененные миграции. Запускается один раз перед стартом приложения
+    (python -m database.migrations), а не в каждом воркере.
+
+    Примененные миграции записываются в schema_migrations. В MySQL DDL фиксируется сразу,
+    поэтому каждая миграция написана так, чтобы ее повтор после сбоя доводил дело до конца.
+    Возвращает имена примененных миграций.
+    """
+    applied_now = []
+    with engine.connect() as connection:
+        with _migrations_lock(connection):
+            schema_migrations.create(connection, checkfirst=True)
+            connection.commit()
+            applied = set(connection.scalars(select(schema_migrations.c.name)))
+            for name, upgrade in MIGRATIONS:
+                if name in applied:
+                    continue
+                logger.info('Применяется миграция %s', name)
+                upgrade(connection)
+                connection.execute(insert(schema_migrations).values(name=name, applied_at=datetime.now()))
+                connection.commit()
+                applied_now.append(name)
+    return applied_now
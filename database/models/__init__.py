@@ -4,14 +4,18 @@ from .devices_model import Devices
 from .enterprises_model import Enterprises
 from .filial_enterprises_model import FilialEnterprises
 from .regular_times_model import RegularTimes
+from .table_versions_model import TableVersions
 from .task_lists_model import TaskLists
+from .task_lists_archive_model import TaskListsArchive
 
 __all__ = [
     "DeviceModels",
     "Devices",
     "Enterprises",
     "TaskLists",
+    "TaskListsArchive",
     "FilialEnterprises",
     "RegularTimes",
     "Configs",
+    "TableVersions",
 ]
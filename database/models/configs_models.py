@@ -1,11 +1,15 @@
-from sqlalchemy.orm import mapped_column, Mapped, declarative_base
-from sqlalchemy import Integer, String, JSON
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import Integer, String, JSON, Index
+from database.db import Base
 
-Base = declarative_base()
 
 class Configs(Base):
     __tablename__ = 'configs'
+    __table_args__ = (
+        # Настройки ищутся по имени; уникальность не дает set_setting_value создать дубликат
+        Index('uq_configs_name', 'name', unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(255))
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
     value: Mapped[dict] = mapped_column(JSON)
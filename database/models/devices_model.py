@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import uuid4
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import CHAR, Integer, String, ForeignKey
+from sqlalchemy import CHAR, Integer, String, ForeignKey, Index
 from database.db import Base
 
 if TYPE_CHECKING:
@@ -12,6 +12,11 @@ if TYPE_CHECKING:
 
 class Devices(Base):
     __tablename__ = 'devices'
+    __table_args__ = (
+        # Индексы под keyset-пагинацию списка устройств с фильтрами
+        Index('ix_devices_filial_id_id', 'filial_id', 'id'),
+        Index('ix_devices_model_id_id', 'model_id', 'id'),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
     model_id: Mapped[int] = mapped_column(Integer, ForeignKey('device_models.id'), nullable=False)
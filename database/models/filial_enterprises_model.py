@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy import Integer, String, ForeignKey, Index
 from database.db import Base
 
 if TYPE_CHECKING:
@@ -10,6 +10,9 @@ if TYPE_CHECKING:
 
 class FilialEnterprises(Base):
     __tablename__ = 'filial_enterprises'
+    __table_args__ = (
+        Index('ix_filial_enterprises_inn_id', 'inn', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     inn: Mapped[str] = mapped_column(String(12), ForeignKey('enterprises.inn'), nullable=False)
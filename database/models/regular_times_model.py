@@ -1,19 +1,78 @@
 from datetime import time
-from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import Integer, String, Enum, JSON, Time
-from typing import TYPE_CHECKING
+from sqlalchemy.orm import mapped_column, Mapped, relationship, validates
+from sqlalchemy import Integer, SmallInteger, String, Enum, JSON, Time, Index
+from typing import TYPE_CHECKING, Optional
 from database.db import Base
 
 if TYPE_CHECKING:
     from database.models.task_lists_model import TaskLists
 
+# Маска "каждый день": биты 0..6 соответствуют дням 1 (понедельник) .. 7 (воскресенье)
+ALL_DAYS_MASK = 0b1111111
+
+
+def days_to_mask(days: Optional[list], period: Optional[str] = None) -> int:
+    """
+    Преобразовать список дней недели (1-7) в 7-битную маску.
+    Для периодичности 'Ежедневно' маска всегда содержит все дни.
+    """
+    if period == 'Ежедневно':
+        return ALL_DAYS_MASK
+    mask = 0
+    for day in days or []:
+        mask |= 1 << (day - 1)
+    return mask
+
+
+def mask_to_days(mask: int) -> list[int]:
+    """
+    Преобразовать 7-битную маску обратно в отсортированный список дней недели.
+    """
+    return [day for day in range(1, 8) if mask & (1 << (day - 1))]
+
+
+def with_days_mask(changes: dict, current_days: Optional[list] = None, current_period: Optional[str] = None) -> dict:
+    """
+    Дополнить изменения расписания пересчитанной days_mask.
+    Нужно для set-based UPDATE, при котором валидаторы модели не вызываются.
+    current_days/current_period - текущие значения, если меняется только одно из полей.
+    """
+    if 'days' not in changes and 'period' not in changes:
+        return changes
+    days = changes.get('days', current_days)
+    period = changes.get('period', current_period)
+    return {**changes, 'days_mask': days_to_mask(days, period)}
+
+
+def weekday_bit(weekday: int) -> int:
+    """
+    Бит дня недели (1 - понедельник, 7 - воскресенье) в маске days_mask.
+    """
+    return 1 << (weekday - 1)
+
 
 class RegularTimes(Base):
     __tablename__ = 'regular_times'
+    __table_args__ = (
+        Index('ix_regular_times_period_id', 'period', 'id'),
+        # "Какие расписания срабатывают в интервале времени в день D": range по timing, маска из индекса
+        Index('ix_regular_times_timing_days_mask', 'timing', 'days_mask'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     period: Mapped[str] = mapped_column(Enum('Еженедельно', 'Ежедневно'))
     days: Mapped[dict] = mapped_column(JSON)
+    days_mask: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
     timing: Mapped[time] = mapped_column(Time)
 
-    tasks: Mapped[list['TaskLists']] = relationship('TaskLists', back_populates='reg_times', cascade='delete')
\ No newline at end of file
+    tasks: Mapped[list['TaskLists']] = relationship('TaskLists', back_populates='reg_times', cascade='delete')
+
+    @validates('days')
+    def _sync_mask_from_days(self, key, days):
+        self.days_mask = days_to_mask(days, self.period)
+        return days
+
+    @validates('period')
+    def _sync_mask_from_period(self, key, period):
+        self.days_mask = days_to_mask(self.days, period)
+        return period
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import String, BigInteger, DateTime
+from database.db import Base
+
+
+class TableVersions(Base):
+    """
+    Счетчик изменений таблицы: увеличивается в той же транзакции, что и изменение данных.
+    По нему кэши в памяти процессов понимают, что таблицу нужно перечитать.
+    """
+    __tablename__ = 'table_versions'
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
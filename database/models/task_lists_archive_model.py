@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy.orm import mapped_column, Mapped
+from sqlalchemy import Integer, String, Enum, Boolean, DateTime, CHAR, Index
+from database.db import Base
+
+
+class TaskListsArchive(Base):
+    """
+    Холодная таблица завершенных заданий ('Успешно', 'Ошибка').
+    Строки переносятся из task_lists фоновым архиватором; внешних ключей нет,
+    чтобы история не мешала удалению устройств и расписаний.
+    """
+    __tablename__ = 'task_lists_archive'
+    __table_args__ = (
+        Index('ix_task_lists_archive_timing_id', 'timing', 'id'),
+        Index('ix_task_lists_archive_device_timing_id', 'device_id', 'timing', 'id'),
+        Index('ix_task_lists_archive_status_timing_id', 'status', 'timing', 'id'),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    device_id: Mapped[str] = mapped_column(CHAR(36), nullable=False)
+    cmd: Mapped[str] = mapped_column(String(255), nullable=False)
+    is_regular: Mapped[bool] = mapped_column(Boolean, default=False)
+    timing: Mapped[datetime] = mapped_column(DateTime)
+    regular_time_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    status: Mapped[str] = mapped_column(Enum(
+        'Ожидает',
+        'Выполняется',
+        'Успешно',
+        'Ошибка',
+        'Зарегистрировано на устройстве'))
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import uuid4
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import Integer, String, Enum, Boolean, DateTime, ForeignKey, CHAR
+from sqlalchemy import Integer, String, Enum, Boolean, DateTime, ForeignKey, CHAR, Index, UniqueConstraint
 from database.db import Base
 
 if TYPE_CHECKING:
@@ -12,6 +12,16 @@ if TYPE_CHECKING:
 
 class TaskLists(Base):
     __tablename__ = 'task_lists'
+    __table_args__ = (
+        # Индексы под keyset-пагинацию списка заданий: фильтр + (timing, id)
+        Index('ix_task_lists_timing_id', 'timing', 'id'),
+        Index('ix_task_lists_device_timing_id', 'device_id', 'timing', 'id'),
+        Index('ix_task_lists_status_timing_id', 'status', 'timing', 'id'),
+        # Выборка наступивших заданий устройства при захвате (claim_due_task_lists)
+        Index('ix_task_lists_device_status_timing', 'device_id', 'status', 'timing'),
+        # Одно задание на слот регулярного расписания: защищает от дублей при повторной генерации
+        UniqueConstraint('regular_time_id', 'device_id', 'cmd', 'timing', name='uq_task_lists_regular_slot'),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
     device_id: Mapped[str] = mapped_column(CHAR(36), ForeignKey('devices.id'), nullable=False)
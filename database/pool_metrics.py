@@ -0,0 +1,116 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Границы корзин гистограммы ожидания соединения, в секундах
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+
+class PoolMetrics:
+    """
+    Счетчики пула соединений: время ожидания выдачи соединения (гистограмма),
+    таймауты, новые и инвалидированные (устаревшие) соединения.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidated = 0
+
+    def count_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def count_invalidated(self):
+        with self._lock:
+            self.invalidated += 1
+
+    def count_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidated': self.invalidated,
+                'wait': {
+                    'count': self.wait_count,
+                    'avg_ms': round(self.wait_sum / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                    'max_ms': round(self.wait_max * 1000, 3),
+                    'buckets_ms': {('+Inf' if bound == float('inf') else str(bound * 1000)): count
+                                   for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)},
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        # recreate() (engine.dispose()) передает слушатели старого пула в _dispatch: они уже
+        # считают в общие metrics, и повторная подписка считала бы каждое событие дважды
+        if kwargs.get('_dispatch') is None:
+            event.listen(self, 'connect', self._on_connect)
+            event.listen(self, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.metrics.count_connect()
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.metrics.count_invalidated()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.count_timeout()
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool со сбором метрик (PoolMetrics в атрибуте metrics)."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool со сбором метрик (PoolMetrics в атрибуте metrics)."""
+
+
+def pool_stats(engine) -> dict:
+    """
+    Снимок состояния пула движка. Для пулов без инструментирования - только базовые показатели.
+    """
+    pool = engine.pool
+    if isinstance(pool, _InstrumentedPoolMixin):
+        return pool.metrics.snapshot(pool)
+    return {'status': pool.status()}
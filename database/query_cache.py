@@ -0,0 +1,285 @@
+import asyncio
+import functools
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable
+
+from config import settings
+from database.db import REPLICA_LAG_WINDOW, replica_engines
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Отметка промаха: None - допустимый закэшированный результат
+_MISS = object()
+
+
+class MemoryCacheBackend:
+    """
+    LRU-кэш в памяти воркера с временем жизни записей.
+    Значения хранятся как есть, без сериализации: вызывающий код не должен их изменять.
+    Поколения тоже локальны: записи других воркеров сюда доходят через версии
+    таблиц (см. QueryCache.sync_versions).
+    """
+
+    name = 'memory'
+    shared = False
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._generations: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return _MISS
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return _MISS
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def generation(self, key: str) -> tuple[int, float]:
+        return self._generations.get(key, (0, 0.0))
+
+    def bump(self, key: str):
+        with self._lock:
+            self._generations[key] = (self.generation(key)[0] + 1, time.time())
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RedisCacheBackend:
+    """
+    Кэш в Redis, общий для всех воркеров; поколения (INCR) тоже общие,
+    поэтому сброс после записи в одном воркере сразу виден остальным.
+
+    client - клиент с интерфейсом redis.Redis (get, mget, set с ex, incr): можно передать готовый
+    клиент или локальную замену, from_url создает клиент пакета redis (необязательная зависимость).
+    Значения сериализуются pickle: Redis считается доверенной внутренней инфраструктурой.
+    """
+
+    name = 'redis'
+    shared = True
+
+    def __init__(self, client, prefix: str = 'feeder:cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'feeder:cache:', timeout: float = 0.5):
+        if redis is None:
+            raise RuntimeError('Для cache.backend = "redis" нужен пакет redis (pip install redis).')
+        return cls(redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout), prefix)
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        return _MISS if raw is None else pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=max(1, int(ttl)))
+
+    def generation(self, key: str) -> tuple[int, float]:
+        number, changed_at = self.client.mget([self.prefix + key, self.prefix + key + ':at'])
+        return int(number or 0), float(changed_at or 0)
+
+    def bump(self, key: str):
+        # Время пишется до номера: увидевший новый номер увидит и новое время
+        self.client.set(self.prefix + key + ':at', time.time())
+        self.client.incr(self.prefix + key)
+
+
+class QueryCache:
+    """
+    Кэш результатов CRUD-функций чтения справочников.
+
+    Ключ записи включает номер поколения таблицы; запись в таблицу (после commit) увеличивает
+    поколение, и все прежние записи перестают читаться, без поиска и удаления ключей.
+    Чтение, начатое до записи и сохранившее результат позже, попадает в старое поколение,
+    поэтому устаревшие данные не переживают сброс.
+    Результаты, вычисленные в первые settle_seconds после сброса, не сохраняются: чтение
+    с отстающей реплики могло вернуть данные до записи и закрепить их в новом поколении.
+    Ошибки хранилища не ломают запрос: функция выполняется без кэша, ошибка считается в errors.
+
+    Хранилище не общее для воркеров (MemoryCacheBackend), поэтому сброс после записи
+    в другом воркере сюда не приходит. Вместо этого сбрасываются таблицы, чья версия
+    в table_versions изменилась (sync_versions): перед чтением списка по ETag и в фоне
+    при сверке снимка настроек.
+    """
+
+    def __init__(self, backend, ttl: float = 60.0, settle_seconds: float = 0.0, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.settle_seconds = settle_seconds
+        self.enabled = enabled
+        self.tables: set[str] = set()
+        self._versions: dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+        self.errors = 0
+
+    def _count(self, table_name: str, counter: str):
+        self._stats[table_name][counter] += 1
+
+    def _lookup(self, table_name: str, key: str) -> tuple[str, Any, float]:
+        generation, changed_at = self.backend.generation(f'gen:{table_name}')
+        key = f'{table_name}:{generation}:{key}'
+        return key, self.backend.get(key), changed_at
+
+    def get_or_compute(self, table_name: str, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Результат compute() из кэша текущего поколения таблицы или вычисленный и сохраненный.
+        Для таблиц, не зарегистрированных через cached, кэш не используется.
+        """
+        if not self.enabled or table_name not in self.tables:
+            return compute()
+        try:
+            key, value, changed_at = self._lookup(table_name, key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning('Кэш запросов недоступен: %s', e)
+            return compute()
+        if value is not _MISS:
+            self._count(table_name, 'hits')
+            return value
+        self._count(table_name, 'misses')
+        value = compute()
+        if time.time() - changed_at < self.settle_seconds:
+            return value
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning('Не удалось сохранить результат в кэш запросов: %s', e)
+        return value
+
+    async def aget_or_compute(self, table_name: str, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        get_or_compute для асинхронного чтения: compute - корутинная функция.
+        Обращения к общему хранилищу (Redis, синхронный клиент) выполняются в потоке,
+        чтобы не блокировать цикл событий; хранилище в памяти вызывается напрямую.
+        """
+        if not self.enabled or table_name not in self.tables:
+            return await compute()
+
+        async def call(func, *args):
+            return await asyncio.to_thread(func, *args) if self.shared else func(*args)
+
+        try:
+            key, value, changed_at = await call(self._lookup, table_name, key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning('Кэш запросов недоступен: %s', e)
+            return await compute()
+        if value is not _MISS:
+            self._count(table_name, 'hits')
+            return value
+        self._count(table_name, 'misses')
+        value = await compute()
+        if time.time() - changed_at < self.settle_seconds:
+            return value
+        try:
+            await call(self.backend.set, key, value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning('Не удалось сохранить результат в кэш запросов: %s', e)
+        return value
+
+    def cached(self, table_name: str):
+        """
+        Декоратор функции чтения func(db, *args, **kwargs), результат которой зависит
+        только от аргументов и данных таблицы table_name.
+        """
+        self.tables.add(table_name)
+        self._stats.setdefault(table_name, {'hits': 0, 'misses': 0})
+
+        def decorator(func):
+            name = f'{func.__module__}.{func.__qualname__}'
+
+            @functools.wraps(func)
+            def wrapper(db, *args, **kwargs):
+                return self.get_or_compute(table_name, f'{name}:{args!r}:{sorted(kwargs.items())!r}',
+                                           lambda: func(db, *args, **kwargs))
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, table_names: Iterable[str]):
+        """
+        Сбросить закэшированные результаты таблиц. Вызывается после commit изменения данных.
+        """
+        for table_name in sorted(set(table_names) & self.tables):
+            try:
+                self.backend.bump(f'gen:{table_name}')
+            except Exception as e:
+                self.errors += 1
+                logger.error('Не удалось сбросить кэш запросов таблицы %s: %s', table_name, e)
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    def sync_versions(self, versions: dict[str, int]):
+        """
+        Сбросить кэш таблиц, версия которых (из table_versions) отличается от уже виденной
+        этим процессом. Нужна только для хранилища в памяти: общее хранилище сбрасывает
+        записывающий воркер. Таблица, версия которой видна впервые, тоже сбрасывается:
+        неизвестно, не сохранены ли ее данные до этой версии.
+        """
+        if self.shared:
+            return
+        changed = []
+        with self._versions_lock:
+            for table_name, version in versions.items():
+                if table_name in self.tables and self._versions.get(table_name) != version:
+                    self._versions[table_name] = version
+                    changed.append(table_name)
+        self.invalidate(changed)
+
+    def stats(self) -> dict:
+        hits = sum(table['hits'] for table in self._stats.values())
+        lookups = hits + sum(table['misses'] for table in self._stats.values())
+        return {
+            'backend': self.backend.name,
+            'enabled': self.enabled,
+            'hits': hits,
+            'misses': lookups - hits,
+            'errors': self.errors,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'tables': {name: dict(table) for name, table in self._stats.items()},
+        }
+
+
+def _create_backend(conf: dict):
+    if conf.get('backend', 'memory') == 'redis':
+        return RedisCacheBackend.from_url(conf['redis_url'], conf.get('prefix', 'feeder:cache:'))
+    return MemoryCacheBackend(conf.get('maxsize', 10000))
+
+
+CacheConf = settings.get('cache', {})
+query_cache = QueryCache(
+    _create_backend(CacheConf),
+    ttl=CacheConf.get('ttl_seconds', 60),
+    settle_seconds=CacheConf.get('settle_seconds', REPLICA_LAG_WINDOW if replica_engines else 0),
+    enabled=CacheConf.get('enabled', True),
+)
@@ -0,0 +1,90 @@
+import itertools
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Delete, Insert, Update
+
+
+class ReplicaSet:
+    """
+    Набор реплик для чтения.
+
+    Выбирается наименее загруженная реплика (меньше всего выданных соединений),
+    при равенстве - по кругу. Реплика, на которой произошла ошибка соединения,
+    исключается из выбора на cooldown секунд.
+    """
+
+    def __init__(self, engines: list[Engine], cooldown: float = 30.0):
+        self.engines = engines
+        self.cooldown = cooldown
+        self._down_until: dict[int, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, 'handle_error', self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine: Engine):
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + self.cooldown
+
+    def healthy(self) -> list[Engine]:
+        now = time.monotonic()
+        with self._lock:
+            return [engine for engine in self.engines if self._down_until.get(id(engine), 0) <= now]
+
+    def candidates(self) -> list[Engine]:
+        """
+        Здоровые реплики в порядке предпочтения: по числу выданных соединений, затем по кругу.
+        """
+        healthy = self.healthy()
+        if not healthy:
+            return []
+        shift = next(self._counter) % len(healthy)
+        rotated = healthy[shift:] + healthy[:shift]
+        return sorted(rotated, key=lambda engine: engine.pool.checkedout())
+
+
+class RoutingSession(Session):
+    """
+    Сессия, которая читает с реплики, а пишет в основную БД.
+
+    Как только в сессии произошла запись (flush или DML-запрос), все последующие
+    запросы этой сессии тоже идут в основную БД, чтобы запрос видел свои изменения.
+    """
+
+    def __init__(self, primary: Engine, read_bind=None, **kwargs):
+        super().__init__(bind=primary, **kwargs)
+        self.primary = primary
+        self.read_bind = read_bind
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.read_bind is None or self.wrote:
+            return self.primary
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.wrote = True
+            return self.primary
+        return self.read_bind
+
+
+def connect_replica(replicas: Optional[ReplicaSet]):
+    """
+    Открыть соединение с первой доступной репликой. Недоступные реплики помечаются
+    и пропускаются; если доступных нет, возвращается None (чтение пойдет в основную БД).
+    """
+    if replicas is None:
+        return None
+    for engine in replicas.candidates():
+        try:
+            return engine.connect()
+        except exc.OperationalError:
+            replicas.mark_down(engine)
+    return None
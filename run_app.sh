@@ -11,4 +11,5 @@ source venv/bin/activate
 pip install --upgrade pip
 pip install -r requirements.txt
 
+python -m database.migrations
 uvicorn api.service:app --host 127.0.0.1 --port 8000 --reload
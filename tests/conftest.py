@@ -0,0 +1,41 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tests.settings import install_settings, create_schema
+
+# Модули приложения читают config при импорте, поэтому настройки подставляются до сбора тестов.
+# async_mode создает get_async_db (aiosqlite) для тестов асинхронных роутеров.
+install_settings(os.path.join(tempfile.mkdtemp(), 'tests.db'), database={'async_mode': True})
+
+
+@pytest.fixture(scope='session')
+def session_factory():
+    create_schema()
+    from database.db import session_maker
+    return session_maker
+
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def pre_series_engine(tmp_path):
+    """
+    SQLite-база со схемой до изменений серии (tests/pre_series_schema.sql), как у уже работающей установки.
+    """
+    from sqlalchemy import create_engine
+    engine = create_engine(f'sqlite:///{tmp_path / "pre_series.db"}')
+    raw = engine.raw_connection()
+    try:
+        raw.executescript((Path(__file__).parent / 'pre_series_schema.sql').read_text(encoding='utf-8'))
+    finally:
+        raw.close()
+    yield engine
+    engine.dispose()
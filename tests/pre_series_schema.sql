@@ -0,0 +1,65 @@
+-- Схема БД до изменений серии (как ее создает внешний mysql-init), в диалекте SQLite.
+-- Тесты миграций применяют их к этой схеме, как к уже работающей базе.
+
+CREATE TABLE device_models (
+	id INTEGER NOT NULL, 
+	name VARCHAR(500) NOT NULL, 
+	PRIMARY KEY (id)
+);
+
+CREATE TABLE enterprises (
+	inn VARCHAR(12) NOT NULL, 
+	ogrn VARCHAR(15) NOT NULL, 
+	kpp VARCHAR(9) NOT NULL, 
+	name VARCHAR(255) NOT NULL, 
+	adres VARCHAR(500) NOT NULL, 
+	PRIMARY KEY (inn), 
+	UNIQUE (ogrn)
+);
+
+CREATE TABLE regular_times (
+	id INTEGER NOT NULL, 
+	period VARCHAR(11) NOT NULL, 
+	days JSON NOT NULL, 
+	timing TIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+
+CREATE TABLE filial_enterprises (
+	id INTEGER NOT NULL, 
+	inn VARCHAR(12) NOT NULL, 
+	adres VARCHAR(500) NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(inn) REFERENCES enterprises (inn)
+);
+
+CREATE TABLE devices (
+	id CHAR(36) NOT NULL, 
+	model_id INTEGER NOT NULL, 
+	serial_number VARCHAR(50) NOT NULL, 
+	filial_id INTEGER NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(model_id) REFERENCES device_models (id), 
+	UNIQUE (serial_number), 
+	FOREIGN KEY(filial_id) REFERENCES filial_enterprises (id)
+);
+
+CREATE TABLE task_lists (
+	id CHAR(36) NOT NULL, 
+	device_id CHAR(36) NOT NULL, 
+	cmd VARCHAR(255) NOT NULL, 
+	is_regular BOOLEAN NOT NULL, 
+	timing DATETIME NOT NULL, 
+	regular_time_id INTEGER, 
+	status VARCHAR(30) NOT NULL, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(device_id) REFERENCES devices (id), 
+	FOREIGN KEY(regular_time_id) REFERENCES regular_times (id)
+);
+
+CREATE TABLE configs (
+	id INTEGER NOT NULL, 
+	name VARCHAR(255) NOT NULL, 
+	value JSON NOT NULL, 
+	PRIMARY KEY (id)
+);
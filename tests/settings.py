@@ -0,0 +1,35 @@
+import sys
+import types
+
+
+def install_settings(db_path: str, **sections):
+    """
+    Подставить модуль config с настройками на SQLite-файл до импорта приложения
+    (тесты и benchmarks: config.py в репозитории нет).
+    Дополнительные секции (scheduler, archive и т.п.) передаются именованными аргументами.
+    """
+    database = {
+        'url': f'sqlite:///{db_path}',
+        'async_url': f'sqlite+aiosqlite:///{db_path}',
+    }
+    database.update(sections.pop('database', {}))
+    settings = {
+        'database': database,
+        'authorization': {'local_jwt_key': 'local-test-key'},
+        'scheduler': {'enabled': False},
+        'archive': {'enabled': False},
+    }
+    settings.update(sections)
+    module = types.ModuleType('config')
+    module.settings = settings
+    sys.modules['config'] = module
+    return settings
+
+
+def create_schema():
+    """
+    Создать все таблицы в базе из настроек.
+    """
+    import database.models  # noqa: F401 - регистрация моделей
+    from database.db import Base, engine
+    Base.metadata.create_all(engine)
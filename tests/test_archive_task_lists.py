@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import mysql
+
+from database.crud.task_lists_crud import archive_finished_task_lists
+from database.migrations import migrate
+from database.models import TaskLists, TaskListsArchive
+
+
+def test_migration_creates_archive(pre_series_engine):
+    migrate(pre_series_engine)
+    inspector = inspect(pre_series_engine)
+    assert {column['name'] for column in inspector.get_columns('task_lists_archive')} == \
+        set(TaskListsArchive.__table__.columns.keys())
+    assert {index['name'] for index in inspector.get_indexes('task_lists_archive')} == \
+        {index.name for index in TaskListsArchive.__table__.indexes}
+
+
+def test_archive_locks_batch_and_moves_finished(db):
+    old = datetime.now() - timedelta(days=60)
+    finished = [str(uuid4()) for _ in range(2)]
+    pending = str(uuid4())
+    db.add_all([TaskLists(id=task_id, device_id=str(uuid4()), cmd='feed', is_regular=False,
+                          timing=old, status='Успешно') for task_id in finished])
+    db.add(TaskLists(id=pending, device_id=str(uuid4()), cmd='feed', is_regular=False, timing=old, status='Ожидает'))
+    db.commit()
+
+    selects = []
+
+    def capture(state):
+        if state.is_select:
+            selects.append(str(state.statement.compile(dialect=mysql.dialect())))
+
+    event.listen(db, 'do_orm_execute', capture)
+    try:
+        assert archive_finished_task_lists(db, datetime.now() - timedelta(days=30)) == 2
+    finally:
+        event.remove(db, 'do_orm_execute', capture)
+    assert selects[0].endswith('FOR UPDATE SKIP LOCKED')
+    assert {row.id for row in db.query(TaskListsArchive.id)} >= set(finished)
+    assert db.get(TaskLists, pending) is not None
+    assert all(db.get(TaskLists, task_id) is None for task_id in finished)
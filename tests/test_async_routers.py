@@ -0,0 +1,55 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from api.routers.async_routers import async_routers
+from authorization.auth import get_current_user
+from database.models import RegularTimes
+
+
+@pytest.fixture
+def client(session_factory):
+    from database.db import async_engine
+    app = FastAPI()
+    for router in async_routers:
+        app.include_router(router)
+    app.dependency_overrides[get_current_user] = lambda: {'username': 'tester'}
+    with TestClient(app) as client:
+        yield client
+        # Соединения aiosqlite привязаны к циклу событий клиента и закрываются в нем же
+        client.portal.call(async_engine.dispose)
+
+
+def test_async_crud_round_trip_with_etag(client):
+    created = client.post('/device_models/create_device_model', json={'name': 'async feeder'})
+    assert created.status_code == 200
+    model_id = created.json()['id']
+
+    listed = client.get('/device_models/all_device_models', params={'limit': 1000})
+    assert {'id': model_id, 'name': 'async feeder'} in listed.json()
+    etag = listed.headers['ETag']
+    assert client.get('/device_models/all_device_models', params={'limit': 1000},
+                      headers={'If-None-Match': etag}).status_code == 304
+
+    assert client.patch(f'/device_models/update_device_model/{model_id}',
+                        json={'name': 'async feeder 2'}).json() == {'id': model_id, 'name': 'async feeder 2'}
+    # Запись меняет версию таблицы: старый ETag больше не подходит, список читается заново
+    relisted = client.get('/device_models/all_device_models', params={'limit': 1000},
+                          headers={'If-None-Match': etag})
+    assert relisted.status_code == 200
+    assert {'id': model_id, 'name': 'async feeder 2'} in relisted.json()
+
+    assert client.get(f'/device_models/get_device_model/{model_id}').json()['name'] == 'async feeder 2'
+    assert client.delete(f'/device_models/delete_device_model/{model_id}').status_code == 200
+    assert client.get(f'/device_models/get_device_model/{model_id}').status_code == 404
+
+
+def test_async_update_recomputes_days_mask(client, db):
+    created = client.post('/regular_time/create_regular_time',
+                          json={'period': 'Еженедельно', 'days': [1, 3], 'timing': '08:00:00'}).json()
+    assert db.scalar(select(RegularTimes.days_mask).where(RegularTimes.id == created['id'])) == 0b101
+
+    updated = client.patch(f'/regular_time/update_regular_time/{created["id"]}', json={'days': [7]})
+    assert updated.json()['days'] == [7]
+    assert db.scalar(select(RegularTimes.days_mask).where(RegularTimes.id == created['id'])) == 0b1000000
@@ -0,0 +1,24 @@
+from datetime import datetime, time
+from uuid import uuid4
+
+from database.crud.task_lists_crud import bulk_create_task_lists, bulk_insert_task_lists
+from database.models import Devices, RegularTimes, TaskLists
+
+
+def test_bulk_create_reports_taken_slots_instead_of_failing(db):
+    device = Devices(model_id=1, serial_number=str(uuid4()), filial_id=1)
+    regular_time = RegularTimes(period='Ежедневно', days=[], timing=time(8))
+    db.add_all([device, regular_time])
+    db.commit()
+    slot = {'device_id': device.id, 'cmd': 'feed', 'is_regular': True, 'timing': datetime(2026, 3, 1, 8),
+            'regular_time_id': regular_time.id, 'status': 'Ожидает'}
+    assert len(bulk_insert_task_lists(db, [dict(slot)])) == 1
+
+    other = dict(slot, timing=datetime(2026, 3, 2, 8))
+    results = bulk_create_task_lists(db, [dict(slot), dict(other), dict(other), dict(slot, regular_time_id=None)])
+
+    assert [result['id'] is not None for result in results] == [False, True, False, True]
+    assert 'уже создано' in results[0]['detail'] and 'уже создано' in results[2]['detail']
+    assert db.query(TaskLists).filter(TaskLists.device_id == device.id).count() == 3
+    # Повторная генерация тех же слотов ничего не вставляет
+    assert bulk_insert_task_lists(db, [dict(slot), dict(other)]) == []
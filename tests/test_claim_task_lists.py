@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import event, update
+
+from database.crud.task_lists_crud import claim_due_task_lists
+from database.models import TaskLists
+
+
+def test_claim_skips_tasks_taken_by_concurrent_poller(db):
+    device_id = uuid4()
+    ids = [str(uuid4()) for _ in range(3)]
+    db.add_all([TaskLists(id=task_id, device_id=str(device_id), cmd='feed', is_regular=False,
+                          timing=datetime.now() - timedelta(minutes=1), status='Ожидает') for task_id in ids])
+    db.commit()
+
+    raced = []
+
+    def concurrent_claim(state):
+        # Без SKIP LOCKED (SQLite) другой опрос успевает захватить задание между SELECT и UPDATE
+        if state.is_update and not raced:
+            raced.append(ids[0])
+            state.session.execute(update(TaskLists).where(TaskLists.id == ids[0]).values(status='Выполняется'))
+
+    event.listen(db, 'do_orm_execute', concurrent_claim)
+    claimed = claim_due_task_lists(db, device_id)
+    event.remove(db, 'do_orm_execute', concurrent_claim)
+    assert sorted(task['id'] for task in claimed) == sorted(ids[1:])
+    assert claim_due_task_lists(db, device_id) == []
@@ -0,0 +1,64 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from database.crud.device_models_crud import create_device_model, update_device_model
+from database.crud.table_versions_crud import get_cached_table_version
+from database.migrations import MIGRATIONS, migrate
+from database.models import DeviceModels, Devices, FilialEnterprises, TaskLists
+
+
+def test_migrations_upgrade_pre_series_schema(pre_series_engine):
+    assert migrate(pre_series_engine) == [name for name, _ in MIGRATIONS]
+    assert inspect(pre_series_engine).has_table('table_versions')
+    assert migrate(pre_series_engine) == []
+
+    with Session(pre_series_engine) as db:
+        model = create_device_model(db, DeviceModels(name='feeder'))
+        update_device_model(db, model.id, {'name': 'feeder 2'})
+        assert get_cached_table_version(db, DeviceModels.__tablename__).version == 2
+
+
+def test_migrations_on_current_schema_are_noop(session_factory):
+    from database.db import engine
+    migrate(engine)
+    assert migrate(engine) == []
+
+
+def test_migrations_dedupe_regular_slots_before_unique_index(pre_series_engine):
+    with pre_series_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO task_lists (id, device_id, cmd, is_regular, timing, regular_time_id, status) VALUES "
+            "('a', 'd1', 'feed', 1, '2026-01-05 08:00:00.000000', 1, 'Ожидает'), "
+            "('b', 'd1', 'feed', 1, '2026-01-05 08:00:00.000000', 1, 'Успешно'), "
+            "('c', 'd1', 'feed', 1, '2026-01-05 08:00:00.000000', 1, 'Ожидает'), "
+            "('d', 'd1', 'feed', 1, '2026-01-06 08:00:00.000000', 1, 'Ожидает'), "
+            "('e', 'd1', 'feed', 1, '2026-01-06 08:00:00.000000', 1, 'Ожидает'), "
+            "('f', 'd1', 'feed', 0, '2026-01-06 08:00:00.000000', NULL, 'Ожидает'), "
+            "('g', 'd1', 'feed', 0, '2026-01-06 08:00:00.000000', NULL, 'Ожидает')"))
+
+    migrate(pre_series_engine)
+
+    with pre_series_engine.connect() as connection:
+        assert list(connection.scalars(text('SELECT id FROM task_lists ORDER BY id'))) == ['b', 'd', 'f', 'g']
+    expected = {index.name for table in (TaskLists, Devices, FilialEnterprises) for index in table.__table__.indexes}
+    expected |= {'ix_regular_times_period_id', 'uq_task_lists_regular_slot'}
+    inspector = inspect(pre_series_engine)
+    created = {index['name'] for table in ('task_lists', 'devices', 'filial_enterprises', 'regular_times')
+               for index in inspector.get_indexes(table)}
+    assert expected <= created
+    assert next(index for index in inspector.get_indexes('task_lists')
+                if index['name'] == 'uq_task_lists_regular_slot')['unique']
+
+
+def test_migrations_dedupe_configs_before_unique_name(pre_series_engine):
+    with pre_series_engine.begin() as connection:
+        connection.execute(text("INSERT INTO configs (id, name, value) VALUES "
+                                "(1, 'roles', '{\"a\": 1}'), (2, 'roles', '{\"a\": 2}'), "
+                                "(3, 'limits', '{}'), (4, 'roles', '{\"a\": 3}')"))
+
+    migrate(pre_series_engine)
+
+    with pre_series_engine.connect() as connection:
+        assert list(connection.scalars(text('SELECT id FROM configs ORDER BY id'))) == [1, 3]
+    assert next(index for index in inspect(pre_series_engine).get_indexes('configs')
+                if index['name'] == 'uq_configs_name')['unique']
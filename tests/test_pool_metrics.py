@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from database.pool_metrics import InstrumentedQueuePool, pool_stats
+
+
+def test_counts_survive_dispose_without_duplicates(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=InstrumentedQueuePool)
+    for expected in (1, 2, 3):
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        assert pool_stats(engine)['connects'] == expected
+        engine.dispose()
+
+    with engine.connect() as connection:
+        connection.invalidate()
+    stats = pool_stats(engine)
+    assert (stats['connects'], stats['invalidated']) == (4, 1)
+
+
+def test_counters_are_updated_under_lock(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.01)
+    connection = engine.connect()
+    with engine.pool.metrics._lock:
+        # Пока снимок держит блокировку, счетчик инвалидированных соединений ждет ее
+        invalidating = threading.Thread(target=connection.invalidate)
+        invalidating.start()
+        invalidating.join(0.2)
+        assert invalidating.is_alive()
+    invalidating.join()
+    connection.close()
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    stats = pool_stats(engine)
+    assert (stats['connects'], stats['invalidated'], stats['timeouts']) == (2, 1, 1)
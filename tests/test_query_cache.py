@@ -0,0 +1,58 @@
+import asyncio
+
+from sqlalchemy import update
+
+from database.crud.device_models_crud import create_device_model, get_all_device_models
+from database.crud.table_versions_crud import bump_table_version, get_cached_table_version
+from database.models import DeviceModels
+from database.query_cache import MemoryCacheBackend, QueryCache, query_cache
+
+
+def test_memory_cache_sees_writes_of_other_workers(db):
+    assert not query_cache.shared
+    model = create_device_model(db, DeviceModels(name='before'))
+    get_cached_table_version(db, DeviceModels.__tablename__)
+    assert [row['name'] for row in get_all_device_models(db)[0]] == ['before']
+
+    # Запись другого воркера: данные и версия меняются в БД, локальный кэш не сбрасывается
+    db.execute(update(DeviceModels).where(DeviceModels.id == model.id).values(name='after'))
+    bump_table_version(db, DeviceModels.__tablename__)
+    db.commit()
+    assert [row['name'] for row in get_all_device_models(db)[0]] == ['before']
+
+    version = get_cached_table_version(db, DeviceModels.__tablename__)
+    assert [row['name'] for row in get_all_device_models(db)[0]] == ['after']
+    # Та же версия больше не сбрасывает кэш
+    hits = query_cache.stats()['hits']
+    assert get_cached_table_version(db, DeviceModels.__tablename__).version == version.version
+    get_all_device_models(db)
+    assert query_cache.stats()['hits'] == hits + 1
+
+
+def test_config_snapshot_refresh_syncs_versions(db, session_factory):
+    from database.config_snapshot import ConfigSnapshot
+    get_all_device_models(db)
+    db.execute(update(DeviceModels).values(name='refreshed'))
+    bump_table_version(db, DeviceModels.__tablename__)
+    db.commit()
+    ConfigSnapshot(session_factory).refresh()
+    assert {row['name'] for row in get_all_device_models(db)[0]} == {'refreshed'}
+
+
+def test_async_reads_share_generations_with_sync_writes():
+    cache = QueryCache(MemoryCacheBackend())
+    cache.cached('device_models')
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        first = await cache.aget_or_compute('device_models', 'page', compute)
+        second = await cache.aget_or_compute('device_models', 'page', compute)
+        cache.invalidate(['device_models'])
+        third = await cache.aget_or_compute('device_models', 'page', compute)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (1, 1, 2)
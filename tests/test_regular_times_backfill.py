@@ -0,0 +1,31 @@
+from datetime import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database.crud.regular_times_crud import get_regular_times_firing
+from database.migrations import migrate
+from database.migrations.m0002_regular_times_days_mask import upgrade
+from database.models.regular_times_model import ALL_DAYS_MASK
+
+
+def test_migration_adds_column_and_masks(pre_series_engine):
+    with pre_series_engine.begin() as connection:
+        connection.execute(text("INSERT INTO regular_times VALUES "
+                                "(1, 'Еженедельно', '[1, 3]', '08:00:00.000000'), "
+                                "(2, 'Ежедневно', '[]', '09:00:00.000000'), "
+                                "(3, 'Еженедельно', '[]', '10:00:00.000000')"))
+
+    migrate(pre_series_engine)
+
+    with Session(pre_series_engine) as db:
+        masks = dict(db.execute(text('SELECT id, days_mask FROM regular_times')).all())
+        assert masks == {1: 0b101, 2: ALL_DAYS_MASK, 3: 0}
+        assert [row['id'] for row in get_regular_times_firing(db, 3, time(7), time(10))] == [1, 2]
+        # Таблица версий не трогается: миграция схемы не сбрасывает кэши
+        assert db.execute(text('SELECT count(*) FROM table_versions')).scalar() == 0
+
+    # Повтор после сбоя (колонка и индекс уже есть) ничего не меняет
+    with pre_series_engine.begin() as connection:
+        upgrade(connection, batch_size=1)
+        assert dict(connection.execute(text('SELECT id, days_mask FROM regular_times')).all()) == masks
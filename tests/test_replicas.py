@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session
+
+import database.db
+import database.replicas
+from database.db import Base, PRIMARY_COOKIE, get_db
+from database.models import Configs
+from database.replicas import ReplicaSet
+
+MARKER = 'replica_routing_marker'
+
+app = FastAPI()
+
+
+def _source(db: Session):
+    return db.scalar(select(Configs.value).where(Configs.name == MARKER))['source']
+
+
+@app.get('/source')
+def read_source(db: Session = Depends(get_db)):
+    return {'source': _source(db)}
+
+
+@app.post('/source')
+def write_then_read(db: Session = Depends(get_db)):
+    return {'source': _source(db)}
+
+
+@app.get('/write-then-read')
+def get_with_write(db: Session = Depends(get_db)):
+    before = _source(db)
+    db.add(Configs(name=f'{MARKER}_written', value={}))
+    db.flush()
+    after = _source(db)
+    db.rollback()
+    return {'before': before, 'after': after}
+
+
+def _marked_engine(url: str, source: str):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[Configs.__table__])
+    with engine.begin() as connection:
+        connection.execute(delete(Configs).where(Configs.name == MARKER))
+        connection.execute(insert(Configs).values(name=MARKER, value={'source': source}))
+    return engine
+
+
+@pytest.fixture
+def replica(session_factory, tmp_path):
+    _marked_engine(str(database.db.engine.url), 'primary')
+    engine = _marked_engine(f'sqlite:///{tmp_path / "replica.db"}', 'replica')
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def down_replica(tmp_path):
+    # Файл в несуществующем каталоге: соединение с такой "репликой" не открывается
+    engine = create_engine(f'sqlite:///{tmp_path / "missing" / "replica.db"}')
+    yield engine
+    engine.dispose()
+
+
+def _use_replicas(monkeypatch, engines, cooldown=30.0):
+    replica_set = ReplicaSet(engines, cooldown=cooldown)
+    monkeypatch.setattr(database.db, 'replica_set', replica_set)
+    return replica_set
+
+
+def test_get_reads_from_replica(monkeypatch, replica):
+    _use_replicas(monkeypatch, [replica])
+    with TestClient(app) as client:
+        assert client.get('/source').json() == {'source': 'replica'}
+        assert PRIMARY_COOKIE not in client.cookies
+
+
+def test_down_replica_falls_back_to_primary_until_cooldown_passes(monkeypatch, replica, down_replica):
+    replica_set = _use_replicas(monkeypatch, [down_replica], cooldown=10)
+    clock = [1000.0]
+    monkeypatch.setattr(database.replicas.time, 'monotonic', lambda: clock[0])
+    with TestClient(app) as client:
+        assert client.get('/source').json() == {'source': 'primary'}
+        assert replica_set.healthy() == []
+        # В cooldown недоступная реплика не пробуется: на ее место встает исправная
+        replica_set.engines.append(replica)
+        assert replica_set.candidates() == [replica]
+        clock[0] += 11
+        assert replica_set.healthy() == [down_replica, replica]
+
+    replica_set = _use_replicas(monkeypatch, [down_replica, replica])
+    with TestClient(app) as client:
+        assert client.get('/source').json() == {'source': 'replica'}
+        assert replica_set.healthy() == [replica]
+
+
+def test_write_sets_cookie_for_reading_own_writes(monkeypatch, replica):
+    _use_replicas(monkeypatch, [replica])
+    with TestClient(app) as client:
+        assert client.post('/source').json() == {'source': 'primary'}
+        assert float(client.cookies[PRIMARY_COOKIE]) > time.time()
+        assert client.get('/source').json() == {'source': 'primary'}
+
+        # Окно задержки репликации прошло
+        client.cookies.set(PRIMARY_COOKIE, str(time.time() - 1))
+        assert client.get('/source').json() == {'source': 'replica'}
+
+
+def test_session_reads_from_primary_after_write(monkeypatch, replica):
+    _use_replicas(monkeypatch, [replica])
+    with TestClient(app) as client:
+        assert client.get('/write-then-read').json() == {'before': 'replica', 'after': 'primary'}
@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+
+from authorization.wp_client import CircuitBreaker, WordPressClient
+from benchmarks.fake_wordpress import create_fake_wordpress, free_port, serve_in_thread
+
+
+@pytest.fixture(scope='module')
+def wordpress_url():
+    port = free_port()
+    server = serve_in_thread(create_fake_wordpress(latency=0.2), port)
+    yield f'http://127.0.0.1:{port}'
+    server.should_exit = True
+
+
+def test_cancelled_probe_releases_circuit(wordpress_url):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == 'half-open'
+
+    async def scenario():
+        client = WordPressClient(wordpress_url, breaker=breaker)
+        try:
+            probe = asyncio.create_task(client.get_user_info('fake-admin'))
+            await asyncio.sleep(0.05)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            # Проба освобождена: следующий запрос проходит и замыкает цепь
+            return await client.get_user_info('fake-admin')
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario())['id'] == 1
+    assert breaker.state == 'closed'
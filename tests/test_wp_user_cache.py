@@ -0,0 +1,47 @@
+import asyncio
+
+from authorization.wp_user_cache import WordPressUserCache
+
+
+def test_followers_survive_cancelled_leader():
+    calls = []
+
+    async def lookup(token):
+        calls.append(token)
+        await asyncio.sleep(0.05)
+        return {'id': 1, 'token': token}
+
+    async def scenario():
+        cache = WordPressUserCache(lookup)
+        leader = asyncio.create_task(cache.get('token'))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(cache.get('token')) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+        assert leader.cancelled()
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+    assert results == [{'id': 1, 'token': 'token'}] * 3
+    # Отмененный запрос и один повтор за всех ожидающих
+    assert len(calls) == 2
+    assert cache.stats()['size'] == 1
+
+
+def test_cancelled_follower_does_not_affect_leader():
+    async def lookup(token):
+        await asyncio.sleep(0.05)
+        return {'id': 1}
+
+    async def scenario():
+        cache = WordPressUserCache(lookup)
+        leader = asyncio.create_task(cache.get('token'))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get('token'))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        assert await asyncio.wait_for(leader, timeout=1) == {'id': 1}
+        assert follower.cancelled()
+
+    asyncio.run(scenario())